@@ -2,23 +2,58 @@
 
 from __future__ import annotations
 
+import datetime
+import hmac
 import logging
+import time
+from dataclasses import asdict
 from logging.config import dictConfig
 
-from flask import Flask, jsonify, request, render_template
+import requests
+from flask import (
+    Flask,
+    Response,
+    g,
+    jsonify,
+    request,
+    render_template,
+    stream_with_context,
+)
 from flask.typing import ResponseReturnValue
 
 
 from campwatcher import api
-from campwatcher.models import SessionLocal, Watcher
-from campwatcher.schemas import WatcherCreate
-from campwatcher.scheduling import schedule_watcher, scheduler
+from campwatcher.attributes import get_store
+from campwatcher.bulk import export_ndjson, iter_ndjson, validate_watchers
+from campwatcher.db import SessionLocal, insert_watchers, session_scope
+from campwatcher.models import Watcher
+from campwatcher.schemas import WatcherCreate, window_months
+from campwatcher.worker import enqueue
 from campwatcher.config import config
-from campground_data import CAMPGROUND_ATTRIBUTES
-from reserve_ca import (
-    fetch_availability as fetch_ca_availability,
-    fetch_update_time as fetch_ca_update_time,
-)
+from campwatcher.history import get_history
+from campwatcher.httpcache import response_cache
+from campwatcher.live import get_hub, sse_stream
+from campwatcher.metrics import CONTENT_TYPE, registry
+from campwatcher.providers import RESERVE_CA, get_provider
+from campwatcher.release import get_release_times
+from campwatcher.stays import find_stays
+
+
+def _is_admin() -> bool:
+    """Whether the request carries the configured ``ADMIN_TOKEN`` as a bearer token."""
+    token = config.admin_token
+    header = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+
+
+def _valid_coordinate(value: str | None, limit: float) -> bool:
+    """Whether an optional ``lat``/``lon`` argument is a number within ``limit``."""
+    if value in (None, ""):
+        return True
+    try:
+        return abs(float(value)) <= limit
+    except ValueError:
+        return False
 
 
 def create_app() -> Flask:
@@ -28,34 +63,53 @@ def create_app() -> Flask:
     dictConfig(
         {
             "version": 1,
-            "formatters": {"default": {"format": "%(asctime)s %(levelname)s %(name)s: %(message)s"}},
+            "formatters": {
+                "default": {"format": "%(asctime)s %(levelname)s %(name)s: %(message)s"}
+            },
             "handlers": {"console": {"class": "logging.StreamHandler", "formatter": "default"}},
 
             "root": {"level": "INFO", "handlers": ["console"]},
         }
     )
 
+    logger = logging.getLogger("campwatcher.app")
+
+    @app.before_request
+    def start_timer() -> None:
+        g.started = time.perf_counter()
+
+    @app.after_request
+    def record_latency(response: Response) -> Response:
+        elapsed = time.perf_counter() - g.started
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        if response.mimetype != "text/event-stream":
+            registry.observe_route(route, elapsed)
+        logger.info(
+            "%s %s %s in %.1f ms", request.method, route, response.status_code, elapsed * 1000
+        )
+        return response
+
+    @app.teardown_appcontext
+    def remove_session(exc: BaseException | None) -> None:
+        SessionLocal.remove()
+
     @app.route("/search")
+    @response_cache.cached(config.search_cache_ttl, config.response_cache_stale)
     def search_campgrounds() -> ResponseReturnValue:
         query = request.args.get("query")
         lat = request.args.get("lat")
         lon = request.args.get("lon")
+        if not _valid_coordinate(lat, 90) or not _valid_coordinate(lon, 180):
+            return jsonify({"error": "lat and lon must be valid coordinates"}), 400
         tent_only = request.args.get("tent_only") == "true"
         no_rv = request.args.get("no_rv") == "true"
-        results = api.fetch_campgrounds(query, lat, lon)
-        filtered = []
-        for camp in results:
-            cid = str(camp.get("FacilityID"))
-            attrs = CAMPGROUND_ATTRIBUTES.get(cid, {})
-            if tent_only and not attrs.get("tent_only"):
-                continue
-            if no_rv and not attrs.get("no_rv"):
-                continue
-            filtered.append(camp)
-        return jsonify(filtered)
+        radius_km = request.args.get("radius_km", type=float)
+        results = api.fetch_campgrounds(query, lat, lon, radius_km)
+        return jsonify(get_store().filter_campgrounds(results, tent_only, no_rv))
 
 
     @app.route("/ca_availability")
+    @response_cache.cached(config.ca_availability_cache_ttl, config.response_cache_stale)
     def ca_availability() -> ResponseReturnValue:
         park_id = request.args.get("park_id")
         facility_id = request.args.get("facility_id")
@@ -63,19 +117,67 @@ def create_app() -> Flask:
         if not park_id or not facility_id or not start_date:
             return jsonify({"error": "park_id, facility_id and start_date required"}), 400
 
-        data = fetch_ca_availability(park_id, facility_id, start_date)
-        return jsonify(data)
+        provider = get_provider(RESERVE_CA)
+        key = (park_id, facility_id, start_date)
+        payload = provider.fetch(key)
+        if request.args.get("raw") == "true":
+            return jsonify(payload)
+        return jsonify(provider.matrix(key, payload).to_record())
+
+    @app.route("/stays")
+    def stays() -> ResponseReturnValue:
+        campground_id = request.args.get("campground_id")
+        try:
+            start = datetime.date.fromisoformat(request.args.get("start_date", ""))
+            end = datetime.date.fromisoformat(request.args.get("end_date", ""))
+        except ValueError:
+            start = end = None
+        if not campground_id or start is None or end is None:
+            return jsonify({"error": "campground_id, start_date and end_date required"}), 400
+        if end < start:
+            return jsonify({"error": "end_date must not be before start_date"}), 400
+        if window_months(start, end) > config.max_window_months:
+            return (
+                jsonify({"error": f"window may span at most {config.max_window_months} months"}),
+                400,
+            )
+        min_nights = request.args.get("min_nights", 1, type=int)
+        try:
+            found = find_stays(
+                campground_id,
+                start,
+                end,
+                min_nights,
+                request.args.get("provider"),
+                request.args.get("facility_id"),
+                request.args.get("site_type"),
+                request.args.get("loop"),
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        except requests.RequestException as exc:
+            logger.warning("Stay search for %s failed upstream: %s", campground_id, exc)
+            return jsonify({"error": "upstream availability request failed"}), 502
+        return jsonify(
+            {
+                "campground_id": campground_id,
+                "min_nights": min_nights,
+                "stays": [stay.to_dict() for stay in found],
+            }
+        )
 
     @app.route("/ca_update_time")
+    @response_cache.cached(config.ca_update_time_cache_ttl, config.response_cache_stale)
     def ca_update_time() -> ResponseReturnValue:
         park_id = request.args.get("park_id")
         facility_id = request.args.get("facility_id")
         if not park_id or not facility_id:
             return jsonify({"error": "park_id and facility_id required"}), 400
-        update_dt = fetch_ca_update_time(park_id, facility_id)
+        update_dt = get_release_times().get(park_id, facility_id)
         return jsonify({"next_update_time": update_dt.isoformat() if update_dt else None})
 
     @app.route("/difficulty_score")
+    @response_cache.cached(config.difficulty_cache_ttl, config.response_cache_stale)
     def difficulty_score_endpoint() -> ResponseReturnValue:
         campground_id = request.args.get("campground_id")
         if not campground_id:
@@ -85,40 +187,116 @@ def create_app() -> Flask:
         score = difficulty_score(campground_id)
         return jsonify({"campground_id": campground_id, "difficulty_score": score})
 
+    @app.route("/difficulty_history")
+    def difficulty_history() -> ResponseReturnValue:
+        campground_id = request.args.get("campground_id")
+        month = request.args.get("month")
+        if not campground_id or not month:
+            return jsonify({"error": "campground_id and month required"}), 400
+        history = get_history()
+        if history is None:
+            return jsonify({"error": "history is not enabled (set HISTORY_DB)"}), 404
+        aggregate = history.latest(campground_id, month)
+        since = request.args.get("since", 0, type=float)
+        return jsonify(
+            {
+                "campground_id": campground_id,
+                "month": month,
+                "aggregate": asdict(aggregate) if aggregate else None,
+                "series": history.series(campground_id, month, since),
+            }
+        )
+
+
+    @app.route("/stream")
+    def stream_availability() -> ResponseReturnValue:
+        ids = [
+            cid
+            for value in request.args.getlist("campground_id")
+            for cid in value.split(",")
+            if cid
+        ]
+        if not ids:
+            return jsonify({"error": "campground_id required"}), 400
+        hub = get_hub()
+        sub = hub.subscribe(ids)
+        return Response(
+            stream_with_context(sse_stream(hub, sub)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     @app.route("/watchers", methods=["POST"])
     def add_watcher() -> ResponseReturnValue:
         model = WatcherCreate.model_validate(request.json)
-        session = SessionLocal()
-        watcher = Watcher(
-            campground_id=model.campground_id,
-            site_type=model.site_type,
-            tent_only=bool(model.tent_only),
-            no_rv=bool(model.no_rv),
-            loop=model.loop,
-
-            check_time=model.check_time,
-            email=model.email,
+        watcher = Watcher(**model.model_dump())
+        enqueue(watcher)
+        with session_scope() as session:
+            session.add(watcher)
+            session.flush()
+            watcher_id = watcher.id
+        return jsonify({"id": watcher_id})
+
+    @app.route("/watchers/bulk", methods=["POST"])
+    def add_watchers_bulk() -> ResponseReturnValue:
+        if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+            items = iter_ndjson(request.stream)
+        else:
+            items = request.get_json(silent=True)
+            if not isinstance(items, list):
+                return jsonify({"error": "expected a JSON array or NDJSON body"}), 400
+        rows, errors = validate_watchers(items)
+        if errors:
+            return jsonify({"errors": errors}), 400
+        with session_scope() as session:
+            ids = insert_watchers(session, rows)
+        return jsonify({"ids": ids}), 201
+
+    @app.route("/watchers", methods=["GET"])
+    def export_watchers() -> ResponseReturnValue:
+        include_email = _is_admin()
+
+        def generate():
+            with session_scope() as session:
+                yield from export_ndjson(session, include_email=include_email)
+
+        return Response(
+            stream_with_context(generate()), mimetype="application/x-ndjson"
         )
-        session.add(watcher)
-        session.commit()
-        schedule_watcher(watcher.id, model.check_time)
-        session.close()
-        return jsonify({"id": watcher.id})
+
+    @app.route("/metrics")
+    def metrics() -> ResponseReturnValue:
+        return Response(registry.render(), mimetype=None, content_type=CONTENT_TYPE)
+
+    @app.route("/metrics/profiles/<int:watcher_id>")
+    def watcher_profile(watcher_id: int) -> ResponseReturnValue:
+        if not _is_admin():
+            return jsonify({"error": "admin token required"}), 403
+        profile = registry.profiles.get(watcher_id)
+        if profile is None:
+            return jsonify({"error": "no profile for this watcher"}), 404
+        return Response(profile, mimetype="text/plain")
 
     @app.route("/")
     def index() -> ResponseReturnValue:
         return render_template("index.html")
 
 
-    @app.before_first_request
-    def start_scheduler() -> None:
-        session = SessionLocal()
-        watchers = session.query(Watcher).all()
-        for w in watchers:
-            schedule_watcher(w.id, w.check_time)
+    if config.embedded_worker:
+        from campwatcher.scheduling import get_scheduler
+        from campwatcher.worker import Worker
+
+        scheduler = get_scheduler()
+        scheduler.add_job(
+            Worker().run_once,
+            trigger="interval",
+            seconds=config.worker_poll_seconds,
+            id="embedded-worker",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
         scheduler.start()
-        session.close()
 
     return app
 
@@ -0,0 +1,92 @@
+"""Compare park-page parsing: BeautifulSoup tree vs streaming extractor.
+
+Usage: ``python benchmarks/bench_park_page.py [--repeat N]``
+
+Each fixture in ``benchmarks/fixtures`` is fed to both parsers in
+``reserve_ca.CHUNK_SIZE`` chunks; the report shows the median time per page
+and how many bytes each parser had to read.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Iterator, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from reserve_ca import CHUNK_SIZE, extract_update_time  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def soup_update_time(html: str):
+    """The original implementation: full tree, then regex every script."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup.find_all("script"):
+        if not tag.string:
+            continue
+        m = re.search(r'"nextAvailabilityUpdate"\s*:\s*"([^"]+)"', tag.string)
+        if m:
+            try:
+                return datetime.fromisoformat(m.group(1))
+            except ValueError:
+                pass
+    return None
+
+
+class _Counted:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.read = 0
+
+    def chunks(self) -> Iterator[bytes]:
+        for i in range(0, len(self.data), CHUNK_SIZE):
+            chunk = self.data[i : i + CHUNK_SIZE]
+            self.read += len(chunk)
+            yield chunk
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    times: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'fixture':<24}{'parser':<10}{'ms':>10}{'bytes read':>14}")
+    for name in sorted(os.listdir(FIXTURES)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(FIXTURES, name), "rb") as fh:
+            data = fh.read()
+
+        def soup() -> object:
+            return soup_update_time(data.decode())
+
+        def stream() -> object:
+            return extract_update_time(_Counted(data).chunks())
+
+        assert soup() == stream(), name
+        counted = _Counted(data)
+        extract_update_time(counted.chunks())
+        print(f"{name:<24}{'soup':<10}{_median_ms(soup, args.repeat):>10.2f}{len(data):>14}")
+        print(f"{'':<24}{'stream':<10}{_median_ms(stream, args.repeat):>10.2f}{counted.read:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compare full-document JSON parsing with the streaming campsite parser.
+
+Usage: ``python benchmarks/bench_streaming.py [--sites N] [--months N] [--repeat N]``
+
+For each synthetic Recreation.gov month page the report shows the median
+time and the peak traced allocation (``tracemalloc``) of:
+
+* ``json``: ``json.loads`` of the body, then the available rows via
+  ``AvailabilityMatrix`` (the cached-payload path);
+* ``stream``: :func:`campwatcher.streaming.available_rows` over
+  ``CHUNK_SIZE`` chunks, which never builds the whole document;
+* ``match``: :func:`campwatcher.streaming.iter_matching` for one campsite
+  type, the shape a single watcher needs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import payloads  # noqa: E402
+
+from campwatcher.matrix import AvailabilityMatrix  # noqa: E402
+from campwatcher.streaming import CHUNK_SIZE, available_rows, iter_matching  # noqa: E402
+
+
+def _chunks(body: bytes) -> Iterator[bytes]:
+    for i in range(0, len(body), CHUNK_SIZE):
+        yield body[i : i + CHUNK_SIZE]
+
+
+def _measure(fn: Callable[[], object], repeat: int) -> Tuple[float, float]:
+    """Median milliseconds and peak traced MiB of ``fn``."""
+    times: List[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times) * 1000, peak / 2**20
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, nargs="+", default=[100, 1000, 4000])
+    parser.add_argument("--months", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    print(f"{'payload':<16}{'parser':<8}{'ms':>10}{'MB/s':>10}{'peak MiB':>10}")
+    for sites in args.sites:
+        for month in payloads.months("2024-06", args.months):
+            body = json.dumps(payloads.recgov_month("1", month, sites)).encode()
+            site_type = payloads.SITE_TYPES[1]
+
+            def full() -> object:
+                return AvailabilityMatrix.from_payload(json.loads(body)).available_rows()
+
+            def stream() -> object:
+                return available_rows(_chunks(body))
+
+            def match() -> object:
+                return list(iter_matching(_chunks(body), site_type=site_type))
+
+            assert full() == stream()
+            label = f"{sites}x{month}"
+            for name, fn in [("json", full), ("stream", stream), ("match", match)]:
+                ms, peak = _measure(fn, args.repeat)
+                rate = len(body) / 2**20 / (ms / 1000)
+                print(f"{label:<16}{name:<8}{ms:>10.2f}{rate:>10.1f}{peak:>10.2f}")
+                label = ""
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Local stand-in for Recreation.gov and the usedirect API.
+
+``MockUpstream`` serves synthetic payloads from :mod:`payloads` on a random
+localhost port with a fixed per-request latency and a random 503 rate::
+
+    with MockUpstream(sites=500, latency=0.02, error_rate=0.01) as upstream:
+        upstream.install()  # point config / reserve_ca at the mock
+        ...
+
+Generated bodies are cached, so responses cost one ``sleep`` plus a write.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import payloads
+
+_MONTH = re.compile(r"^/api/camps/availability/campground/(?P<cid>[^/]+)/month$")
+
+
+class MockUpstream:
+    def __init__(
+        self,
+        sites: int = 100,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        facilities: int = 1000,
+        seed: int = 0,
+    ) -> None:
+        self.sites = sites
+        self.latency = latency
+        self.error_rate = error_rate
+        self.facilities = facilities
+        self.seed = seed
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._bodies: Dict[Tuple[Any, ...], bytes] = {}
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._saved: List[Tuple[Any, str, Any]] = []
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _body(self, key: Tuple[Any, ...], build: Callable[[], Any]) -> bytes:
+        with self._lock:
+            body = self._bodies.get(key)
+        if body is None:
+            body = json.dumps(build()).encode()
+            with self._lock:
+                self._bodies[key] = body
+        return body
+
+    def respond(self, path: str, query: Dict[str, str]) -> Tuple[int, bytes]:
+        with self._lock:
+            self.requests += 1
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            return 503, b'{"error": "unavailable"}'
+        match = _MONTH.match(path)
+        if match:
+            cid, month = match["cid"], query.get("start_date", "")[:7]
+            return 200, self._body(
+                ("recgov", cid, month),
+                lambda: payloads.recgov_month(cid, month, self.sites, self.seed),
+            )
+        if path == "/api/facilities":
+            return 200, self._body(
+                ("search",),
+                lambda: {"RECDATA": payloads.facilities(self.facilities, self.seed)},
+            )
+        if path == "/RDR/rdr/availability/park":
+            key = tuple(query.get(k, "") for k in ("parkId", "facilityId", "startDate"))
+            return 200, self._body(
+                ("usedirect",) + key,
+                lambda: payloads.usedirect_grid(*key, sites=self.sites, seed=self.seed),
+            )
+        return 404, b'{"error": "not found"}'
+
+    def __enter__(self) -> "MockUpstream":
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                status, body = upstream.respond(parsed.path, query)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.restore()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def install(self) -> None:
+        """Point the app's upstream URLs at this server until exit."""
+        import reserve_ca
+        from campwatcher.config import config
+
+        targets = [
+            (config, "search_api", f"{self.url}/api/facilities"),
+            (
+                config,
+                "availability_api",
+                f"{self.url}/api/camps/availability/campground/{{campground_id}}/month",
+            ),
+            (reserve_ca, "AVAILABILITY_API", f"{self.url}/RDR/rdr/availability/park"),
+        ]
+        self.restore()
+        for obj, attr, value in targets:
+            self._saved.append((obj, attr, getattr(obj, attr)))
+            setattr(obj, attr, value)
+
+    def restore(self) -> None:
+        for obj, attr, value in reversed(self._saved):
+            setattr(obj, attr, value)
+        self._saved.clear()
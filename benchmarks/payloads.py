@@ -0,0 +1,96 @@
+"""Synthetic upstream payloads shaped like the real APIs.
+
+Generators are seeded so the same arguments always produce the same bytes,
+which keeps benchmark runs comparable between commits.
+"""
+
+from __future__ import annotations
+
+import datetime
+import random
+from typing import Any, Dict, List
+
+RECGOV_STATUSES = ["Available", "Reserved", "Reserved", "Not Available", "Not Reservable"]
+SITE_TYPES = ["STANDARD NONELECTRIC", "TENT ONLY NONELECTRIC", "RV ELECTRIC", "GROUP STANDARD"]
+
+
+def _days(month: str) -> List[datetime.date]:
+    first = datetime.date.fromisoformat(f"{month}-01")
+    days = []
+    day = first
+    while day.month == first.month:
+        days.append(day)
+        day += datetime.timedelta(days=1)
+    return days
+
+
+def months(start: str, count: int) -> List[str]:
+    """``count`` consecutive YYYY-MM strings starting at ``start``."""
+    year, month = map(int, start.split("-"))
+    out = []
+    for _ in range(count):
+        out.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return out
+
+
+def recgov_month(campground_id: str, month: str, sites: int, seed: int = 0) -> Dict[str, Any]:
+    """A Recreation.gov ``campground/<id>/month`` response."""
+    rng = random.Random(f"{campground_id}:{month}:{sites}:{seed}")
+    days = _days(month)
+    campsites = {}
+    for i in range(sites):
+        site_id = str(10_000 + i)
+        campsites[site_id] = {
+            "campsite_id": site_id,
+            "site": f"{i:03d}",
+            "loop": f"Loop {chr(65 + i % 6)}",
+            "campsite_type": SITE_TYPES[i % len(SITE_TYPES)],
+            "availabilities": {
+                f"{day.isoformat()}T00:00:00Z": rng.choice(RECGOV_STATUSES) for day in days
+            },
+        }
+    return {"campsites": campsites, "count": sites}
+
+
+def usedirect_grid(
+    park_id: str, facility_id: str, start_date: str, sites: int, days: int = 30, seed: int = 0
+) -> Dict[str, Any]:
+    """A usedirect ``Facility.Units[*].Slices`` response."""
+    rng = random.Random(f"{park_id}:{facility_id}:{start_date}:{sites}:{seed}")
+    start = datetime.date.fromisoformat(start_date)
+    units = {}
+    for i in range(sites):
+        slices = {}
+        for d in range(days):
+            day = (start + datetime.timedelta(days=d)).isoformat()
+            roll = rng.random()
+            slices[f"{day}T00:00:00"] = {
+                "Date": day,
+                "IsFree": roll < 0.2,
+                "IsBlocked": 0.9 < roll,
+                "IsWalkin": False,
+            }
+        units[str(i)] = {
+            "UnitId": 50_000 + i,
+            "Name": f"Site {i}",
+            "UnitTypeName": SITE_TYPES[i % len(SITE_TYPES)],
+            "Slices": slices,
+        }
+    return {"Facility": {"FacilityId": facility_id, "Name": "Main", "Units": units}}
+
+
+def facilities(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """RIDB facility records spread around the western US."""
+    rng = random.Random(f"facilities:{count}:{seed}")
+    return [
+        {
+            "FacilityID": str(230_000 + i),
+            "FacilityName": f"{rng.choice(['Pine', 'Lake', 'River', 'Ridge'])} Camp {i}",
+            "FacilityDescription": "Campground with tent and RV sites.",
+            "FacilityLatitude": round(rng.uniform(33.0, 45.0), 5),
+            "FacilityLongitude": round(rng.uniform(-123.0, -110.0), 5),
+            "LastUpdatedDate": "2024-01-01",
+        }
+        for i in range(count)
+    ]
@@ -0,0 +1,286 @@
+"""Benchmark suite for parsers, the scheduler tick and the Flask endpoints.
+
+Usage::
+
+    python benchmarks/run.py                 # run everything, record results
+    python benchmarks/run.py -k parse --check
+    python benchmarks/run.py --latency 0.05 --error-rate 0.02
+
+Upstream calls go to :class:`mock_server.MockUpstream`. Each case has a
+latency target (median milliseconds) or a throughput target (units per
+second). Every run is appended to ``benchmarks/history.jsonl`` with the
+current commit, and medians are compared with the most recent run from a
+different commit; ``--check`` exits non-zero on a missed target or a
+regression beyond ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HISTORY = os.path.join(os.path.dirname(__file__), "history.jsonl")
+sys.path.insert(0, ROOT)
+
+# The app reads configuration at import time: no rate limit against the
+# local mock, short backoff for injected errors and throwaway databases.
+os.environ.setdefault("RATE_LIMIT_PER_HOST", "100000")
+os.environ.setdefault("HTTP_BACKOFF", "0.01")
+os.environ.setdefault("DATABASE_URI", "sqlite://")
+os.environ.pop("AVAILABILITY_CACHE_PATH", None)
+# Time the views themselves, not the response cache in front of them.
+os.environ.setdefault("SEARCH_CACHE_TTL", "0")
+os.environ.setdefault("CA_AVAILABILITY_CACHE_TTL", "0")
+
+import payloads  # noqa: E402
+from mock_server import MockUpstream  # noqa: E402
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], int]  # returns units processed
+    unit: str = "call"
+    max_median_ms: float | None = None
+    min_throughput: float | None = None
+    repeat: int = 7
+    setup: Callable[[], None] | None = None  # runs before every iteration
+
+
+def _once(fn: Callable[[], Any]) -> Callable[[], int]:
+    def run() -> int:
+        fn()
+        return 1
+
+    return run
+
+
+def _parse_cases() -> List[Case]:
+    from campwatcher.matrix import AvailabilityMatrix
+    from campwatcher.providers import parse_usedirect
+
+    cases = []
+    for sites, n_months, target in [(10, 1, 5), (500, 3, 200), (2000, 6, 2000)]:
+        pages = [
+            json.loads(json.dumps(payloads.recgov_month("1", m, sites)))
+            for m in payloads.months("2024-05", n_months)
+        ]
+
+        def parse(pages: List[Dict[str, Any]] = pages) -> int:
+            AvailabilityMatrix.concat([AvailabilityMatrix.from_payload(p) for p in pages])
+            return len(pages)
+
+        cases.append(
+            Case(f"parse_recgov[{sites}x{n_months}]", parse, "page", max_median_ms=target)
+        )
+    grid = payloads.usedirect_grid("1", "2", "2024-06-01", 2000)
+    cases.append(
+        Case(
+            "parse_usedirect[2000x30]",
+            _once(lambda: parse_usedirect(grid)),
+            max_median_ms=400,
+        )
+    )
+    return cases
+
+
+def _upstream_cases(watchers: int) -> List[Case]:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import ranking
+    from app import app
+    from campwatcher import api
+    from campwatcher.models import Base, Watcher
+    from campwatcher.providers import RESERVE_CA, get_provider
+    from campwatcher.scheduling import run_watchers
+
+    month = "2024-06"
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(
+        Watcher(
+            campground_id=str(i % 20),
+            start_date=datetime.date(2024, 5, 15),
+            end_date=datetime.date(2024, 7, 15),
+            check_time="08:00",
+        )
+        for i in range(watchers)
+    )
+    session.commit()
+    rows = session.query(Watcher).all()
+    now = datetime.datetime(2024, 5, 1, 8, 0)
+    client = app.test_client()
+    cold = api.availability_cache.clear
+
+    def tick() -> int:
+        run_watchers(session, rows, now)
+        return len(rows)
+
+    def search() -> int:
+        assert client.get("/search?query=pine").status_code == 200
+        return 1
+
+    def ca_availability() -> int:
+        resp = client.get("/ca_availability?park_id=1&facility_id=2&start_date=2024-06-01")
+        assert resp.status_code == 200
+        return 1
+
+    return [
+        Case(
+            "difficulty_score",
+            _once(lambda: ranking.difficulty_score("1", month)),
+            max_median_ms=150,
+            setup=cold,
+        ),
+        Case(
+            "rank_sites_for_campground",
+            _once(lambda: ranking.rank_sites_for_campground("1", month)),
+            max_median_ms=150,
+            setup=cold,
+        ),
+        Case(
+            "check_availability",
+            _once(lambda: api.check_availability("1", month)),
+            max_median_ms=150,
+            setup=cold,
+        ),
+        Case(
+            f"scheduler_tick_cold[{watchers}]",
+            tick,
+            "watcher",
+            min_throughput=50,
+            repeat=5,
+            setup=cold,
+        ),
+        Case(f"scheduler_tick_warm[{watchers}]", tick, "watcher", min_throughput=250),
+        Case("flask_search", search, max_median_ms=100),
+        Case(
+            "flask_ca_availability",
+            ca_availability,
+            max_median_ms=200,
+            setup=get_provider(RESERVE_CA).cache.clear,
+        ),
+    ]
+
+
+def measure(case: Case) -> Dict[str, Any]:
+    if case.setup:
+        case.setup()
+    case.run()  # warm-up
+    times: List[float] = []
+    units = 0
+    for _ in range(case.repeat):
+        if case.setup:
+            case.setup()
+        started = time.perf_counter()
+        units = case.run()
+        times.append(time.perf_counter() - started)
+    median = statistics.median(times)
+    result = {
+        "median_ms": round(median * 1000, 3),
+        "max_ms": round(max(times) * 1000, 3),
+        "throughput": round(units / median, 1) if median else None,
+        "unit": case.unit,
+    }
+    too_slow = case.max_median_ms is not None and result["median_ms"] > case.max_median_ms
+    too_few = (
+        case.min_throughput is not None and (result["throughput"] or 0) < case.min_throughput
+    )
+    failed = too_slow or too_few
+    result["target_met"] = not failed
+    return result
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _previous(commit: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Results of the latest run from another commit with the same params."""
+    if not os.path.exists(HISTORY):
+        return {}
+    with open(HISTORY) as fh:
+        runs = [json.loads(line) for line in fh if line.strip()]
+    for run in reversed(runs):
+        if run["commit"] != commit and run["params"] == params:
+            return run["results"]
+    return {}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the campwatcher benchmarks.")
+    parser.add_argument("-k", default="", help="only run cases whose name contains this")
+    parser.add_argument("--sites", type=int, default=500, help="sites per mock payload")
+    parser.add_argument("--watchers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005, help="mock latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--check", action="store_true", help="fail on misses/regressions")
+    parser.add_argument("--no-record", action="store_true")
+    args = parser.parse_args(argv)
+
+    commit = _commit()
+    params = {
+        k: v for k, v in vars(args).items() if k not in {"k", "check", "no_record", "tolerance"}
+    }
+    previous = _previous(commit, params)
+    results: Dict[str, Dict[str, Any]] = {}
+    problems: List[str] = []
+    with MockUpstream(args.sites, args.latency, args.error_rate) as upstream:
+        upstream.install()
+        for case in _parse_cases() + _upstream_cases(args.watchers):
+            if args.k not in case.name:
+                continue
+            result = measure(case)
+            results[case.name] = result
+            before = previous.get(case.name, {}).get("median_ms")
+            change = ""
+            if before:
+                ratio = result["median_ms"] / before - 1
+                change = f"{ratio:+.0%}"
+                if ratio > args.tolerance:
+                    problems.append(f"{case.name} regressed {change} vs previous run")
+            if not result["target_met"]:
+                problems.append(f"{case.name} missed its target")
+            print(
+                f"{case.name:<32}{result['median_ms']:>10.2f} ms"
+                f"{result['throughput'] or 0:>12.1f} {case.unit}/s {change:>6}"
+                f"{'' if result['target_met'] else '  MISSED'}"
+            )
+
+    if not args.no_record and results:
+        entry = {
+            "commit": commit,
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "params": params,
+            "results": results,
+        }
+        with open(HISTORY, "a") as fh:
+            fh.write(json.dumps(entry) + "\n")
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if args.check and problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,3 +4,10 @@ CAMPGROUND_ATTRIBUTES = {
     "232450": {"tent_only": True, "no_rv": True},
     "234567": {"tent_only": False, "no_rv": False},
 }
+
+# Demo ZIP centroids, used when ZIP_CENTROIDS_PATH is not set
+ZIP_CENTROIDS = {
+    "94102": (37.7793, -122.4193),  # San Francisco
+    "10001": (40.7506, -73.9971),  # New York
+    "30301": (33.7525, -84.3915),  # Atlanta
+}
@@ -1,5 +1,15 @@
-"""Campwatcher package."""
+"""Campwatcher package.
 
-from . import api, config, models, scheduling
+Submodules are imported on first attribute access, so ``import campwatcher``
+(and any one submodule) only pays for what it actually uses.
+"""
+
+import importlib
 
 __all__ = ["api", "config", "models", "scheduling"]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,49 +1,187 @@
 """Helper functions for Recreation.gov endpoints."""
 
-from typing import Any, Dict, List, Optional
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 
+from .cache import AvailabilityCache
+from .client import client
 from .config import config
+from .matrix import AVAILABLE, AvailabilityMatrix
+from .metrics import cache_families, registry, timer
+from .search_index import get_index, haversine_km
+from .streaming import CHUNK_SIZE, iter_matching, match_sites
+
+KM_PER_MILE = 1.609344
+
+availability_cache = AvailabilityCache(
+    maxsize=config.cache_size, ttl=config.cache_ttl, db_path=config.cache_path
+)
+registry.add_collector(lambda: cache_families("recgov", availability_cache.stats()))
 
 
 def fetch_campgrounds(
-    query: str, lat: str | None = None, lon: str | None = None
+    query: str | None,
+    lat: str | None = None,
+    lon: str | None = None,
+    radius_km: float | None = None,
+) -> List[Dict[str, Any]]:
+    """Search for campgrounds, preferring the local facility index.
+
+    The Recreation.gov API is only queried when no index is configured or
+    the index has no match.
+    """
+    index = get_index()
+    if index is not None:
+        results = index.search(query, lat, lon, radius_km)
+        if results:
+            return results
+    return fetch_remote_campgrounds(query, lat, lon, radius_km)
+
+
+def fetch_remote_campgrounds(
+    query: str | None,
+    lat: str | None = None,
+    lon: str | None = None,
+    radius_km: float | None = None,
 ) -> List[Dict[str, Any]]:
-    """Search for campgrounds using the Recreation.gov API."""
-    params = {"query": query}
+    """Search for campgrounds using the Recreation.gov API.
+
+    With ``radius_km`` and a point, results are limited to facilities within
+    that distance and ordered by it, as the local index does.
+    """
+    params = {"query": query} if query else {}
     if lat and lon:
         params.update({"latitude": lat, "longitude": lon})
-    resp = requests.get(config.search_api, params=params)
+        if radius_km:
+            params["radius"] = radius_km / KM_PER_MILE
+    resp = client.get(config.search_api, params=params, endpoint="recgov_search")
     resp.raise_for_status()
-    data = resp.json()
-    return data.get("RECDATA", [])
+    results = resp.json().get("RECDATA", [])
+    if not (lat and lon and radius_km):
+        return results
+    near = []
+    for record in results:
+        f_lat, f_lon = record.get("FacilityLatitude"), record.get("FacilityLongitude")
+        if f_lat in (None, "") or f_lon in (None, ""):
+            continue
+        dist = haversine_km(float(lat), float(lon), float(f_lat), float(f_lon))
+        if dist <= radius_km:
+            near.append((dist, record))
+    near.sort(key=lambda pair: pair[0])
+    return [record for _, record in near]
+
+
+def _request_month(
+    campground_id: str, month_str: str, stream: bool = False
+) -> requests.Response:
+    start_date = f"{month_str}-01T00:00:00.000Z"
+    url = config.availability_api.format(campground_id=campground_id)
+    with timer("fetch"):
+        resp = client.get(
+            url,
+            params={"start_date": start_date},
+            endpoint="recgov_availability",
+            stream=stream,
+        )
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError:
+            resp.close()
+            raise
+    return resp
+
+
+def _fetch_month(campground_id: str, month_str: str) -> Dict[str, Any]:
+    resp = _request_month(campground_id, month_str)
+    with timer("json_decode"):
+        return resp.json()
+
+
+def stream_available(
+    campground_id: str,
+    month_str: str,
+    site_type: str | None = None,
+    statuses: Collection[int] = (AVAILABLE,),
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+) -> Iterator[Tuple[str, str]]:
+    """Yield matching ``(site_id, day)`` pairs straight off the response.
+
+    The month payload is never built or cached; use this for one-off checks
+    (``cli check``) where only a few site-days of a large campground matter.
+    A page that is already cached is filtered from memory instead.
+    """
+    payload = availability_cache.peek((str(campground_id), month_str))
+    if payload is not None:
+        sites = (payload.get("campsites") or {}).items()
+        yield from match_sites(sites, statuses, site_type, start, end)
+        return
+    resp = _request_month(str(campground_id), month_str, stream=True)
+    try:
+        with timer("json_decode"):
+            yield from iter_matching(
+                resp.iter_content(CHUNK_SIZE), statuses, site_type, start, end
+            )
+    finally:
+        resp.close()
+
+
+def fetch_availability(campground_id: str, month_str: str) -> Dict[str, Any]:
+    """Return raw availability JSON for a campground/month.
+
+    Results are shared through ``availability_cache``, so callers must treat
+    the returned dict as read-only.
+    """
+    key = (str(campground_id), month_str)
+    return availability_cache.get_or_fetch(
+        key, lambda: _fetch_month(str(campground_id), month_str)
+    )
+
+
+def month_range(start: datetime.date, end: datetime.date) -> List[str]:
+    """Return the YYYY-MM month pages covering ``start``..``end``."""
+    months: List[str] = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def fetch_months(
+    keys: Iterable[Tuple[str, str]],
+) -> Tuple[Dict[Tuple[str, str], Dict[str, Any]], Dict[Tuple[str, str], Exception]]:
+    """Fetch several (campground_id, month) pages concurrently.
+
+    Returns the payloads that succeeded and the errors for those that failed.
+    """
+    keys = list(dict.fromkeys(keys))
+    payloads: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    errors: Dict[Tuple[str, str], Exception] = {}
+    if not keys:
+        return payloads, errors
+    with ThreadPoolExecutor(max_workers=min(len(keys), config.fetch_concurrency)) as pool:
+        futures = {key: pool.submit(fetch_availability, *key) for key in keys}
+        for key, future in futures.items():
+            try:
+                payloads[key] = future.result()
+            except Exception as exc:  # noqa: BLE001
+                errors[key] = exc
+    return payloads, errors
 
 
 def check_availability(
     campground_id: str, month_str: str, site_type: str | None = None
 ) -> List[Dict[str, Any]]:
     """Return available site IDs for a campground/month with attributes."""
+    return parse_availability(fetch_availability(campground_id, month_str), site_type)
 
-    start_date = f"{month_str}-01T00:00:00.000Z"
-    url = config.availability_api.format(campground_id=campground_id)
-    resp = requests.get(url, params={"start_date": start_date})
-    resp.raise_for_status()
-    data = resp.json()
-    available: List[Dict[str, Any]] = []
-    for site_id, months in data.get("campsites", {}).items():
-        attrs: Dict[str, Any] = {}
-        if months.get("campsite_type"):
-            ctype = months.get("campsite_type", "")
-            if "TENT" in ctype.upper() and "RV" not in ctype.upper():
-                attrs["tent_only"] = True
-            if "RV" not in ctype.upper():
-                attrs["no_rv"] = True
-        for day, info in months.get("availabilities", {}).items():
-            if info == "Available":
-                if not site_type or months.get("campsite_type") == site_type:
-                    entry = {"site_id": site_id, "date": day}
-                    entry.update(attrs)
-                    available.append(entry)
-
-    return available
+
+def parse_availability(
+    data: Dict[str, Any], site_type: str | None = None
+) -> List[Dict[str, Any]]:
+    """Extract available site/date rows from a raw availability payload."""
+    return AvailabilityMatrix.from_payload(data).available_rows(site_type)
@@ -0,0 +1,258 @@
+"""Campground attribute store with bitmap indexes.
+
+Attributes live in a SQLite table alongside packed bitmaps for ``tent_only``,
+``no_rv`` and each site type, so a filter is a single bitwise AND over the
+relevant bitmaps. Nothing is read until the first lookup, which keeps import
+of this module cheap for the web and Streamlit processes.
+
+Import data with ``python -m campwatcher.attributes import <file>`` where the
+file is CSV, JSON (a list of objects) or NDJSON with ``campground_id``,
+``tent_only``, ``no_rv`` and an optional ``site_types`` list (``|``-separated
+in CSV).
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Set
+
+import numpy as np
+
+from .config import config
+
+_TRUE = {"1", "true", "yes", "y", "t"}
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE
+    return bool(value)
+
+
+def _site_types(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [t.strip() for t in value.split("|") if t.strip()]
+    return [str(t) for t in value]
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield attribute rows from a CSV, JSON or NDJSON file."""
+    if path.endswith(".csv"):
+        with open(path, newline="") as fh:
+            yield from csv.DictReader(fh)
+        return
+    with open(path) as fh:
+        first = fh.read(1)
+        fh.seek(0)
+        if first == "[":
+            yield from json.load(fh)
+        else:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class AttributeStore:
+    """SQLite-backed campground attributes with lazily loaded bitmaps."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._ids: List[str] = []
+        self._ordinal: Dict[str, int] = {}
+        self._bitmaps: Dict[str, np.ndarray] = {}
+
+    # -- storage ----------------------------------------------------------
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS campground_attributes ("
+                " ordinal INTEGER PRIMARY KEY,"
+                " campground_id TEXT UNIQUE NOT NULL,"
+                " tent_only INTEGER NOT NULL,"
+                " no_rv INTEGER NOT NULL,"
+                " site_types TEXT NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS attribute_bitmaps ("
+                " name TEXT PRIMARY KEY, size INTEGER NOT NULL, bits BLOB NOT NULL);"
+            )
+            self._conn = conn
+        return self._conn
+
+    def bulk_import(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Upsert rows in one transaction and rebuild the bitmaps."""
+        records = [
+            (
+                str(row["campground_id"]),
+                int(_flag(row.get("tent_only"))),
+                int(_flag(row.get("no_rv"))),
+                json.dumps(_site_types(row.get("site_types"))),
+            )
+            for row in rows
+        ]
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO campground_attributes"
+                    " (campground_id, tent_only, no_rv, site_types) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(campground_id) DO UPDATE SET"
+                    " tent_only = excluded.tent_only, no_rv = excluded.no_rv,"
+                    " site_types = excluded.site_types",
+                    records,
+                )
+                self._rebuild(conn)
+            self._loaded = False
+        return len(records)
+
+    def _rebuild(self, conn: sqlite3.Connection) -> None:
+        rows = conn.execute(
+            "SELECT ordinal, tent_only, no_rv, site_types FROM campground_attributes"
+        ).fetchall()
+        size = max((r[0] for r in rows), default=0) + 1
+        dense: Dict[str, np.ndarray] = {
+            "tent_only": np.zeros(size, dtype=bool),
+            "no_rv": np.zeros(size, dtype=bool),
+        }
+        for ordinal, tent_only, no_rv, types in rows:
+            dense["tent_only"][ordinal] = bool(tent_only)
+            dense["no_rv"][ordinal] = bool(no_rv)
+            for site_type in json.loads(types):
+                key = f"site_type:{site_type}"
+                if key not in dense:
+                    dense[key] = np.zeros(size, dtype=bool)
+                dense[key][ordinal] = True
+        conn.execute("DELETE FROM attribute_bitmaps")
+        conn.executemany(
+            "INSERT INTO attribute_bitmaps (name, size, bits) VALUES (?, ?, ?)",
+            [(name, size, np.packbits(bits).tobytes()) for name, bits in dense.items()],
+        )
+
+    # -- lazy index -------------------------------------------------------
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            conn = self._db()
+            ids: List[str] = []
+            ordinal: Dict[str, int] = {}
+            for pos, cid in conn.execute(
+                "SELECT ordinal, campground_id FROM campground_attributes"
+            ):
+                if pos >= len(ids):
+                    ids.extend([""] * (pos + 1 - len(ids)))
+                ids[pos] = cid
+                ordinal[cid] = pos
+            self._bitmaps = {
+                name: np.frombuffer(bits, dtype=np.uint8)
+                for name, size, bits in conn.execute(
+                    "SELECT name, size, bits FROM attribute_bitmaps"
+                )
+            }
+            self._ids = ids
+            self._ordinal = ordinal
+            self._loaded = True
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._ordinal)
+
+    # -- queries ----------------------------------------------------------
+    def get(self, campground_id: str) -> Dict[str, Any]:
+        """Return the attributes for one campground (empty if unknown)."""
+        self._ensure_loaded()
+        pos = self._ordinal.get(str(campground_id))
+        if pos is None:
+            return {}
+        byte, bit = divmod(pos, 8)
+        mask = 0x80 >> bit
+        attrs: Dict[str, Any] = {}
+        for name in ("tent_only", "no_rv"):
+            bits = self._bitmaps.get(name)
+            attrs[name] = bool(bits is not None and bits[byte] & mask)
+        return attrs
+
+    def _bitmap(self, name: str) -> np.ndarray:
+        bits = self._bitmaps.get(name)
+        if bits is None:
+            return np.zeros((len(self._ids) + 7) // 8, dtype=np.uint8)
+        return bits
+
+    def matching(
+        self,
+        tent_only: bool = False,
+        no_rv: bool = False,
+        site_types: Sequence[str] = (),
+    ) -> Set[str]:
+        """Return the IDs of every campground having all requested flags."""
+        self._ensure_loaded()
+        names = [n for n, on in (("tent_only", tent_only), ("no_rv", no_rv)) if on]
+        names += [f"site_type:{t}" for t in site_types]
+        if names:
+            bits = np.bitwise_and.reduce([self._bitmap(n) for n in names])
+            hits = np.flatnonzero(np.unpackbits(bits)[: len(self._ids)])
+        else:
+            hits = np.arange(len(self._ids))
+        return {self._ids[i] for i in hits.tolist() if self._ids[i]}
+
+    def filter_campgrounds(
+        self, camps: List[Dict[str, Any]], tent_only: bool = False, no_rv: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Keep search results whose ``FacilityID`` passes the filters."""
+        if not tent_only and not no_rv:
+            return camps
+        allowed = self.matching(tent_only=tent_only, no_rv=no_rv)
+        return [c for c in camps if str(c.get("FacilityID")) in allowed]
+
+
+_store: AttributeStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> AttributeStore:
+    """Return the process-wide store, opening it on first use.
+
+    Without ``ATTRIBUTES_DB`` an in-memory store is seeded from
+    :data:`campground_data.CAMPGROUND_ATTRIBUTES`.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if config.attributes_db:
+                    store = AttributeStore(config.attributes_db)
+                else:
+                    from campground_data import CAMPGROUND_ATTRIBUTES
+
+                    store = AttributeStore()
+                    store.bulk_import(
+                        {"campground_id": cid, **attrs}
+                        for cid, attrs in CAMPGROUND_ATTRIBUTES.items()
+                    )
+                _store = store
+    return _store
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage campground attributes.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="bulk import a CSV/JSON/NDJSON file")
+    imp.add_argument("path")
+    imp.add_argument("--db", default=config.attributes_db or "campground_attributes.db")
+    args = parser.parse_args(argv)
+    count = AttributeStore(args.db).bulk_import(read_rows(args.path))
+    print(f"Imported {count} campgrounds into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Bulk watcher import and streaming export.
+
+Imports accept NDJSON or a JSON array of :class:`WatcherCreate` objects.
+Every item is validated before anything is written; valid batches are
+inserted with their first ``next_run_at`` by :func:`db.insert_watchers` in
+one transaction. Exports stream rows as NDJSON from a server-side cursor,
+in the same shape the import accepts.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .models import Watcher
+from .schemas import WatcherCreate
+from .worker import next_run_time
+
+EXPORT_COLUMNS = (
+    Watcher.id,
+    Watcher.provider,
+    Watcher.campground_id,
+    Watcher.facility_id,
+    Watcher.site_type,
+    Watcher.tent_only,
+    Watcher.no_rv,
+    Watcher.loop,
+    Watcher.start_date,
+    Watcher.end_date,
+    Watcher.min_nights,
+    Watcher.check_time,
+    Watcher.email,
+    Watcher.next_run_at,
+)
+
+
+def iter_ndjson(lines: Iterable[bytes | str]) -> Iterator[Any]:
+    """Decode one JSON value per non-blank line.
+
+    Undecodable lines yield the ``JSONDecodeError`` so the caller can report
+    it alongside validation errors instead of aborting the stream.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield exc
+
+
+def validate_watchers(
+    items: Iterable[Any], now: datetime.datetime | None = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Validate every item; return insertable rows and per-item errors."""
+    now = now or datetime.datetime.now()
+    rows: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for index, item in enumerate(items):
+        if isinstance(item, json.JSONDecodeError):
+            errors.append({"index": index, "errors": [{"msg": str(item)}]})
+            continue
+        try:
+            model = WatcherCreate.model_validate(item)
+        except ValidationError as exc:
+            errors.append({"index": index, "errors": json.loads(exc.json(include_url=False))})
+            continue
+        row = model.model_dump()
+        row["next_run_at"] = next_run_time(model.check_time, now)
+        rows.append(row)
+    return rows, errors
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def export_ndjson(
+    session: Session, chunk_size: int = 500, include_email: bool = False
+) -> Iterator[str]:
+    """Yield every watcher as an NDJSON line, ``chunk_size`` rows per fetch.
+
+    Notification addresses are left out unless ``include_email`` is set.
+    """
+    columns = [c for c in EXPORT_COLUMNS if include_email or c is not Watcher.email]
+    names = [column.key for column in columns]
+    result = session.execute(
+        select(*columns)
+        .order_by(Watcher.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for row in result:
+        yield json.dumps({k: _jsonable(v) for k, v in zip(names, row)}) + "\n"
@@ -0,0 +1,202 @@
+"""In-process LRU/TTL cache with an optional SQLite tier."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _InFlight:
+    """A pending upstream call that other threads can wait on."""
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class AvailabilityCache:
+    """Bounded LRU cache with per-entry expiry and request coalescing.
+
+    Entries live in memory for ``ttl`` seconds. When ``db_path`` is set they
+    are also written to a SQLite table so a restarted process can reuse
+    payloads that are still fresh. Concurrent lookups for the same missing
+    key share a single call to ``fetch``.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 60.0,
+        db_path: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.db_path = db_path
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.coalesced = 0
+
+    # -- public API -------------------------------------------------------
+    def get_or_fetch(self, key: Tuple[str, str], fetch: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key`` or call ``fetch`` once."""
+        owner = False
+        with self._lock:
+            value = self._get_fresh(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                pending = _InFlight()
+                self._inflight[key] = pending
+                owner = True
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            stored_at, value = self._disk_get(key)
+            if value is None:
+                value = fetch()
+                stored_at = self._clock()
+                self._disk_put(key, stored_at, value)
+            with self._lock:
+                self._store(key, stored_at, value)
+            pending.value = value
+            return value
+        except BaseException as exc:
+            pending.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.event.set()
+
+    def peek(self, key: Tuple[str, str]) -> Any:
+        """Return the fresh in-memory value for ``key`` without fetching."""
+        with self._lock:
+            return self._get_fresh(key)
+
+    def put(self, key: Tuple[str, str], value: Any) -> None:
+        """Store a value fetched elsewhere, e.g. by a background poller."""
+        stored_at = self._clock()
+        self._disk_put(key, stored_at, value)
+        with self._lock:
+            self._store(key, stored_at, value)
+
+    def invalidate(self, key: Tuple[str, str]) -> None:
+        """Drop ``key`` from both tiers."""
+        with self._lock:
+            self._entries.pop(key, None)
+        conn = self._conn()
+        if conn is not None:
+            with self._db_lock:
+                conn.execute(
+                    "DELETE FROM availability_cache WHERE key = ?", (self._db_key(key),)
+                )
+                conn.commit()
+
+    def clear(self) -> None:
+        """Remove every in-memory entry and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+            self.disk_hits = self.coalesced = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_hits": self.disk_hits,
+                "coalesced": self.coalesced,
+                "size": len(self._entries),
+            }
+
+    # -- memory tier ------------------------------------------------------
+    def _get_fresh(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self._clock() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, stored_at: float, value: Any) -> None:
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # -- disk tier --------------------------------------------------------
+    @staticmethod
+    def _db_key(key: Tuple[str, str]) -> str:
+        return "|".join(str(part) for part in key)
+
+    def _conn(self) -> sqlite3.Connection | None:
+        if not self.db_path:
+            return None
+        if self._db is None:
+            with self._db_lock:
+                if self._db is None:
+                    conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS availability_cache ("
+                        "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, "
+                        "payload TEXT NOT NULL)"
+                    )
+                    conn.commit()
+                    self._db = conn
+        return self._db
+
+    def _disk_get(self, key: Tuple[str, str]) -> Tuple[float, Any]:
+        conn = self._conn()
+        if conn is None:
+            return 0.0, None
+        with self._db_lock:
+            row = conn.execute(
+                "SELECT stored_at, payload FROM availability_cache WHERE key = ?",
+                (self._db_key(key),),
+            ).fetchone()
+        if row is None or self._clock() - row[0] > self.ttl:
+            return 0.0, None
+        with self._lock:
+            self.disk_hits += 1
+        return row[0], json.loads(row[1])
+
+    def _disk_put(self, key: Tuple[str, str], stored_at: float, value: Any) -> None:
+        conn = self._conn()
+        if conn is None:
+            return
+        with self._db_lock:
+            conn.execute(
+                "INSERT OR REPLACE INTO availability_cache (key, stored_at, payload) "
+                "VALUES (?, ?, ?)",
+                (self._db_key(key), stored_at, json.dumps(value)),
+            )
+            conn.commit()
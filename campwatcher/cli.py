@@ -0,0 +1,137 @@
+"""Lightweight command line for one-off checks.
+
+Usage::
+
+    python -m campwatcher.cli check 232447 --start 2024-06-01 --end 2024-06-30
+    python -m campwatcher.cli check 627 --provider reserve_ca --facility 674 \\
+        --start 2024-06-01 --end 2024-06-07 --json
+    python -m campwatcher.cli check 232447 --start 2024-06-01 --end 2024-06-30 --nights 3
+    python -m campwatcher.cli run 12 13
+
+``check`` only loads the HTTP client and the availability providers; Flask,
+SQLAlchemy and APScheduler are never imported. Recreation.gov pages are
+streamed (:func:`campwatcher.api.stream_available`), so only the matching
+site-nights are ever held in memory. ``run`` evaluates stored
+watchers once (snapshots, notifications) and so loads the database layer,
+but still not the web app or a scheduler.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import sys
+from typing import Dict, List
+
+
+def _date(value: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an ISO date: {value}") from None
+
+
+def check(args: argparse.Namespace) -> int:
+    from .providers import RECGOV, get_provider
+
+    if args.end < args.start:
+        print("--end must not be before --start", file=sys.stderr)
+        return 2
+    if args.nights:
+        return _check_stays(args)
+    if args.provider == RECGOV:
+        rows = _stream_rows(args)
+    else:
+        provider = get_provider(args.provider)
+        matrix = provider.window(args.campground_id, args.facility, args.start, args.end)
+        rows = [
+            {"site_id": row["site_id"], "date": row["date"]}
+            for row in matrix.available_rows(args.site_type)
+        ]
+    if args.json:
+        json.dump(rows, sys.stdout)
+        print()
+    elif rows:
+        for row in rows:
+            print(f"{row['site_id']}\t{row['date'][:10]}")
+    else:
+        print("No availability", file=sys.stderr)
+    return 0 if rows else 1
+
+
+def _stream_rows(args: argparse.Namespace) -> List[Dict[str, str]]:
+    from .api import month_range, stream_available
+
+    rows = []
+    for month in month_range(args.start, args.end):
+        pairs = stream_available(
+            args.campground_id, month, args.site_type, start=args.start, end=args.end
+        )
+        rows.extend({"site_id": site_id, "date": day} for site_id, day in sorted(pairs))
+    return rows
+
+
+def _check_stays(args: argparse.Namespace) -> int:
+    from .stays import find_stays
+
+    stays = find_stays(
+        args.campground_id,
+        args.start,
+        args.end,
+        args.nights,
+        args.provider,
+        args.facility,
+        args.site_type,
+    )
+    if args.json:
+        json.dump([stay.to_dict() for stay in stays], sys.stdout)
+        print()
+    elif stays:
+        for stay in stays:
+            print(f"{stay.site_id}\t{stay.start}\t{stay.end}\t{stay.nights} nights")
+    else:
+        print(f"No stays of {args.nights} nights", file=sys.stderr)
+    return 0 if stays else 1
+
+
+def run(args: argparse.Namespace) -> int:
+    from .notify import get_dispatcher
+    from .scheduling import run_watcher_ids
+
+    run_watcher_ids(args.watcher_ids)
+    get_dispatcher().flush()
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a single campwatcher check.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    chk = sub.add_parser("check", help="print available site-nights for a campground")
+    chk.add_argument("campground_id", help="campground (recgov) or park (reserve_ca) ID")
+    chk.add_argument("--start", type=_date, required=True)
+    chk.add_argument("--end", type=_date, required=True)
+    chk.add_argument("--provider", choices=["recgov", "reserve_ca"], default="recgov")
+    chk.add_argument("--facility", help="facility ID (required for reserve_ca)")
+    chk.add_argument("--site-type", help="only sites of this campsite type")
+    chk.add_argument(
+        "--nights", type=int, help="print stays of at least this many consecutive nights"
+    )
+    chk.add_argument("--json", action="store_true", help="print rows as JSON")
+    chk.set_defaults(func=check)
+
+    rn = sub.add_parser("run", help="evaluate stored watchers once and notify")
+    rn.add_argument("watcher_ids", type=int, nargs="+")
+    rn.set_defaults(func=run)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
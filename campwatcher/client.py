@@ -0,0 +1,160 @@
+"""Pooled, retrying HTTP client shared by every upstream integration."""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import Config, config
+from .metrics import Family, LatencyHistogram, histogram_family, registry
+from .ratelimit import HostRateLimiter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry_after(resp: requests.Response) -> float | None:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """``requests.Session`` wrapper with timeouts, retries and rate limiting.
+
+    Connection-level errors and 429/5xx responses are retried with
+    exponential backoff and full jitter; a ``Retry-After`` header takes
+    precedence over the computed delay. Every request first takes a token
+    from the per-host bucket and its latency is recorded per endpoint.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        backoff_max: float = 30.0,
+        rate_per_host: float = 10.0,
+        pool_size: int = 20,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.limiter = HostRateLimiter(rate_per_host)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._sleep = sleep
+        self._latency: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.retried = 0
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "HttpClient":
+        return cls(
+            connect_timeout=cfg.http_connect_timeout,
+            read_timeout=cfg.http_read_timeout,
+            retries=cfg.http_retries,
+            backoff=cfg.http_backoff,
+            backoff_max=cfg.http_backoff_max,
+            rate_per_host=cfg.rate_limit_per_host,
+            pool_size=cfg.http_pool_size,
+        )
+
+    def histogram(self, endpoint: str) -> LatencyHistogram:
+        with self._lock:
+            hist = self._latency.get(endpoint)
+            if hist is None:
+                hist = self._latency[endpoint] = LatencyHistogram()
+            return hist
+
+    def latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return a snapshot of every endpoint's latency histogram."""
+        with self._lock:
+            endpoints = dict(self._latency)
+        return {name: hist.snapshot() for name, hist in endpoints.items()}
+
+    def metric_families(self) -> List[Family]:
+        return [
+            histogram_family(
+                "campwatcher_http_request_seconds",
+                "Upstream request latency per endpoint.",
+                "endpoint",
+                self.latency_stats(),
+            ),
+            (
+                "campwatcher_http_retries_total",
+                "counter",
+                "Upstream requests retried.",
+                [("", {}, self.retried)],
+            ),
+        ]
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2**attempt))
+
+    def get(
+        self,
+        url: str,
+        params: Dict[str, Any] | None = None,
+        endpoint: str | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """GET ``url`` with retries; the caller checks the final status."""
+        parsed = urlparse(url)
+        endpoint = endpoint or f"{parsed.netloc}{parsed.path}"
+        kwargs.setdefault("timeout", self.timeout)
+        hist = self.histogram(endpoint)
+        attempt = 0
+        while True:
+            self.limiter.acquire(parsed.netloc)
+            started = time.perf_counter()
+            try:
+                resp = self.session.get(url, params=params, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                hist.observe(time.perf_counter() - started)
+                if attempt >= self.retries:
+                    raise
+                delay = self._delay(attempt)
+                logger.warning("%s failed (%s); retrying in %.1fs", endpoint, exc, delay)
+            else:
+                hist.observe(time.perf_counter() - started)
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return resp
+                delay = _retry_after(resp)
+                if delay is None:
+                    delay = self._delay(attempt)
+                delay = min(self.backoff_max, delay)
+                logger.warning(
+                    "%s returned %s; retrying in %.1fs", endpoint, resp.status_code, delay
+                )
+                resp.close()
+            with self._lock:
+                self.retried += 1
+            self._sleep(delay)
+            attempt += 1
+
+
+client = HttpClient.from_config(config)
+registry.add_collector(client.metric_families)
@@ -14,6 +14,60 @@ class Config:
         "https://www.recreation.gov/api/camps/availability/campground/{campground_id}/month",
     )
     db_uri: str = os.getenv("DATABASE_URI", "sqlite:///watchers.db")
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    sqlite_busy_timeout: float = float(os.getenv("SQLITE_BUSY_TIMEOUT", "30"))
+    facility_index_db: str | None = os.getenv("FACILITY_INDEX_DB")
+    search_radius_km: float = float(os.getenv("SEARCH_RADIUS_KM", "80"))
+    attributes_db: str | None = os.getenv("ATTRIBUTES_DB")
+    zip_centroids_path: str | None = os.getenv("ZIP_CENTROIDS_PATH")
+    max_window_months: int = int(os.getenv("MAX_WINDOW_MONTHS", "12"))
+    cache_ttl: float = float(os.getenv("AVAILABILITY_CACHE_TTL", "60"))
+    cache_size: int = int(os.getenv("AVAILABILITY_CACHE_SIZE", "256"))
+    cache_path: str | None = os.getenv("AVAILABILITY_CACHE_PATH")
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+    response_cache_stale: float = float(os.getenv("RESPONSE_CACHE_STALE", "300"))
+    search_cache_ttl: float = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+    difficulty_cache_ttl: float = float(os.getenv("DIFFICULTY_CACHE_TTL", "600"))
+    ca_availability_cache_ttl: float = float(os.getenv("CA_AVAILABILITY_CACHE_TTL", "30"))
+    ca_update_time_cache_ttl: float = float(os.getenv("CA_UPDATE_TIME_CACHE_TTL", "60"))
+    http_connect_timeout: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    http_read_timeout: float = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+    http_retries: int = int(os.getenv("HTTP_RETRIES", "3"))
+    http_backoff: float = float(os.getenv("HTTP_BACKOFF", "0.5"))
+    http_backoff_max: float = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+    http_pool_size: int = int(os.getenv("HTTP_POOL_SIZE", "20"))
+    rate_limit_per_host: float = float(os.getenv("RATE_LIMIT_PER_HOST", "10"))
+    fetch_concurrency: int = int(os.getenv("FETCH_CONCURRENCY", "6"))
+    rank_concurrency: int = int(os.getenv("RANK_CONCURRENCY", "8"))
+    live_poll_seconds: float = float(os.getenv("LIVE_POLL_SECONDS", "60"))
+    notify_sink: str = os.getenv("NOTIFY_SINK", "smtp")
+    smtp_host: str = os.getenv("SMTP_HOST", "localhost")
+    smtp_port: int = int(os.getenv("SMTP_PORT", "25"))
+    smtp_pool_size: int = int(os.getenv("SMTP_POOL_SIZE", "2"))
+    mail_from: str = os.getenv("MAIL_FROM", "noreply@example.com")
+    notify_digest_seconds: float = float(os.getenv("NOTIFY_DIGEST_SECONDS", "30"))
+    notify_retries: int = int(os.getenv("NOTIFY_RETRIES", "3"))
+    ca_response_days: int = int(os.getenv("CA_RESPONSE_DAYS", "30"))
+    ca_burst_seconds: float = float(os.getenv("CA_BURST_SECONDS", "5"))
+    ca_burst_lead_seconds: float = float(os.getenv("CA_BURST_LEAD_SECONDS", "30"))
+    ca_burst_window_seconds: float = float(os.getenv("CA_BURST_WINDOW_SECONDS", "300"))
+    ca_idle_seconds: float = float(os.getenv("CA_IDLE_SECONDS", "900"))
+    ca_release_refresh_seconds: float = float(
+        os.getenv("CA_RELEASE_REFRESH_SECONDS", "21600")
+    )
+    worker_batch_size: int = int(os.getenv("WORKER_BATCH_SIZE", "200"))
+    worker_lease_seconds: int = int(os.getenv("WORKER_LEASE_SECONDS", "300"))
+    worker_poll_seconds: float = float(os.getenv("WORKER_POLL_SECONDS", "15"))
+    history_db: str | None = os.getenv("HISTORY_DB")
+    history_sample_seconds: float = float(os.getenv("HISTORY_SAMPLE_SECONDS", "900"))
+    history_raw_days: float = float(os.getenv("HISTORY_RAW_DAYS", "7"))
+    history_max_age: float = float(os.getenv("HISTORY_MAX_AGE", "3600"))
+    snapshot_prune_seconds: float = float(os.getenv("SNAPSHOT_PRUNE_SECONDS", "3600"))
+    profile_watchers: str = os.getenv("PROFILE_WATCHERS", "")
+    embedded_worker: bool = os.getenv("EMBEDDED_WORKER", "false").lower() == "true"
+    admin_token: str | None = os.getenv("ADMIN_TOKEN")
 
 
 config = Config()
@@ -0,0 +1,180 @@
+"""Engine, pooling and session management for the watcher database.
+
+Nothing touches the database at import time. The engine is built on first
+use from ``DATABASE_URI``, which also brings the schema up to date once per
+process (missing tables, columns and indexes; see :func:`init_db`):
+
+* SQLite files run in WAL mode with a busy timeout, so readers never block
+  the writer and concurrent writers wait instead of failing with "database
+  is locked"; in-memory SQLite shares one connection across threads.
+* Other backends (e.g. Postgres) get a real ``QueuePool`` with pre-ping and
+  recycling.
+
+``SessionLocal`` is a thread-local ``scoped_session``; :func:`session_scope`
+wraps a unit of work with commit/rollback and releases the session.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List
+
+from sqlalchemy import create_engine, event, insert, inspect, select
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from .config import config
+from .models import Base, Watcher
+
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+_factory = sessionmaker()
+
+
+def _sqlite_pragmas(memory: bool):
+    def on_connect(dbapi_conn: Any, _record: Any) -> None:
+        cursor = dbapi_conn.cursor()
+        if not memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout * 1000)}")
+        cursor.close()
+
+    return on_connect
+
+
+def make_engine(uri: str) -> Engine:
+    """Create an engine tuned for ``uri``'s backend."""
+    url = make_url(uri)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            uri,
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_recycle=config.db_pool_recycle,
+            pool_pre_ping=True,
+        )
+    memory = url.database in (None, "", ":memory:")
+    kwargs: Dict[str, Any] = {
+        "connect_args": {
+            "check_same_thread": False,
+            "timeout": config.sqlite_busy_timeout,
+        }
+    }
+    if memory:
+        kwargs["poolclass"] = StaticPool
+    else:
+        kwargs.update(pool_size=config.db_pool_size, max_overflow=config.db_max_overflow)
+    engine = create_engine(uri, **kwargs)
+    event.listen(engine, "connect", _sqlite_pragmas(memory))
+    return engine
+
+
+# Columns renamed since they were first released: table -> {old: new}.
+_RENAMED_COLUMNS: Dict[str, Dict[str, str]] = {
+    "watcher_snapshots": {"month": "window"},
+}
+
+
+def _upgrade(engine: Engine) -> None:
+    """Bring tables created by older releases up to the current models.
+
+    ``create_all`` never alters an existing table, so renamed columns are
+    renamed and missing ones added with ``ALTER TABLE``. New columns that
+    are ``NOT NULL`` must carry a ``server_default`` to fill existing rows.
+    """
+    existing = set(inspect(engine).get_table_names())
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                continue
+            present = {c["name"] for c in inspect(conn).get_columns(table.name)}
+            for old, new in _RENAMED_COLUMNS.get(table.name, {}).items():
+                if old in present and new not in present:
+                    conn.exec_driver_sql(
+                        f"ALTER TABLE {quote(table.name)} "
+                        f"RENAME COLUMN {quote(old)} TO {quote(new)}"
+                    )
+                    present = (present - {old}) | {new}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                ddl = f"{quote(column.name)} {column.type.compile(engine.dialect)}"
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    if isinstance(default, str):
+                        default = "'" + default.replace("'", "''") + "'"
+                    else:
+                        default = default.text
+                    ddl += f" DEFAULT {default}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                conn.exec_driver_sql(f"ALTER TABLE {quote(table.name)} ADD COLUMN {ddl}")
+
+
+def init_db(engine: Engine) -> None:
+    """Create missing tables, upgrade existing ones, then add missing indexes."""
+    Base.metadata.create_all(engine)
+    _upgrade(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+def get_engine() -> Engine:
+    """Return the process-wide engine, creating it and the schema on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = make_engine(config.db_uri)
+                init_db(engine)
+                _factory.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+
+def _new_session() -> Session:
+    get_engine()
+    return _factory()
+
+
+SessionLocal = scoped_session(_new_session)
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Thread-local session committed on success and removed afterwards."""
+    session = SessionLocal()
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        SessionLocal.remove()
+
+
+def insert_watchers(session: Session, rows: Iterable[Dict[str, Any]]) -> List[int]:
+    """Insert many watchers in one batched statement; return their IDs in order."""
+    rows = list(rows)
+    if not rows:
+        return []
+    result = session.execute(
+        insert(Watcher).returning(Watcher.id, sort_by_parameter_order=True), rows
+    )
+    return list(result.scalars())
+
+
+def load_watchers(session: Session, ids: Iterable[int]) -> List[Watcher]:
+    """Load a batch of watchers with a single ``IN`` query, in ID order."""
+    ids = list(ids)
+    if not ids:
+        return []
+    return list(
+        session.scalars(select(Watcher).where(Watcher.id.in_(ids)).order_by(Watcher.id))
+    )
@@ -0,0 +1,133 @@
+"""Per-watcher availability snapshots and newly-opened site diffing."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:  # the ORM is only needed by the storage helpers below
+    from sqlalchemy.orm import Session
+
+    from .models import WatcherSnapshot
+
+
+@dataclass
+class Snapshot:
+    """A boolean sites x days mask of the cells a watcher cares about."""
+
+    site_ids: List[str]
+    day_keys: List[str]
+    bits: np.ndarray
+
+    def pack(self) -> bytes:
+        return np.packbits(self.bits, axis=None).tobytes()
+
+    @classmethod
+    def unpack(cls, site_ids: List[str], day_keys: List[str], data: bytes) -> "Snapshot":
+        shape = (len(site_ids), len(day_keys))
+        flat = np.unpackbits(
+            np.frombuffer(data, dtype=np.uint8), count=shape[0] * shape[1]
+        )
+        return cls(site_ids, day_keys, flat.reshape(shape).astype(bool))
+
+
+def newly_available(
+    previous: Snapshot | None, current: Snapshot
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return row/column indexes in ``current`` that were not set before.
+
+    Sites or days missing from ``previous`` count as previously unavailable.
+    """
+    if previous is None:
+        return np.nonzero(current.bits)
+    prev_rows = {site: i for i, site in enumerate(previous.site_ids)}
+    prev_cols = {day: j for j, day in enumerate(previous.day_keys)}
+    rows = np.array([prev_rows.get(s, -1) for s in current.site_ids], dtype=np.intp)
+    cols = np.array([prev_cols.get(d, -1) for d in current.day_keys], dtype=np.intp)
+
+    aligned = np.zeros(current.bits.shape, dtype=bool)
+    row_ok = rows >= 0
+    col_ok = cols >= 0
+    if row_ok.any() and col_ok.any():
+        aligned[np.ix_(row_ok, col_ok)] = previous.bits[np.ix_(rows[row_ok], cols[col_ok])]
+    return np.nonzero(current.bits & ~aligned)
+
+
+def load_snapshot(
+    session: Session, watcher_id: int, window: str
+) -> Tuple[WatcherSnapshot | None, Snapshot | None]:
+    """Return the stored row and its decoded snapshot, if any."""
+    from .models import WatcherSnapshot
+
+    row = session.get(WatcherSnapshot, (watcher_id, window))
+    if row is None:
+        return None, None
+    snapshot = Snapshot.unpack(json.loads(row.site_ids), json.loads(row.day_keys), row.bits)
+    return row, snapshot
+
+
+def prefetch_snapshots(
+    session: Session, watcher_ids: Iterable[int]
+) -> Dict[Tuple[int, str], Tuple[WatcherSnapshot, str, Snapshot]]:
+    """Load and decode every stored snapshot of a batch with one query.
+
+    The hash is read up front because rows expire when each watcher's
+    update is committed.
+    """
+    from .models import WatcherSnapshot
+
+    ids = list(watcher_ids)
+    if not ids:
+        return {}
+    rows = session.query(WatcherSnapshot).filter(WatcherSnapshot.watcher_id.in_(ids))
+    return {
+        (row.watcher_id, row.window): (
+            row,
+            row.payload_hash,
+            Snapshot.unpack(json.loads(row.site_ids), json.loads(row.day_keys), row.bits),
+        )
+        for row in rows
+    }
+
+
+def save_snapshot(
+    session: Session,
+    row: WatcherSnapshot | None,
+    watcher_id: int,
+    campground_id: str,
+    window: str,
+    payload_hash: str,
+    snapshot: Snapshot,
+) -> None:
+    """Insert or update the stored snapshot for a watcher and window.
+
+    A new window replaces the watcher's older ones, e.g. when a watcher
+    without a ``start_date`` rolls over into the next month.
+    """
+    if row is None:
+        from .models import WatcherSnapshot
+
+        session.query(WatcherSnapshot).filter(
+            WatcherSnapshot.watcher_id == watcher_id, WatcherSnapshot.window != window
+        ).delete(synchronize_session=False)
+        row = WatcherSnapshot(watcher_id=watcher_id, window=window)
+        session.add(row)
+    row.campground_id = campground_id
+    row.payload_hash = payload_hash
+    row.site_ids = json.dumps(snapshot.site_ids)
+    row.day_keys = json.dumps(snapshot.day_keys)
+    row.bits = snapshot.pack()
+
+
+def prune_snapshots(session: Session) -> int:
+    """Delete snapshots whose watcher no longer exists; return how many."""
+    from .models import Watcher, WatcherSnapshot
+
+    return (
+        session.query(WatcherSnapshot)
+        .filter(~WatcherSnapshot.watcher_id.in_(session.query(Watcher.id)))
+        .delete(synchronize_session=False)
+    )
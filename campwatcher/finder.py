@@ -0,0 +1,112 @@
+"""Concurrent campground search with date-pattern matching.
+
+Each campground's month page is fetched and parsed once (through the shared
+provider cache), and both its difficulty score and the site-nights matching
+a :class:`DatePattern` are computed from that one matrix. Consecutive-night
+matching uses the same run index as stay search
+(:class:`campwatcher.stays.StayIndex`). :func:`search`
+yields results in completion order so interfaces can render them as they
+arrive.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from .config import config
+from .matrix import WEEKEND, AvailabilityMatrix
+from .providers import RECGOV, get_provider
+from .stays import StayIndex
+
+
+@dataclass(frozen=True)
+class DatePattern:
+    """Stays of ``nights`` consecutive nights starting on one of ``weekdays``.
+
+    ``weekdays`` uses Monday as 0 and ``None`` allows any start night.
+    """
+
+    weekdays: Tuple[int, ...] | None = None
+    nights: int = 1
+
+    @classmethod
+    def weekend_nights(cls) -> "DatePattern":
+        """Any single Friday or Saturday night."""
+        return cls(WEEKEND, 1)
+
+    @classmethod
+    def full_weekend(cls) -> "DatePattern":
+        """Friday and Saturday night at the same site."""
+        return cls((4,), 2)
+
+    @classmethod
+    def on_weekdays(cls, weekdays: Iterable[int], nights: int = 1) -> "DatePattern":
+        """Stays of ``nights`` nights starting on any of ``weekdays``."""
+        return cls(tuple(sorted(set(weekdays))), nights)
+
+    def starts(self, matrix: AvailabilityMatrix) -> np.ndarray:
+        """Boolean sites x days mask of nights a matching stay can start on."""
+        mask = StayIndex.from_matrix(matrix).starts(self.nights)
+        if self.weekdays is not None:
+            mask &= matrix.weekday_mask(self.weekdays)[None, :]
+        return mask
+
+    def match(self, matrix: AvailabilityMatrix) -> List[Tuple[str, str]]:
+        """``(site_id, first night)`` for every matching stay."""
+        rows, cols = np.nonzero(self.starts(matrix))
+        return [
+            (matrix.site_ids[i], str(matrix.dates[j]))
+            for i, j in zip(rows.tolist(), cols.tolist())
+        ]
+
+
+@dataclass
+class CampgroundResult:
+    """Score and pattern matches for one campground, or why it failed."""
+
+    campground_id: str
+    difficulty: float | None = None
+    matches: List[Tuple[str, str]] = field(default_factory=list)
+    error: str | None = None
+
+
+def evaluate(
+    campground_id: str, month: str, pattern: DatePattern | None = None
+) -> CampgroundResult:
+    """Score one campground and match ``pattern`` from a single fetch."""
+    matrix = get_provider(RECGOV).load((str(campground_id), month))
+    return CampgroundResult(
+        str(campground_id),
+        matrix.difficulty_score(),
+        pattern.match(matrix) if pattern else [],
+    )
+
+
+def search(
+    campground_ids: Iterable[str],
+    month: str,
+    pattern: DatePattern | None = None,
+    concurrency: int | None = None,
+) -> Iterator[CampgroundResult]:
+    """Evaluate campgrounds concurrently, yielding each result as it completes.
+
+    Failures are yielded as results with ``error`` set. Closing the iterator
+    early cancels campgrounds that have not started yet.
+    """
+    ids = list(dict.fromkeys(str(cid) for cid in campground_ids))
+    if not ids:
+        return
+    pool = ThreadPoolExecutor(max_workers=min(len(ids), concurrency or config.rank_concurrency))
+    try:
+        futures = {pool.submit(evaluate, cid, month, pattern): cid for cid in ids}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as exc:  # noqa: BLE001
+                yield CampgroundResult(futures[future], error=str(exc))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,371 @@
+"""Availability history: an append-only time series of demand per campground.
+
+Each sample records, for one campground month page, the fraction of reported
+site-days that were available plus every site's own availability rate
+(quantized to one byte per site). Samples are appended by the worker's
+sampler every ``HISTORY_SAMPLE_SECONDS`` and opportunistically whenever a
+ranking query has to fetch live data; raw samples older than
+``HISTORY_RAW_DAYS`` are downsampled into hourly averages.
+
+Alongside the raw series, :meth:`HistoryStore.record` keeps one precomputed
+aggregate row per campground month (current difficulty, trend-projected
+difficulty and time-to-book), so ranking reads a single row instead of
+fetching and parsing a payload.
+
+The store is enabled by ``HISTORY_DB``; :func:`get_history` returns ``None``
+otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .config import config
+from .matrix import AvailabilityMatrix
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 86400
+TREND_WINDOW = 7 * DAY  # samples used for the trend fit, and how far it projects
+BOOKED_FRACTION = 0.5  # time-to-book: until this share of peak availability is gone
+
+
+@dataclass
+class HistoryAggregate:
+    """Precomputed demand figures for one campground month."""
+
+    campground_id: str
+    month: str
+    ts: float
+    difficulty: float
+    trend: float
+    time_to_book: float | None
+    samples: int
+
+
+def _quantize(rates: np.ndarray) -> bytes:
+    return np.round(np.clip(rates, 0.0, 1.0) * 255).astype(np.uint8).tobytes()
+
+
+def _dequantize(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.uint8) / 255.0
+
+
+def trend_difficulty(series: List[Tuple[float, float]], horizon: float = TREND_WINDOW) -> float:
+    """Difficulty projected ``horizon`` seconds past the last ``(ts, ratio)`` sample.
+
+    A least-squares line through the availability ratios is extended forward,
+    so a campground whose availability is draining scores harder than its
+    current snapshot suggests. One sample projects to itself.
+    """
+    if not series:
+        return 1.0
+    ts = np.array([t for t, _ in series], dtype=float)
+    ratios = np.array([r for _, r in series], dtype=float)
+    if len(series) < 2 or ts[-1] == ts[0]:
+        projected = ratios[-1]
+    else:
+        slope, intercept = np.polyfit(ts - ts[0], ratios, 1)
+        projected = intercept + slope * (ts[-1] - ts[0] + horizon)
+    return float(1.0 - np.clip(projected, 0.0, 1.0))
+
+
+def time_to_book(
+    series: List[Tuple[float, float]], fraction: float = BOOKED_FRACTION
+) -> float | None:
+    """Seconds from peak availability until ``fraction`` of it was booked.
+
+    ``None`` when nothing has been available yet or the drop hasn't happened.
+    """
+    if not series:
+        return None
+    peak_ts, peak = max(series, key=lambda s: (s[1], -s[0]))
+    if peak <= 0:
+        return None
+    threshold = peak * (1.0 - fraction)
+    for ts, ratio in series:
+        if ts > peak_ts and ratio <= threshold:
+            return ts - peak_ts
+    return None
+
+
+class HistoryStore:
+    """SQLite-backed availability time series with precomputed aggregates."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, timeout=config.sqlite_busy_timeout
+            )
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                " campground_id TEXT NOT NULL, month TEXT NOT NULL, ts INTEGER NOT NULL,"
+                " ratio REAL NOT NULL, total INTEGER NOT NULL, n INTEGER NOT NULL,"
+                " PRIMARY KEY (campground_id, month, ts)) WITHOUT ROWID;"
+                "CREATE TABLE IF NOT EXISTS site_sets ("
+                " id INTEGER PRIMARY KEY, campground_id TEXT NOT NULL,"
+                " month TEXT NOT NULL, site_ids TEXT NOT NULL,"
+                " UNIQUE (campground_id, month, site_ids));"
+                "CREATE TABLE IF NOT EXISTS site_samples ("
+                " campground_id TEXT NOT NULL, month TEXT NOT NULL, ts INTEGER NOT NULL,"
+                " site_set INTEGER NOT NULL, rates BLOB NOT NULL,"
+                " PRIMARY KEY (campground_id, month, ts)) WITHOUT ROWID;"
+                "CREATE TABLE IF NOT EXISTS aggregates ("
+                " campground_id TEXT NOT NULL, month TEXT NOT NULL, ts INTEGER NOT NULL,"
+                " difficulty REAL NOT NULL, trend REAL NOT NULL, time_to_book REAL,"
+                " samples INTEGER NOT NULL, site_set INTEGER NOT NULL, rates BLOB NOT NULL,"
+                " PRIMARY KEY (campground_id, month)) WITHOUT ROWID;"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _site_set(self, conn: sqlite3.Connection, cid: str, month: str, ids: str) -> int:
+        conn.execute(
+            "INSERT OR IGNORE INTO site_sets (campground_id, month, site_ids) VALUES (?, ?, ?)",
+            (cid, month, ids),
+        )
+        return conn.execute(
+            "SELECT id FROM site_sets WHERE campground_id = ? AND month = ? AND site_ids = ?",
+            (cid, month, ids),
+        ).fetchone()[0]
+
+    def _series(
+        self, conn: sqlite3.Connection, cid: str, month: str, since: float, until: float
+    ) -> List[Tuple[float, float]]:
+        return conn.execute(
+            "SELECT ts, ratio FROM samples WHERE campground_id = ? AND month = ?"
+            " AND ts >= ? AND ts <= ? ORDER BY ts",
+            (cid, month, since, until),
+        ).fetchall()
+
+    def record(
+        self,
+        campground_id: str,
+        month: str,
+        matrix: AvailabilityMatrix,
+        ts: float | None = None,
+    ) -> HistoryAggregate:
+        """Append a sample for ``matrix`` and refresh the campground's aggregate."""
+        cid = str(campground_id)
+        ts = int(time.time() if ts is None else ts)
+        total = int(np.count_nonzero(matrix.status))
+        ratio = 1.0 - matrix.difficulty_score() if total else 0.0
+        rates = _quantize(matrix.site_rates())
+        ids = json.dumps(matrix.site_ids.tolist())
+        with self._lock:
+            conn = self._db()
+            with conn:
+                site_set = self._site_set(conn, cid, month, ids)
+                conn.execute(
+                    "INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?, 1)",
+                    (cid, month, ts, ratio, total),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO site_samples VALUES (?, ?, ?, ?, ?)",
+                    (cid, month, ts, site_set, rates),
+                )
+                full = self._series(conn, cid, month, 0, ts)
+                recent = [s for s in full if s[0] >= ts - TREND_WINDOW]
+                aggregate = HistoryAggregate(
+                    cid,
+                    month,
+                    ts,
+                    1.0 - ratio,
+                    trend_difficulty(recent),
+                    time_to_book(full),
+                    len(full),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        cid,
+                        month,
+                        ts,
+                        aggregate.difficulty,
+                        aggregate.trend,
+                        aggregate.time_to_book,
+                        aggregate.samples,
+                        site_set,
+                        rates,
+                    ),
+                )
+        return aggregate
+
+    def latest(
+        self,
+        campground_id: str,
+        month: str,
+        max_age: float | None = None,
+        now: float | None = None,
+    ) -> HistoryAggregate | None:
+        """The precomputed aggregate, or ``None`` if missing or older than ``max_age``."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT ts, difficulty, trend, time_to_book, samples FROM aggregates"
+                " WHERE campground_id = ? AND month = ?",
+                (str(campground_id), month),
+            ).fetchone()
+        if row is None:
+            return None
+        if max_age is not None and (now or time.time()) - row[0] > max_age:
+            return None
+        return HistoryAggregate(str(campground_id), month, *row)
+
+    def latest_sites(
+        self, campground_id: str, month: str
+    ) -> List[Tuple[str, float]] | None:
+        """Sites of the latest sample ranked by availability, least available first."""
+        with self._lock:
+            conn = self._db()
+            row = conn.execute(
+                "SELECT s.site_ids, a.rates FROM aggregates a"
+                " JOIN site_sets s ON s.id = a.site_set"
+                " WHERE a.campground_id = ? AND a.month = ?",
+                (str(campground_id), month),
+            ).fetchone()
+        if row is None:
+            return None
+        ids = json.loads(row[0])
+        rates = _dequantize(row[1])
+        order = np.argsort(rates, kind="stable")
+        return [(ids[i], float(rates[i])) for i in order]
+
+    def series(
+        self,
+        campground_id: str,
+        month: str,
+        since: float = 0,
+        until: float | None = None,
+    ) -> List[Tuple[float, float]]:
+        """``(ts, availability ratio)`` samples, oldest first."""
+        with self._lock:
+            return self._series(
+                self._db(), str(campground_id), month, since, until or time.time()
+            )
+
+    def site_series(
+        self, campground_id: str, month: str, site_id: str, since: float = 0
+    ) -> List[Tuple[float, float]]:
+        """``(ts, availability rate)`` samples of one site, oldest first."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT ss.ts, s.site_ids, ss.rates FROM site_samples ss"
+                " JOIN site_sets s ON s.id = ss.site_set"
+                " WHERE ss.campground_id = ? AND ss.month = ? AND ss.ts >= ?"
+                " ORDER BY ss.ts",
+                (str(campground_id), month, since),
+            ).fetchall()
+        positions: Dict[str, int] = {}
+        out: List[Tuple[float, float]] = []
+        for ts, ids, blob in rows:
+            if ids not in positions:
+                decoded = json.loads(ids)
+                positions[ids] = decoded.index(site_id) if site_id in decoded else -1
+            i = positions[ids]
+            if i >= 0:
+                out.append((ts, blob[i] / 255.0))
+        return out
+
+    def downsample(self, now: float | None = None, raw_seconds: float | None = None) -> int:
+        """Merge samples older than ``raw_seconds`` into one row per hour.
+
+        Returns the number of rows removed. Already-merged hours are left as
+        they are, so this is cheap to run on every sampler tick.
+        """
+        if raw_seconds is None:
+            raw_seconds = config.history_raw_days * DAY
+        cutoff = int((now or time.time()) - raw_seconds) // HOUR * HOUR
+        removed = 0
+        with self._lock:
+            conn = self._db()
+            with conn:
+                rows = conn.execute(
+                    "SELECT campground_id, month, ts, ratio, total, n FROM samples"
+                    " WHERE ts < ? ORDER BY campground_id, month, ts",
+                    (cutoff,),
+                ).fetchall()
+                hours: Dict[Tuple[str, str, int], List[tuple]] = defaultdict(list)
+                for row in rows:
+                    hours[(row[0], row[1], row[2] // HOUR * HOUR)].append(row)
+                for (cid, month, hour), group in hours.items():
+                    if len(group) == 1 and group[0][2] == hour:
+                        continue
+                    weights = np.array([r[5] for r in group], dtype=float)
+                    ratio = float(np.average([r[3] for r in group], weights=weights))
+                    total = int(round(np.average([r[4] for r in group], weights=weights)))
+                    sites = conn.execute(
+                        "SELECT site_set, rates FROM site_samples WHERE campground_id = ?"
+                        " AND month = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                        (cid, month, hour, hour + HOUR),
+                    ).fetchall()
+                    bounds = (cid, month, hour, hour + HOUR)
+                    conn.execute(
+                        "DELETE FROM samples WHERE campground_id = ? AND month = ?"
+                        " AND ts >= ? AND ts < ?",
+                        bounds,
+                    )
+                    conn.execute(
+                        "DELETE FROM site_samples WHERE campground_id = ? AND month = ?"
+                        " AND ts >= ? AND ts < ?",
+                        bounds,
+                    )
+                    conn.execute(
+                        "INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)",
+                        (cid, month, hour, ratio, total, int(weights.sum())),
+                    )
+                    if sites:
+                        # Average the sites of the hour's last site set.
+                        site_set = sites[-1][0]
+                        blobs = [_dequantize(b) for s, b in sites if s == site_set]
+                        conn.execute(
+                            "INSERT INTO site_samples VALUES (?, ?, ?, ?, ?)",
+                            (cid, month, hour, site_set, _quantize(np.mean(blobs, axis=0))),
+                        )
+                    removed += len(group) - 1
+        return removed
+
+
+def sample(
+    store: HistoryStore, targets: Iterable[Tuple[str, str]], ts: float | None = None
+) -> int:
+    """Fetch each ``(campground_id, month)`` once and record it; return the count."""
+    from .providers import RECGOV, get_provider
+
+    keys = list(dict.fromkeys((str(cid), month) for cid, month in targets))
+    matrices, errors = get_provider(RECGOV).fetch_many(keys)
+    for key, exc in errors.items():
+        logger.warning("History sample for %s failed: %s", key, exc)
+    for (cid, month), matrix in matrices.items():
+        store.record(cid, month, matrix, ts)
+    return len(matrices)
+
+
+_history: HistoryStore | None = None
+_history_lock = threading.Lock()
+
+
+def get_history() -> HistoryStore | None:
+    """Return the process-wide store, or ``None`` if ``HISTORY_DB`` is unset."""
+    global _history
+    if _history is None and config.history_db:
+        with _history_lock:
+            if _history is None:
+                _history = HistoryStore(config.history_db)
+    return _history
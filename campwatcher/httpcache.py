@@ -0,0 +1,232 @@
+"""Response caching and conditional requests for read-only Flask routes.
+
+Decorate a view with :meth:`ResponseCache.cached` to keep its successful
+``GET`` responses for ``ttl`` seconds, keyed by path and query string. Every
+cached response carries a strong ``ETag``, ``Last-Modified`` and
+``Cache-Control``, and requests whose ``If-None-Match`` (or
+``If-Modified-Since``) still match get an empty ``304``. Concurrent misses
+for the same key wait for a single render, as in ``AvailabilityCache``.
+
+For ``stale`` seconds after expiry the old response is still served while a
+single background refresh re-runs the view, so upstream latency stays off
+the request path for popular URLs. Hit/miss/stale/revalidation counters are
+reported through ``/metrics``.
+"""
+
+from __future__ import annotations
+
+import datetime
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Set, Tuple
+
+from flask import Response, current_app, request
+
+from .cache import _InFlight
+from .config import config
+from .metrics import cache_families, registry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    body: bytes
+    content_type: str
+    etag: str
+    last_modified: datetime.datetime
+    stored_at: float
+    ttl: float
+    stale: float
+
+
+class ResponseCache:
+    """Bounded LRU of rendered responses with stale-while-revalidate."""
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        clock: Callable[[], float] = time.time,
+        executor: Executor | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self._clock = clock
+        self._executor = executor
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, _InFlight] = {}
+        self._refreshing: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.not_modified = 0
+        self.revalidations = 0
+        self.revalidation_errors = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "coalesced": self.coalesced,
+                "not_modified": self.not_modified,
+                "revalidations": self.revalidations,
+                "revalidation_errors": self.revalidation_errors,
+                "size": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def cached(self, ttl: float, stale: float = 0.0) -> Callable:
+        """Cache the decorated view's ``200`` responses for ``ttl`` seconds."""
+
+        def decorator(view: Callable) -> Callable:
+            @functools.wraps(view)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if ttl <= 0 or request.method != "GET":
+                    return view(*args, **kwargs)
+                key = (request.path, tuple(sorted(request.args.items(multi=True))))
+                now = self._clock()
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._entries.move_to_end(key)
+                        age = now - entry.stored_at
+                        if age <= entry.ttl:
+                            self.hits += 1
+                            state = "HIT"
+                        elif age <= entry.ttl + entry.stale:
+                            self.stale += 1
+                            state = "STALE"
+                        else:
+                            entry = None
+                    if entry is None:
+                        pending = self._inflight.get(key)
+                        owner = pending is None
+                        if owner:
+                            self.misses += 1
+                            pending = self._inflight[key] = _InFlight()
+                        else:
+                            self.coalesced += 1
+                if entry is not None:
+                    if state == "STALE":
+                        self._revalidate(key, view, args, kwargs, ttl, stale)
+                    return self._respond(entry, state)
+
+                if not owner:
+                    # Another request is already rendering this key.
+                    pending.event.wait()
+                    if pending.error is not None:
+                        raise pending.error
+                    if pending.value is not None:
+                        return self._respond(pending.value, "HIT")
+                    return view(*args, **kwargs)  # not cacheable, e.g. an error
+                try:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    pending.value = self._store(key, response, ttl, stale)
+                    return self._respond(pending.value, "MISS")
+                except BaseException as exc:
+                    pending.error = exc
+                    raise
+                finally:
+                    with self._lock:
+                        self._inflight.pop(key, None)
+                    pending.event.set()
+
+            return wrapper
+
+        return decorator
+
+    # -- internals --------------------------------------------------------
+    def _store(self, key: Hashable, response: Response, ttl: float, stale: float) -> _Entry:
+        body = response.get_data()
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        stored_at = self._clock()
+        last_modified = datetime.datetime.fromtimestamp(int(stored_at), datetime.timezone.utc)
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None and previous.etag == etag:
+                last_modified = previous.last_modified  # content unchanged
+            entry = _Entry(
+                body, response.content_type, etag, last_modified, stored_at, ttl, stale
+            )
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _respond(self, entry: _Entry, state: str) -> Response:
+        response = Response(entry.body, content_type=entry.content_type)
+        response.set_etag(entry.etag)
+        response.last_modified = entry.last_modified
+        max_age = max(0, int(entry.ttl - (self._clock() - entry.stored_at)))
+        response.headers["Cache-Control"] = (
+            f"public, max-age={max_age}, stale-while-revalidate={int(entry.stale)}"
+        )
+        response.headers["X-Cache"] = state
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            with self._lock:
+                self.not_modified += 1
+        return response
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=4, thread_name_prefix="revalidate"
+                    )
+        return self._executor
+
+    def _revalidate(
+        self,
+        key: Hashable,
+        view: Callable,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        ttl: float,
+        stale: float,
+    ) -> None:
+        """Re-run ``view`` in the background, once per key at a time."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        app = current_app._get_current_object()
+        environ = dict(request.environ)
+
+        def refresh() -> None:
+            try:
+                with app.request_context(environ):
+                    response = app.make_response(view(*args, **kwargs))
+                    if response.status_code == 200 and not response.is_streamed:
+                        self._store(key, response, ttl, stale)
+                with self._lock:
+                    self.revalidations += 1
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Revalidating %s failed: %s", key[0], exc)
+                with self._lock:
+                    self.revalidation_errors += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._pool().submit(refresh)
+
+
+response_cache = ResponseCache(config.response_cache_size)
+registry.add_collector(lambda: cache_families("http", response_cache.stats()))
@@ -0,0 +1,192 @@
+"""Live availability fan-out for streaming clients.
+
+A single :class:`LiveHub` polls each subscribed campground once per interval,
+no matter how many clients are listening, and pushes only the site-days that
+opened or closed since the previous poll. New subscribers first receive the
+current state as a ``snapshot`` event.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import queue
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Set
+
+from . import api
+from .config import config
+from .diffing import Snapshot, newly_available
+from .matrix import AvailabilityMatrix
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """A client's queue of events for a set of campgrounds."""
+
+    def __init__(self, campground_ids: Iterable[str], maxsize: int = 100) -> None:
+        self.campground_ids: Set[str] = {str(cid) for cid in campground_ids}
+        self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=maxsize)
+
+    def push(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            logger.warning("Dropping live event for slow subscriber")
+
+    def events(self, timeout: float) -> Iterator[Dict[str, Any] | None]:
+        """Yield events forever, or ``None`` after ``timeout`` idle seconds."""
+        while True:
+            try:
+                yield self.queue.get(timeout=timeout)
+            except queue.Empty:
+                yield None
+
+
+def _cells(snapshot: Snapshot, rows: Any, cols: Any) -> List[List[str]]:
+    return [
+        [snapshot.site_ids[i], snapshot.day_keys[j]]
+        for i, j in zip(rows.tolist(), cols.tolist())
+    ]
+
+
+class LiveHub:
+    """Polls subscribed campgrounds once per interval and fans out deltas."""
+
+    def __init__(self, poll_seconds: float = config.live_poll_seconds) -> None:
+        self.poll_seconds = poll_seconds
+        self._subs: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._state: Dict[str, Snapshot] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, campground_ids: Iterable[str]) -> Subscription:
+        sub = Subscription(campground_ids)
+        with self._lock:
+            for cid in sub.campground_ids:
+                self._subs[cid].add(sub)
+                state = self._state.get(cid)
+                if state is not None:
+                    sub.push(self._snapshot_event(cid, state))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="live-hub", daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            for cid in sub.campground_ids:
+                subs = self._subs.get(cid)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subs[cid]
+                        self._state.pop(cid, None)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len({sub for subs in self._subs.values() for sub in subs})
+
+    @staticmethod
+    def _snapshot_event(cid: str, state: Snapshot) -> Dict[str, Any]:
+        return {
+            "campground_id": cid,
+            "snapshot": True,
+            "opened": _cells(state, *newly_available(None, state)),
+            "closed": [],
+        }
+
+    def poll_once(self, today: datetime.date | None = None) -> None:
+        """Fetch every subscribed campground once and publish changes."""
+        month = (today or datetime.date.today()).strftime("%Y-%m")
+        with self._lock:
+            ids = list(self._subs)
+        payloads, errors = api.fetch_months((cid, month) for cid in ids)
+        for (cid, _), exc in errors.items():
+            logger.error("Live poll failed for campground %s: %s", cid, exc)
+        for (cid, _), payload in payloads.items():
+            matrix = AvailabilityMatrix.from_payload(payload)
+            current = Snapshot(
+                matrix.site_ids.tolist(), list(matrix.day_keys), matrix.available
+            )
+            with self._lock:
+                previous = self._state.get(cid)
+                subs = list(self._subs.get(cid, ()))
+                if subs:
+                    self._state[cid] = current
+            if previous is None:
+                event = self._snapshot_event(cid, current)
+            else:
+                opened = _cells(current, *newly_available(previous, current))
+                closed = _cells(previous, *newly_available(current, previous))
+                if not opened and not closed:
+                    continue
+                event = {
+                    "campground_id": cid,
+                    "snapshot": False,
+                    "opened": opened,
+                    "closed": closed,
+                }
+            for sub in subs:
+                sub.push(event)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Live poll failed: %s", exc)
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+
+def sse_stream(hub: LiveHub, sub: Subscription, heartbeat: float = 15.0) -> Iterator[str]:
+    """Format a subscription as a ``text/event-stream`` body."""
+    try:
+        yield "retry: 5000\n\n"
+        for event in sub.events(heartbeat):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: availability\ndata: {json.dumps(event)}\n\n"
+    finally:
+        hub.unsubscribe(sub)
+
+
+_hub: LiveHub | None = None
+_hub_lock = threading.Lock()
+
+
+registry.add_collector(
+    lambda: [
+        (
+            "campwatcher_live_subscribers",
+            "gauge",
+            "Clients connected to /stream.",
+            [("", {}, _hub.subscriber_count() if _hub is not None else 0)],
+        )
+    ]
+)
+
+
+def get_hub() -> LiveHub:
+    """Return the process-wide hub."""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = LiveHub()
+    return _hub
@@ -0,0 +1,257 @@
+"""Columnar sites x days representation of availability payloads."""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+MISSING = 0
+AVAILABLE = 1
+RESERVED = 2
+NOT_AVAILABLE = 3
+NOT_RESERVABLE = 4
+OTHER = 255
+
+STATUS_CODES: Dict[str, int] = {
+    "Available": AVAILABLE,
+    "Reserved": RESERVED,
+    "Not Available": NOT_AVAILABLE,
+    "Not Reservable": NOT_RESERVABLE,
+}
+
+WEEKEND = (4, 5)  # Fri, Sat nights
+
+
+def site_flags(campsite_type: str) -> Dict[str, bool]:
+    ctype = campsite_type.upper()
+    flags: Dict[str, bool] = {}
+    if campsite_type:
+        if "TENT" in ctype and "RV" not in ctype:
+            flags["tent_only"] = True
+        if "RV" not in ctype:
+            flags["no_rv"] = True
+    return flags
+
+
+@dataclass
+class AvailabilityMatrix:
+    """Availability for one campground as a ``uint8`` sites x days array.
+
+    ``status[i, j]`` is the status code of ``site_ids[i]`` on ``dates[j]``
+    (see ``STATUS_CODES``); days a site does not report are ``MISSING``.
+    ``day_keys`` keeps the upstream date strings so rows can be reported in
+    the same format the API returned them.
+    """
+
+    status: np.ndarray
+    site_ids: np.ndarray
+    dates: np.ndarray
+    day_keys: List[str]
+    campsite_type: np.ndarray
+    loop: np.ndarray
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "AvailabilityMatrix":
+        """Parse a Recreation.gov month payload."""
+        return cls.from_sites(
+            (
+                site_id,
+                site.get("campsite_type") or "",
+                site.get("loop") or "",
+                {
+                    day: STATUS_CODES.get(value, OTHER)
+                    for day, value in site.get("availabilities", {}).items()
+                },
+            )
+            for site_id, site in data.get("campsites", {}).items()
+        )
+
+    @classmethod
+    def from_sites(
+        cls, sites: Iterable[Tuple[Any, str, str, Dict[str, int]]]
+    ) -> "AvailabilityMatrix":
+        """Build a matrix from ``(site_id, campsite_type, loop, {day: code})``.
+
+        Day keys must start with an ISO ``YYYY-MM-DD`` date; this is the
+        common entry point every provider normalizes into.
+        """
+        sites = list(sites)
+        day_set = set()
+        for _, _, _, days in sites:
+            day_set.update(days)
+        day_keys = sorted(day_set)
+        day_index = {day: j for j, day in enumerate(day_keys)}
+
+        status = np.zeros((len(sites), len(day_keys)), dtype=np.uint8)
+        site_ids: List[str] = []
+        types: List[str] = []
+        loops: List[str] = []
+        for i, (site_id, campsite_type, loop, days) in enumerate(sites):
+            site_ids.append(str(site_id))
+            types.append(campsite_type)
+            loops.append(loop)
+            row = status[i]
+            for day, code in days.items():
+                row[day_index[day]] = code
+
+        return cls(
+            status=status,
+            site_ids=np.array(site_ids, dtype=object),
+            dates=np.array([day[:10] for day in day_keys], dtype="datetime64[D]"),
+            day_keys=day_keys,
+            campsite_type=np.array(types, dtype=object),
+            loop=np.array(loops, dtype=object),
+        )
+
+    @classmethod
+    def empty(cls) -> "AvailabilityMatrix":
+        return cls.from_payload({})
+
+    @classmethod
+    def concat(cls, matrices: Sequence["AvailabilityMatrix"]) -> "AvailabilityMatrix":
+        """Merge matrices covering different days (e.g. consecutive months)."""
+        if len(matrices) == 1:
+            return matrices[0]
+        site_index: Dict[str, int] = {}
+        types: List[str] = []
+        loops: List[str] = []
+        for m in matrices:
+            for site_id, ctype, loop in zip(m.site_ids, m.campsite_type, m.loop):
+                i = site_index.setdefault(site_id, len(site_index))
+                if i == len(types):
+                    types.append(ctype)
+                    loops.append(loop)
+                else:
+                    types[i] = types[i] or ctype
+                    loops[i] = loops[i] or loop
+        day_keys = sorted({day for m in matrices for day in m.day_keys})
+        day_index = {day: j for j, day in enumerate(day_keys)}
+
+        status = np.zeros((len(site_index), len(day_keys)), dtype=np.uint8)
+        for m in matrices:
+            rows = np.array([site_index[s] for s in m.site_ids], dtype=np.intp)
+            cols = np.array([day_index[d] for d in m.day_keys], dtype=np.intp)
+            if len(rows) and len(cols):
+                status[np.ix_(rows, cols)] = m.status
+
+        return cls(
+            status=status,
+            site_ids=np.array(list(site_index), dtype=object),
+            dates=np.array([day[:10] for day in day_keys], dtype="datetime64[D]"),
+            day_keys=day_keys,
+            campsite_type=np.array(types, dtype=object),
+            loop=np.array(loops, dtype=object),
+        )
+
+    def between(self, start: date, end: date) -> "AvailabilityMatrix":
+        """Return only the date columns within ``start``..``end`` inclusive."""
+        keep = (self.dates >= np.datetime64(start, "D")) & (
+            self.dates <= np.datetime64(end, "D")
+        )
+        return AvailabilityMatrix(
+            status=self.status[:, keep],
+            site_ids=self.site_ids,
+            dates=self.dates[keep],
+            day_keys=[day for day, k in zip(self.day_keys, keep) if k],
+            campsite_type=self.campsite_type,
+            loop=self.loop,
+        )
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.status.shape
+
+    @property
+    def available(self) -> np.ndarray:
+        """Boolean mask of available site-days."""
+        return self.status == AVAILABLE
+
+    def weekdays(self) -> np.ndarray:
+        """Weekday of each date column (Monday is 0)."""
+        return (self.dates.astype("int64") + 3) % 7
+
+    def weekday_mask(self, weekdays: Iterable[int] = WEEKEND) -> np.ndarray:
+        """Boolean mask over ``dates`` selecting the given weekdays."""
+        return np.isin(self.weekdays(), list(weekdays))
+
+    def site_mask(
+        self, site_type: str | None = None, loop: str | None = None
+    ) -> np.ndarray:
+        """Boolean mask over ``site_ids`` matching the given attributes."""
+        mask = np.ones(len(self.site_ids), dtype=bool)
+        if site_type:
+            mask &= self.campsite_type == site_type
+        if loop:
+            mask &= self.loop == loop
+        return mask
+
+    def difficulty_score(self) -> float:
+        """1.0 when nothing is available, 0.0 when every site-day is."""
+        total = int(np.count_nonzero(self.status))
+        if total == 0:
+            return 1.0
+        return 1.0 - int(np.count_nonzero(self.available)) / total
+
+    def site_rates(self) -> np.ndarray:
+        """Fraction of reported days each site is available."""
+        total = np.count_nonzero(self.status, axis=1)
+        available = np.count_nonzero(self.available, axis=1)
+        return np.divide(
+            available, total, out=np.zeros(len(total), dtype=float), where=total > 0
+        )
+
+    def ranked_sites(self) -> List[Tuple[str, float]]:
+        """Site IDs ordered by availability rate, least available first."""
+        rates = self.site_rates()
+        order = np.argsort(rates, kind="stable")
+        return [(self.site_ids[i], float(rates[i])) for i in order]
+
+    def available_cells(
+        self,
+        site_type: str | None = None,
+        loop: str | None = None,
+        weekdays: Sequence[int] | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Row and column indexes of available cells matching the filters."""
+        mask = self.available & self.site_mask(site_type, loop)[:, None]
+        if weekdays is not None:
+            mask &= self.weekday_mask(weekdays)[None, :]
+        return np.nonzero(mask)
+
+    def digest(self) -> str:
+        """Stable hash of the parsed payload, used to detect unchanged data."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update("\x1f".join(self.site_ids.tolist()).encode())
+        h.update("\x1e".join(self.day_keys).encode())
+        h.update("\x1f".join(self.campsite_type.tolist()).encode())
+        h.update("\x1f".join(self.loop.tolist()).encode())
+        h.update(self.status.tobytes())
+        return h.hexdigest()
+
+    def to_record(self) -> Dict[str, Any]:
+        """Compact JSON-serialisable form shared by every provider."""
+        return {
+            "site_ids": self.site_ids.tolist(),
+            "campsite_type": self.campsite_type.tolist(),
+            "loop": self.loop.tolist(),
+            "dates": [str(day) for day in self.dates],
+            "status": self.status.tolist(),
+        }
+
+    def available_rows(self, site_type: str | None = None) -> List[Dict[str, Any]]:
+        """Rows in the ``check_availability`` format, grouped by site."""
+        return self.rows_for(*self.available_cells(site_type))
+
+    def rows_for(self, rows: np.ndarray, cols: np.ndarray) -> List[Dict[str, Any]]:
+        """Format the given cell indexes as ``check_availability`` rows."""
+        flags = [site_flags(ctype) for ctype in self.campsite_type]
+        available: List[Dict[str, Any]] = []
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            entry = {"site_id": self.site_ids[i], "date": self.day_keys[j]}
+            entry.update(flags[i])
+            available.append(entry)
+        return available
@@ -0,0 +1,289 @@
+"""Process-wide instrumentation rendered in Prometheus text format.
+
+Hot paths wrap their work in :func:`timer` (``fetch``, ``json_decode``,
+``parse``, ``filter``, ``db``, ``email_send``), and modules that already keep
+their own counters register a collector with :meth:`Registry.add_collector`
+so ``/metrics`` can report them without this module importing them.
+
+:func:`profiled` runs a lightweight sampling profiler around one watcher's
+check when its ID is listed in ``PROFILE_WATCHERS`` (or added at runtime via
+``registry.profile_watchers``); the collapsed stacks of the last run are kept
+per watcher and can be fed straight to flamegraph tools.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0, 3600.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (metric name, type, help, [(name suffix, labels, value), ...])
+Family = Tuple[str, str, str, List[Tuple[str, Dict[str, str], float]]]
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram (seconds)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.total += seconds
+            self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            cumulative: Dict[str, int] = {}
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+                running += n
+                cumulative[str(bound)] = running
+            return {"buckets": cumulative, "sum": self.total, "count": self.count}
+
+
+def histogram_family(
+    name: str, help_text: str, label: str, histograms: Dict[str, Dict[str, Any]]
+) -> Family:
+    """Turn ``{label_value: LatencyHistogram.snapshot()}`` into a family."""
+    samples: List[Tuple[str, Dict[str, str], float]] = []
+    for value, snap in sorted(histograms.items()):
+        for bound, count in snap["buckets"].items():
+            le = "+Inf" if bound == "inf" else bound
+            samples.append(("_bucket", {label: value, "le": le}, count))
+        samples.append(("_sum", {label: value}, snap["sum"]))
+        samples.append(("_count", {label: value}, snap["count"]))
+    return name, "histogram", help_text, samples
+
+
+def cache_families(cache: str, stats: Dict[str, int]) -> List[Family]:
+    """Families for an ``AvailabilityCache.stats()`` snapshot."""
+    stats = dict(stats)
+    size = stats.pop("size", 0)
+    return [
+        (
+            "campwatcher_cache_events_total",
+            "counter",
+            "Cache lookups by outcome.",
+            [("", {"cache": cache, "event": event}, n) for event, n in stats.items()],
+        ),
+        (
+            "campwatcher_cache_entries",
+            "gauge",
+            "Entries held in memory.",
+            [("", {"cache": cache}, size)],
+        ),
+    ]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+        name = f"{name}{{{inner}}}"
+    return f"{name} {float(value)!r}"
+
+
+class SamplingProfiler:
+    """Samples one thread's stack every ``interval`` seconds."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks, busiest first."""
+        self._stop.set()
+        self._thread.join()
+        return "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common())
+
+
+class Registry:
+    """Stage timers, scheduler lag, collectors and watcher profiles."""
+
+    def __init__(self, profile_watchers: Iterable[int] = ()) -> None:
+        self._lock = threading.Lock()
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._routes: Dict[str, LatencyHistogram] = {}
+        self.lag = LatencyHistogram(LAG_BUCKETS)
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self.profile_watchers: Set[int] = set(profile_watchers)
+        self.profiles: Dict[int, str] = {}
+
+    def stage(self, name: str) -> LatencyHistogram:
+        with self._lock:
+            hist = self._stages.get(name)
+            if hist is None:
+                hist = self._stages[name] = LatencyHistogram(STAGE_BUCKETS)
+            return hist
+
+    def observe_route(self, route: str, seconds: float) -> None:
+        with self._lock:
+            hist = self._routes.get(route)
+            if hist is None:
+                hist = self._routes[route] = LatencyHistogram(STAGE_BUCKETS)
+        hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage(name).observe(time.perf_counter() - started)
+
+    def add_collector(self, collect: Callable[[], Iterable[Family]]) -> None:
+        with self._lock:
+            self._collectors.append(collect)
+
+    @contextmanager
+    def profiled(self, watcher_id: int) -> Iterator[None]:
+        """Sample the current thread while checking ``watcher_id``, if enabled."""
+        if watcher_id not in self.profile_watchers:
+            yield
+            return
+        profiler = SamplingProfiler(threading.get_ident()).start()
+        try:
+            yield
+        finally:
+            stacks = profiler.stop()
+            with self._lock:
+                self.profiles[watcher_id] = stacks
+            logger.info(
+                "Profiled watcher %s: %s samples", watcher_id, sum(profiler.stacks.values())
+            )
+
+    def families(self) -> List[Family]:
+        with self._lock:
+            stages = dict(self._stages)
+            routes = dict(self._routes)
+            collectors = list(self._collectors)
+        families = [
+            histogram_family(
+                "campwatcher_stage_seconds",
+                "Time spent in each hot-path stage.",
+                "stage",
+                {name: hist.snapshot() for name, hist in stages.items()},
+            ),
+            histogram_family(
+                "campwatcher_route_seconds",
+                "Flask request latency per route.",
+                "route",
+                {name: hist.snapshot() for name, hist in routes.items()},
+            ),
+            histogram_family(
+                "campwatcher_scheduler_lag_seconds",
+                "Delay between a watcher's scheduled and actual run time.",
+                "scheduler",
+                {"worker": self.lag.snapshot()},
+            ),
+        ]
+        for collect in collectors:
+            try:
+                families.extend(collect())
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Metrics collector failed: %s", exc)
+        return families
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format.
+
+        Families reported under the same name by several collectors (e.g.
+        two caches) are merged so each name is declared once.
+        """
+        merged: Dict[str, Family] = {}
+        for name, kind, help_text, samples in self.families():
+            if name in merged:
+                merged[name][3].extend(samples)
+            else:
+                merged[name] = (name, kind, help_text, list(samples))
+        lines: List[str] = []
+        for name, kind, help_text, samples in merged.values():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(_format(name + suffix, labels, v) for suffix, labels, v in samples)
+        return "\n".join(lines) + "\n"
+
+
+def _watcher_ids(value: str) -> Set[int]:
+    return {int(part) for part in value.split(",") if part.strip()}
+
+
+registry = Registry(_watcher_ids(config.profile_watchers))
+timer = registry.timer
+profiled = registry.profiled
+
+
+def serve(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Expose ``/metrics`` from a background thread (for worker processes)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path == "/metrics":
+                body = registry.render().encode()
+            elif self.path.startswith("/metrics/profiles/"):
+                try:
+                    profile = registry.profiles.get(int(self.path.rsplit("/", 1)[1]))
+                except ValueError:
+                    profile = None
+                if profile is None:
+                    self.send_error(404)
+                    return
+                body = profile.encode()
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
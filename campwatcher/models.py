@@ -1,13 +1,18 @@
-from sqlalchemy import Boolean, Column, Integer, String, create_engine
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    insert_sentinel,
+)
 
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import declarative_base
 
-from .config import config
-
-engine = create_engine(config.db_uri)
 Base = declarative_base()
-SessionLocal = sessionmaker(bind=engine)
 
 
 class Watcher(Base):
@@ -16,14 +21,49 @@ class Watcher(Base):
     __tablename__ = "watchers"
 
     id = Column(Integer, primary_key=True)
-    campground_id = Column(String, nullable=False)
+    provider = Column(String, nullable=False, default="recgov", server_default="recgov")
+    campground_id = Column(String, nullable=False, index=True)  # park_id for reserve_ca
+    facility_id = Column(String, nullable=True)  # reserve_ca only
     site_type = Column(String, nullable=True)
     tent_only = Column(Boolean, default=False)
     no_rv = Column(Boolean, default=False)
     loop = Column(String, nullable=True)
 
-    check_time = Column(String, nullable=False)  # HH:MM
+    start_date = Column(Date, nullable=True)
+    end_date = Column(Date, nullable=True)
+    min_nights = Column(Integer, nullable=False, default=1, server_default="1")
+
+    check_time = Column(String, nullable=False, index=True)  # HH:MM
     email = Column(String, nullable=True)
 
+    next_run_at = Column(DateTime, nullable=True, index=True)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+    # Lets a batched INSERT ... RETURNING report IDs in input order.
+    _sentinel = insert_sentinel("_sentinel")
+
+
+class WatcherSnapshot(Base):
+    """Last seen availability bitset for a watcher and watch window."""
+
+    __tablename__ = "watcher_snapshots"
+
+    watcher_id = Column(Integer, primary_key=True)
+    window = Column(String, primary_key=True)  # YYYY-MM-DD..YYYY-MM-DD
+    campground_id = Column(String, nullable=False)
+    payload_hash = Column(String, nullable=False)
+    site_ids = Column(Text, nullable=False)  # JSON list
+    day_keys = Column(Text, nullable=False)  # JSON list
+    bits = Column(LargeBinary, nullable=False)
+
+
+
+class Lease(Base):
+    """A named lease held by one worker, e.g. the single release poller."""
+
+    __tablename__ = "leases"
 
-Base.metadata.create_all(engine)
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,309 @@
+"""Asynchronous notification delivery.
+
+Watcher checks only enqueue messages. A background dispatcher collects them
+for a short digest window, merges everything addressed to the same
+recipient into one message and hands the digests to a small pool of sender
+threads, each reusing a pooled SMTP connection. Failed sends are retried
+with exponential backoff. Messages still queued when the process exits are
+delivered by an ``atexit`` hook before it stops.
+
+The delivery backend is a :class:`Sink`; :class:`SmtpSink` is the default and
+:class:`FileSink` writes messages to a local file for tests and debugging
+(``NOTIFY_SINK=file:/tmp/mail.log``).
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import smtplib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Callable, Dict, List
+
+from .config import config
+from .metrics import registry, timer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Notification:
+    to_addr: str
+    subject: str
+    body: str
+
+
+# Queued by flush() to close the current digest window early.
+_FLUSH = Notification("", "", "")
+
+
+class Sink(ABC):
+    """Delivery backend interface."""
+
+    @abstractmethod
+    def send(self, to_addr: str, subject: str, body: str) -> None:
+        """Deliver one message, raising on failure so it can be retried."""
+
+    def close(self) -> None:
+        pass
+
+
+class SmtpSink(Sink):
+    """Sends mail over a pool of persistent SMTP connections."""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 25,
+        sender: str = "noreply@example.com",
+        pool_size: int = 2,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self._pool: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue(maxsize=pool_size)
+
+    def _acquire(self) -> smtplib.SMTP:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return smtplib.SMTP(self.host, self.port)
+
+    def _release(self, smtp: smtplib.SMTP) -> None:
+        try:
+            self._pool.put_nowait(smtp)
+        except queue.Full:
+            smtp.quit()
+
+    def send(self, to_addr: str, subject: str, body: str) -> None:
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.sender
+        msg["To"] = to_addr
+        msg.set_content(body)
+        smtp = self._acquire()
+        try:
+            smtp.send_message(msg)
+        except Exception:
+            smtp.close()
+            raise
+        self._release(smtp)
+
+    def close(self) -> None:
+        while True:
+            try:
+                smtp = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                smtp.quit()
+            except smtplib.SMTPException:
+                smtp.close()
+
+
+class FileSink(Sink):
+    """Appends each message as a JSON line to ``path``."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, to_addr: str, subject: str, body: str) -> None:
+        line = json.dumps({"to": to_addr, "subject": subject, "body": body})
+        with self._lock, open(self.path, "a") as fh:
+            fh.write(line + "\n")
+
+
+def digest(items: List[Notification]) -> Notification:
+    """Merge several notifications for one recipient into one message."""
+    if len(items) == 1:
+        return items[0]
+    body = "\n\n".join(f"{item.subject}\n{item.body}" for item in items)
+    return Notification(items[0].to_addr, f"{len(items)} campsite alerts", body)
+
+
+class NotificationDispatcher:
+    """Background queue that batches and delivers notifications."""
+
+    def __init__(
+        self,
+        sink: Sink,
+        digest_seconds: float = 30.0,
+        retries: int = 3,
+        backoff: float = 1.0,
+        senders: int = 2,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.sink = sink
+        self.digest_seconds = digest_seconds
+        self.retries = retries
+        self.backoff = backoff
+        self._sleep = sleep
+        self._queue: "queue.Queue[Notification | None]" = queue.Queue()
+        self._senders = ThreadPoolExecutor(max_workers=senders, thread_name_prefix="notify")
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"queued": 0, "sent": 0, "failed": 0, "retried": 0}
+
+    def start(self) -> "NotificationDispatcher":
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._collect, name="notify-dispatcher", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def enqueue(self, to_addr: str, subject: str, body: str) -> None:
+        """Queue a message; never blocks on delivery."""
+        with self._lock:
+            self._stats["queued"] += 1
+        self._queue.put(Notification(to_addr, subject, body))
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def flush(self) -> None:
+        """Send everything queued so far without waiting out the digest window."""
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._senders.shutdown(wait=True)
+        self.sink.close()
+
+    def _collect(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                return
+            if first is _FLUSH:
+                self._queue.task_done()
+                continue
+            pending: Dict[str, List[Notification]] = defaultdict(list)
+            pending[first.to_addr].append(first)
+            deadline = time.monotonic() + self.digest_seconds
+            stop = False
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None or item is _FLUSH:
+                    self._queue.task_done()
+                    stop = item is None
+                    break
+                pending[item.to_addr].append(item)
+            for items in pending.values():
+                try:
+                    self._senders.submit(self._deliver, items)
+                except RuntimeError:
+                    # The sender pool is gone once the interpreter starts
+                    # shutting down; deliver from this thread instead.
+                    self._deliver(items)
+            if stop:
+                return
+
+    def _deliver(self, items: List[Notification]) -> None:
+        message = digest(items)
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    with timer("email_send"):
+                        self.sink.send(message.to_addr, message.subject, message.body)
+                    with self._lock:
+                        self._stats["sent"] += 1
+                    return
+                except Exception as exc:  # noqa: BLE001
+                    if attempt == self.retries:
+                        logger.error("Failed to send email to %s: %s", message.to_addr, exc)
+                        with self._lock:
+                            self._stats["failed"] += 1
+                        return
+                    with self._lock:
+                        self._stats["retried"] += 1
+                    self._sleep(self.backoff * 2**attempt)
+        finally:
+            for _ in items:
+                self._queue.task_done()
+
+
+def sink_from_config() -> Sink:
+    if config.notify_sink.startswith("file:"):
+        return FileSink(config.notify_sink[len("file:"):])
+    return SmtpSink(
+        config.smtp_host, config.smtp_port, config.mail_from, config.smtp_pool_size
+    )
+
+
+_dispatcher: NotificationDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def _metric_families():
+    if _dispatcher is None:
+        return []
+    stats = _dispatcher.stats()
+    return [
+        (
+            "campwatcher_notifications_total",
+            "counter",
+            "Notifications by outcome.",
+            [("", {"event": event}, n) for event, n in stats.items()],
+        ),
+        (
+            "campwatcher_notify_queue_depth",
+            "gauge",
+            "Notifications waiting for the dispatcher.",
+            [("", {}, _dispatcher.depth())],
+        ),
+    ]
+
+
+registry.add_collector(_metric_families)
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """Return the process-wide dispatcher, starting it on first use."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = NotificationDispatcher(
+                    sink_from_config(),
+                    digest_seconds=config.notify_digest_seconds,
+                    retries=config.notify_retries,
+                    senders=config.smtp_pool_size,
+                ).start()
+                atexit.register(shutdown_dispatcher)
+    return _dispatcher
+
+
+def shutdown_dispatcher() -> None:
+    """Deliver everything queued and stop the process-wide dispatcher, if any."""
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        dispatcher.flush()
+        dispatcher.stop()
@@ -0,0 +1,245 @@
+"""Availability providers normalized into :class:`AvailabilityMatrix`.
+
+A provider knows how to split a watch window into upstream fetch keys, fetch
+those keys concurrently and parse each payload into the shared matrix form.
+Parsed matrices are remembered per cached payload, so a payload is parsed
+once no matter how many watchers, endpoints or ticks read it.
+
+``recgov`` keys are ``(campground_id, month)`` pages; ``reserve_ca`` keys are
+``(park_id, facility_id, start_date)`` requests against the usedirect API,
+one per ``CA_RESPONSE_DAYS`` days of the window.
+"""
+
+from __future__ import annotations
+
+import datetime
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+from . import api
+from .cache import AvailabilityCache
+from .config import config
+from .matrix import (
+    AVAILABLE,
+    NOT_AVAILABLE,
+    NOT_RESERVABLE,
+    RESERVED,
+    AvailabilityMatrix,
+)
+from .metrics import cache_families, registry, timer
+
+RECGOV = "recgov"
+RESERVE_CA = "reserve_ca"
+
+FetchKey = Tuple[str, ...]
+
+
+class _ParsedMemo:
+    """Matrix parsed from the payload object currently cached for each key."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[Any, AvailabilityMatrix]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.parsed = 0
+
+    def get(
+        self,
+        key: Hashable,
+        payload: Any,
+        parse: Callable[[Any], AvailabilityMatrix],
+    ) -> AvailabilityMatrix:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is payload:
+                self._entries.move_to_end(key)
+                return entry[1]
+        with timer("parse"):
+            matrix = parse(payload)
+        with self._lock:
+            self.parsed += 1
+            self._entries[key] = (payload, matrix)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return matrix
+
+
+class Provider(ABC):
+    """Fetches and normalizes availability from one reservation system."""
+
+    name = ""
+
+    def __init__(self) -> None:
+        self._parsed = _ParsedMemo(config.cache_size)
+
+    @abstractmethod
+    def keys(
+        self,
+        campground_id: str,
+        facility_id: str | None,
+        start: datetime.date,
+        end: datetime.date,
+    ) -> List[FetchKey]:
+        """Upstream requests needed to cover ``start``..``end``."""
+
+    @abstractmethod
+    def fetch(self, key: FetchKey) -> Dict[str, Any]:
+        """Return the (cached) raw payload for ``key``."""
+
+    @abstractmethod
+    def parse(self, payload: Dict[str, Any]) -> AvailabilityMatrix:
+        """Normalize one raw payload."""
+
+    def fetch_payloads(
+        self, keys: List[FetchKey]
+    ) -> Tuple[Dict[FetchKey, Dict[str, Any]], Dict[FetchKey, Exception]]:
+        payloads: Dict[FetchKey, Dict[str, Any]] = {}
+        errors: Dict[FetchKey, Exception] = {}
+        if not keys:
+            return payloads, errors
+        workers = min(len(keys), config.fetch_concurrency)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {key: pool.submit(self.fetch, key) for key in keys}
+            for key, future in futures.items():
+                try:
+                    payloads[key] = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    errors[key] = exc
+        return payloads, errors
+
+    def matrix(self, key: FetchKey, payload: Dict[str, Any]) -> AvailabilityMatrix:
+        """Parse ``payload``, reusing the matrix if it was parsed before."""
+        return self._parsed.get(key, payload, self.parse)
+
+    def load(self, key: FetchKey) -> AvailabilityMatrix:
+        return self.matrix(key, self.fetch(key))
+
+    def fetch_many(
+        self, keys: Iterable[FetchKey]
+    ) -> Tuple[Dict[FetchKey, AvailabilityMatrix], Dict[FetchKey, Exception]]:
+        """Fetch each distinct key once, concurrently, and parse the results."""
+        payloads, errors = self.fetch_payloads(list(dict.fromkeys(keys)))
+        return {key: self.matrix(key, p) for key, p in payloads.items()}, errors
+
+    def window(
+        self,
+        campground_id: str,
+        facility_id: str | None,
+        start: datetime.date,
+        end: datetime.date,
+    ) -> AvailabilityMatrix:
+        """Availability for one campground over ``start``..``end``."""
+        keys = self.keys(campground_id, facility_id, start, end)
+        matrices, errors = self.fetch_many(keys)
+        if errors:
+            raise next(iter(errors.values()))
+        return AvailabilityMatrix.concat([matrices[key] for key in keys]).between(
+            start, end
+        )
+
+
+class RecreationGovProvider(Provider):
+    """Recreation.gov month pages, cached in ``api.availability_cache``."""
+
+    name = RECGOV
+
+    def keys(self, campground_id, facility_id, start, end):
+        return [(str(campground_id), month) for month in api.month_range(start, end)]
+
+    def fetch(self, key):
+        return api.fetch_availability(*key)
+
+    def fetch_payloads(self, keys):
+        return api.fetch_months(keys)
+
+    def parse(self, payload):
+        return AvailabilityMatrix.from_payload(payload)
+
+
+def _slice_status(slice_: Dict[str, Any]) -> int:
+    if slice_.get("IsFree"):
+        return AVAILABLE
+    if slice_.get("IsBlocked"):
+        return NOT_AVAILABLE
+    if slice_.get("IsWalkin"):
+        return NOT_RESERVABLE
+    return RESERVED
+
+
+def parse_usedirect(data: Dict[str, Any]) -> AvailabilityMatrix:
+    """Normalize a usedirect ``Facility.Units[*].Slices`` response.
+
+    Units become sites (keyed by ``UnitId``) and the facility name is used
+    as the loop, so ReserveCalifornia rows look like Recreation.gov ones.
+    """
+    facility = data.get("Facility") or {}
+    loop = str(facility.get("Name") or "")
+    return AvailabilityMatrix.from_sites(
+        (
+            unit.get("UnitId", unit_id),
+            str(unit.get("UnitTypeName") or unit.get("UnitTypeGroupName") or ""),
+            loop,
+            {
+                str(slice_.get("Date") or day)[:10]: _slice_status(slice_)
+                for day, slice_ in (unit.get("Slices") or {}).items()
+            },
+        )
+        for unit_id, unit in (facility.get("Units") or {}).items()
+    )
+
+
+class ReserveCaliforniaProvider(Provider):
+    """ReserveCalifornia facilities, one request per ``CA_RESPONSE_DAYS`` span."""
+
+    name = RESERVE_CA
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.cache = AvailabilityCache(maxsize=config.cache_size, ttl=config.cache_ttl)
+
+    def keys(self, campground_id, facility_id, start, end):
+        if not facility_id:
+            raise ValueError("ReserveCalifornia watchers need a facility_id")
+        span = datetime.timedelta(days=max(1, config.ca_response_days))
+        keys: List[FetchKey] = []
+        day = start
+        while day <= end:
+            keys.append((str(campground_id), str(facility_id), day.isoformat()))
+            day += span
+        return keys
+
+    def fetch(self, key):
+        from reserve_ca import fetch_availability
+
+        return self.cache.get_or_fetch(key, lambda: fetch_availability(*key))
+
+    def prime(self, key: FetchKey, payload: Dict[str, Any]) -> AvailabilityMatrix:
+        """Cache a payload obtained elsewhere, e.g. by the release poller."""
+        self.cache.put(key, payload)
+        return self.matrix(key, payload)
+
+    def parse(self, payload):
+        return parse_usedirect(payload)
+
+
+PROVIDERS: Dict[str, Provider] = {
+    RECGOV: RecreationGovProvider(),
+    RESERVE_CA: ReserveCaliforniaProvider(),
+}
+registry.add_collector(
+    lambda: cache_families(RESERVE_CA, PROVIDERS[RESERVE_CA].cache.stats())
+)
+
+
+def get_provider(name: str | None) -> Provider:
+    """Return the provider called ``name`` (Recreation.gov by default)."""
+    try:
+        return PROVIDERS[name or RECGOV]
+    except KeyError:
+        raise ValueError(f"Unknown availability provider: {name}") from None
@@ -0,0 +1,261 @@
+"""Release-time aware polling for ReserveCalifornia.
+
+ReserveCalifornia publishes new inventory at a known ``nextAvailabilityUpdate``
+time per park. :class:`ReleaseTimeCache` remembers that time per
+(park_id, facility_id) and :class:`ReleaseScheduler` polls each watched
+facility in short, high-frequency bursts around the release and only
+occasionally otherwise, so request budget is spent when inventory changes.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import threading
+import weakref
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Tuple
+
+from .config import config
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+Target = Tuple[str, str, str]  # park_id, facility_id, start_date
+
+
+def _now_like(moment: datetime.datetime | None) -> datetime.datetime:
+    """Current time with the same tz-awareness as ``moment``."""
+    if moment is not None and moment.tzinfo is not None:
+        return datetime.datetime.now(moment.tzinfo)
+    return datetime.datetime.now()
+
+
+def next_poll_delay(
+    now: datetime.datetime,
+    release: datetime.datetime | None,
+    lead: float = config.ca_burst_lead_seconds,
+    window: float = config.ca_burst_window_seconds,
+    burst: float = config.ca_burst_seconds,
+    idle: float = config.ca_idle_seconds,
+) -> float:
+    """Seconds until the next poll of a facility releasing at ``release``.
+
+    Inside ``[release - lead, release + window]`` polls every ``burst``
+    seconds; before the burst the idle interval is shortened so the first
+    burst poll lands exactly at its start.
+    """
+    if release is None:
+        return idle
+    burst_start = release - datetime.timedelta(seconds=lead)
+    burst_end = release + datetime.timedelta(seconds=window)
+    if burst_start <= now <= burst_end:
+        return burst
+    if now < burst_start:
+        return min(idle, (burst_start - now).total_seconds())
+    return idle
+
+
+@dataclass
+class _Release:
+    release: datetime.datetime | None
+    expires_at: datetime.datetime
+
+
+class ReleaseTimeCache:
+    """Caches ``nextAvailabilityUpdate`` per (park_id, facility_id)."""
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str], datetime.datetime | None] | None = None,
+        refresh_seconds: float = config.ca_release_refresh_seconds,
+        window: float = config.ca_burst_window_seconds,
+    ) -> None:
+        if fetch is None:
+            from reserve_ca import fetch_update_time as fetch
+        self._fetch = fetch
+        self.refresh = datetime.timedelta(seconds=refresh_seconds)
+        self.window = datetime.timedelta(seconds=window)
+        self._entries: Dict[Tuple[str, str], _Release] = {}
+        self._lock = threading.Lock()
+
+    def get(self, park_id: str, facility_id: str) -> datetime.datetime | None:
+        """Return the cached release time, refetching once it is stale.
+
+        An entry is refreshed after ``refresh_seconds`` or once its burst
+        window has passed, whichever comes first, so the next release is
+        picked up promptly.
+        """
+        key = (str(park_id), str(facility_id))
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and _now_like(entry.expires_at) < entry.expires_at:
+            return entry.release
+        try:
+            release = self._fetch(*key)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Could not fetch release time for %s/%s: %s", *key, exc)
+            release = entry.release if entry else None
+            expires = _now_like(release) + datetime.timedelta(seconds=60)
+        else:
+            now = _now_like(release)
+            expires = now + self.refresh
+            if release is not None and release > now:
+                expires = min(expires, release + self.window)
+        with self._lock:
+            self._entries[key] = _Release(release, expires)
+        return release
+
+    def known(self) -> Dict[Tuple[str, str], datetime.datetime | None]:
+        with self._lock:
+            return {key: entry.release for key, entry in self._entries.items()}
+
+
+def payload_digest(data: Any) -> str:
+    return hashlib.blake2b(
+        json.dumps(data, sort_keys=True).encode(), digest_size=16
+    ).hexdigest()
+
+
+class ReleaseScheduler:
+    """Adaptive per-facility polling on an APScheduler instance.
+
+    Each watched target gets a one-shot ``date`` job that reschedules itself
+    after every poll using :func:`next_poll_delay`. ``on_change`` is called
+    with the target and payload whenever the payload differs from the
+    previous poll.
+    """
+
+    def __init__(
+        self,
+        scheduler: Any,
+        release_times: ReleaseTimeCache,
+        on_change: Callable[[Target, Dict[str, Any]], None] | None = None,
+        fetch: Callable[[str, str, str], Dict[str, Any]] | None = None,
+    ) -> None:
+        if fetch is None:
+            from reserve_ca import fetch_availability as fetch
+        self.scheduler = scheduler
+        self.release_times = release_times
+        self.on_change = on_change
+        self._fetch = fetch
+        self._digests: Dict[Target, str] = {}
+        self._targets: set[Target] = set()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"polls": 0, "burst_polls": 0, "changes": 0}
+        _schedulers.add(self)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    @staticmethod
+    def job_id(target: Target) -> str:
+        return "ca-release:" + ":".join(target)
+
+    def watch(self, park_id: str, facility_id: str, start_date: str) -> None:
+        target = (str(park_id), str(facility_id), start_date)
+        with self._lock:
+            if target in self._targets:
+                return
+            self._targets.add(target)
+        self._schedule(target, datetime.datetime.now())
+
+    def unwatch(self, park_id: str, facility_id: str, start_date: str) -> None:
+        target = (str(park_id), str(facility_id), start_date)
+        with self._lock:
+            self._targets.discard(target)
+            self._digests.pop(target, None)
+        try:
+            self.scheduler.remove_job(self.job_id(target))
+        except Exception:  # noqa: BLE001
+            pass
+
+    def targets(self) -> set[Target]:
+        with self._lock:
+            return set(self._targets)
+
+    def _schedule(self, target: Target, run_date: datetime.datetime) -> None:
+        self.scheduler.add_job(
+            self.poll,
+            trigger="date",
+            run_date=run_date,
+            args=[target],
+            id=self.job_id(target),
+            replace_existing=True,
+        )
+
+    def poll(self, target: Target) -> float:
+        """Poll one target, report changes and schedule the next poll."""
+        with self._lock:
+            if target not in self._targets:
+                return 0.0
+        park_id, facility_id, start_date = target
+        release = self.release_times.get(park_id, facility_id)
+        try:
+            data = self._fetch(park_id, facility_id, start_date)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("ReserveCalifornia poll failed for %s: %s", target, exc)
+        else:
+            digest = payload_digest(data)
+            with self._lock:
+                changed = self._digests.get(target) != digest
+                self._digests[target] = digest
+            if changed:
+                with self._lock:
+                    self._stats["changes"] += 1
+                logger.info("ReserveCalifornia availability changed for %s", target)
+                if self.on_change is not None:
+                    self.on_change(target, data)
+        now = _now_like(release)
+        delay = next_poll_delay(now, release)
+        with self._lock:
+            self._stats["polls"] += 1
+            if delay <= config.ca_burst_seconds:
+                self._stats["burst_polls"] += 1
+        self._schedule(
+            target, datetime.datetime.now() + datetime.timedelta(seconds=delay)
+        )
+        return delay
+
+
+_schedulers: "weakref.WeakSet[ReleaseScheduler]" = weakref.WeakSet()
+
+
+def _metric_families():
+    stats: Counter[str] = Counter({"polls": 0, "burst_polls": 0, "changes": 0})
+    targets = 0
+    for releases in list(_schedulers):
+        stats.update(releases.stats())
+        targets += len(releases.targets())
+    return [
+        (
+            "campwatcher_release_polls_total",
+            "counter",
+            "ReserveCalifornia release polls by kind.",
+            [("", {"event": event}, n) for event, n in stats.items()],
+        ),
+        (
+            "campwatcher_release_targets",
+            "gauge",
+            "ReserveCalifornia facilities being polled.",
+            [("", {}, targets)],
+        ),
+    ]
+
+
+registry.add_collector(_metric_families)
+
+
+_release_times: ReleaseTimeCache | None = None
+
+
+def get_release_times() -> ReleaseTimeCache:
+    """Return the process-wide release time cache."""
+    global _release_times
+    if _release_times is None:
+        _release_times = ReleaseTimeCache()
+    return _release_times
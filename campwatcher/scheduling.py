@@ -4,85 +4,228 @@ from __future__ import annotations
 
 import datetime
 import logging
-from typing import Any, List
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
 
 
-from apscheduler.schedulers.background import BackgroundScheduler
+import numpy as np
+from sqlalchemy.orm import Session
 
-from .api import check_availability
-from .models import SessionLocal, Watcher
-from campground_data import CAMPGROUND_ATTRIBUTES
-import smtplib
-from email.message import EmailMessage
+from .attributes import get_store
+from .db import SessionLocal, load_watchers
+from .diffing import (
+    Snapshot,
+    load_snapshot,
+    newly_available,
+    prefetch_snapshots,
+    save_snapshot,
+)
+from .matrix import AvailabilityMatrix
+from .metrics import profiled, registry, timer
+from .models import Watcher, WatcherSnapshot
+from .notify import get_dispatcher
+from .providers import RECGOV, FetchKey, get_provider
+from .stays import StayIndex
 
-scheduler = BackgroundScheduler()
 logger = logging.getLogger(__name__)
 
+_scheduler: Any = None
+_scheduler_lock = threading.Lock()
 
-def schedule_watcher(watcher_id: int, time_str: str) -> None:
-    """Schedule a watcher by ID at HH:MM."""
-    hour, minute = map(int, time_str.split(":"))
-    scheduler.add_job(
-        func=run_watcher,
-        trigger="cron",
-        args=[watcher_id],
-        id=str(watcher_id),
-        hour=hour,
-        minute=minute,
-    )
+batch_stats: Dict[str, int] = {
+    "ticks": 0,
+    "watchers": 0,
+    "fetches": 0,
+    "fetches_saved": 0,
+}
+
+
+registry.add_collector(
+    lambda: [
+        (
+            f"campwatcher_batch_{name}_total",
+            "counter",
+            f"Watcher batches: {name.replace('_', ' ')}.",
+            [("", {}, value)],
+        )
+        for name, value in batch_stats.items()
+    ]
+)
+
+
+def get_scheduler() -> Any:
+    """Return the process-wide background scheduler, importing APScheduler lazily."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                from apscheduler.schedulers.background import BackgroundScheduler
+
+                _scheduler = BackgroundScheduler()
+    return _scheduler
 
 
 def send_email(to_addr: str | None, subject: str, body: str) -> None:
-    """Send a notification email if an address is provided."""
+    """Queue a notification email if an address is provided."""
     if not to_addr:
         return
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = "noreply@example.com"
-    msg["To"] = to_addr
-    msg.set_content(body)
-    try:
-        with smtplib.SMTP("localhost") as smtp:
-            smtp.send_message(msg)
-    except Exception as exc:  # noqa: BLE001
-        logger.error("Failed to send email: %s", exc)
+    get_dispatcher().enqueue(to_addr, subject, body)
 
 
+def _watcher_mask(watcher: Watcher, matrix: AvailabilityMatrix) -> np.ndarray:
+    """Available cells of ``matrix`` that pass the watcher's filters."""
+    attrs: Dict[str, Any] = {}
+    if _provider_name(watcher) == RECGOV:  # attributes only cover Recreation.gov
+        attrs = get_store().get(watcher.campground_id)
+    if watcher.tent_only and not attrs.get("tent_only"):
+        return np.zeros(matrix.shape, dtype=bool)
+    if watcher.no_rv and not attrs.get("no_rv"):
+        return np.zeros(matrix.shape, dtype=bool)
+    mask = matrix.available & matrix.site_mask(watcher.site_type, watcher.loop)[:, None]
+    if (watcher.min_nights or 1) > 1:
+        # Only nights that are part of a long enough stay count as open.
+        mask = StayIndex(mask, matrix.dates, matrix.site_ids).cells(watcher.min_nights)
+    return mask
 
-def run_watcher(watcher_id: int) -> None:
-    """Check availability for a stored watcher and log results."""
-    session = SessionLocal()
-    watcher = session.query(Watcher).filter(Watcher.id == watcher_id).first()
-    if not watcher:
-        session.close()
+
+def _report(watcher: Watcher, opened: List[dict[str, Any]]) -> None:
+    if opened:
+        logger.info("New availability for watcher %s: %s", watcher.id, opened)
+        send_email(
+            watcher.email,
+            "Campsite available",
+            f"Newly available sites: {opened}",
+        )
+
+    else:
+        logger.info("No new availability for watcher %s", watcher.id)
+
+
+def _provider_name(watcher: Watcher) -> str:
+    return watcher.provider or RECGOV
+
+
+def watch_window(
+    watcher: Watcher, today: datetime.date
+) -> Tuple[datetime.date, datetime.date]:
+    """Return the watcher's date range, defaulting to the current month."""
+    start = watcher.start_date or today.replace(day=1)
+    end = watcher.end_date
+    if end is None:
+        next_month = (start.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+        end = next_month - datetime.timedelta(days=1)
+    return start, end
+
+
+def _window_key(start: datetime.date, end: datetime.date) -> str:
+    return f"{start.isoformat()}..{end.isoformat()}"
+
+
+def _evaluate(
+    session: Session,
+    watcher: Watcher,
+    matrix: AvailabilityMatrix,
+    window: str,
+    prefetched: Dict[Tuple[int, str], Tuple[WatcherSnapshot, str, Snapshot]] | None = None,
+) -> None:
+    """Diff ``matrix`` against the watcher's last snapshot and report openings."""
+    digest = matrix.digest()
+    if prefetched is None:
+        with timer("db"):
+            row, previous = load_snapshot(session, watcher.id, window)
+        stored_hash = row.payload_hash if row is not None else None
+    else:
+        row, stored_hash, previous = prefetched.get((watcher.id, window), (None, None, None))
+    if row is not None and stored_hash == digest:
+        logger.info("No change for watcher %s", watcher.id)
         return
-    today = datetime.date.today()
-    month_str = today.strftime("%Y-%m")
-    try:
-        avail = check_availability(
-            watcher.campground_id, month_str, watcher.site_type
+    with timer("filter"):
+        current = Snapshot(
+            matrix.site_ids.tolist(), list(matrix.day_keys), _watcher_mask(watcher, matrix)
         )
-        filtered: List[dict[str, Any]] = []
-        for item in avail:
-            attrs = CAMPGROUND_ATTRIBUTES.get(watcher.campground_id, {})
-            if watcher.tent_only and not attrs.get("tent_only"):
-                continue
-            if watcher.no_rv and not attrs.get("no_rv"):
-                continue
-            if watcher.loop and watcher.loop != item.get("loop"):
-                continue
-            filtered.append(item)
-        if filtered:
-            logger.info("Availability found for watcher %s: %s", watcher.id, filtered)
-            send_email(
-                watcher.email,
-                "Campsite available",
-                f"Matching sites found: {filtered}",
-            )
+        opened = matrix.rows_for(*newly_available(previous, current))
+    with timer("db"):
+        save_snapshot(
+            session, row, watcher.id, watcher.campground_id, window, digest, current
+        )
+        session.commit()
+    _report(watcher, opened)
+
 
-        else:
-            logger.info("No availability for watcher %s", watcher.id)
-    except Exception as exc:  # noqa: BLE001
-        logger.error("Error checking watcher %s: %s", watcher.id, exc)
+def run_watcher_ids(watcher_ids: List[int]) -> None:
+    """Load watchers with one query and check them as a batch."""
+    session = SessionLocal()
+    try:
+        with timer("db"):
+            watchers = load_watchers(session, watcher_ids)
+        if watchers:
+            run_watchers(session, watchers)
     finally:
-        session.close()
+        SessionLocal.remove()
+
+
+def run_watchers(
+    session: Session, watchers: List[Watcher], now: datetime.datetime | None = None
+) -> None:
+    """Evaluate a batch of watchers against shared upstream payloads.
+
+    The upstream requests needed by the whole batch are collected per
+    provider and fetched concurrently, once per key -- (campground_id,
+    month) for Recreation.gov, (park_id, facility_id, start_date) for
+    ReserveCalifornia -- no matter how many watchers point at them. Each
+    watcher then evaluates its own window against the shared matrices.
+    """
+    now = now or datetime.datetime.now()
+    windows = {w.id: watch_window(w, now.date()) for w in watchers}
+    wanted: Dict[int, List[Tuple[str, FetchKey]]] = {}
+    by_provider: Dict[str, List[FetchKey]] = defaultdict(list)
+    for watcher in watchers:
+        name = _provider_name(watcher)
+        try:
+            keys = get_provider(name).keys(
+                watcher.campground_id, watcher.facility_id, *windows[watcher.id]
+            )
+        except ValueError as exc:
+            logger.error("Error checking watcher %s: %s", watcher.id, exc)
+            continue
+        wanted[watcher.id] = [(name, key) for key in keys]
+        by_provider[name].extend(keys)
+    requested = sum(len(keys) for keys in wanted.values())
+
+    matrices: Dict[Tuple[str, FetchKey], AvailabilityMatrix] = {}
+    errors: Dict[Tuple[str, FetchKey], Exception] = {}
+    for name, keys in by_provider.items():
+        found, failed = get_provider(name).fetch_many(keys)
+        matrices.update(((name, key), matrix) for key, matrix in found.items())
+        for key, exc in failed.items():
+            logger.error("Error fetching %s %s: %s", name, key, exc)
+            errors[(name, key)] = exc
+
+    with timer("db"):
+        prefetched = prefetch_snapshots(session, [w.id for w in watchers])
+    for watcher in watchers:
+        keys = wanted.get(watcher.id)
+        if keys is None or any(key in errors for key in keys):
+            continue
+        start, end = windows[watcher.id]
+        try:
+            with profiled(watcher.id):
+                matrix = AvailabilityMatrix.concat([matrices[k] for k in keys])
+                _evaluate(
+                    session,
+                    watcher,
+                    matrix.between(start, end),
+                    _window_key(start, end),
+                    prefetched,
+                )
+        except Exception as exc:  # noqa: BLE001
+            session.rollback()
+            logger.error("Error checking watcher %s: %s", watcher.id, exc)
+
+    fetched = len(matrices) + len(errors)
+    batch_stats["ticks"] += 1
+    batch_stats["watchers"] += len(watchers)
+    batch_stats["fetches"] += fetched
+    batch_stats["fetches_saved"] += requested - fetched
+
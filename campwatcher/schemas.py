@@ -1,23 +1,57 @@
 """Request and response models."""
 
+import datetime
+from typing import Literal
+
 from pydantic import BaseModel, Field, validator
 
+from .config import config
+
+
+def window_months(start: datetime.date, end: datetime.date) -> int:
+    """Number of month pages a ``start``..``end`` window spans."""
+    return (end.year - start.year) * 12 + end.month - start.month + 1
+
 
 class WatcherCreate(BaseModel):
     """Schema for creating a watcher."""
 
-    campground_id: str = Field(..., description="Recreation.gov campground ID")
+    provider: Literal["recgov", "reserve_ca"] = Field(
+        "recgov", description="Availability provider"
+    )
+    campground_id: str = Field(
+        ..., description="Recreation.gov campground ID or ReserveCalifornia park ID"
+    )
+    facility_id: str | None = Field(None, description="ReserveCalifornia facility ID")
     site_type: str | None = Field(None, description="Campsite type")
     tent_only: bool = Field(False, description="Only tent sites")
     no_rv: bool = Field(False, description="Exclude RV sites")
     loop: str | None = Field(None, description="Campground loop")
+    start_date: datetime.date | None = Field(None, description="First night to watch")
+    end_date: datetime.date | None = Field(None, description="Last night to watch")
+    min_nights: int = Field(1, ge=1, description="Consecutive nights needed at one site")
 
-    check_time: str = Field(..., regex=r"^\d{2}:\d{2}$", description="Time in HH:MM")
+    check_time: str = Field(..., pattern=r"^\d{2}:\d{2}$", description="Time in HH:MM")
     email: str | None = Field(None, description="Notification email")
 
+    @validator("facility_id", always=True)
+    def _validate_facility(cls, v, values):  # noqa: N805
+        if values.get("provider") == "reserve_ca" and not v:
+            raise ValueError("facility_id is required for reserve_ca watchers")
+        return v
+
     @validator("check_time")
     def _validate_time(cls, v: str) -> str:  # noqa: D401,N802
         hour, minute = map(int, v.split(":"))
         if hour not in range(24) or minute not in range(60):
             raise ValueError("check_time must be valid HH:MM")
         return v
+
+    @validator("end_date")
+    def _validate_range(cls, v, values):  # noqa: N805
+        start = values.get("start_date")
+        if v and start and v < start:
+            raise ValueError("end_date must not be before start_date")
+        if v and window_months(start or datetime.date.today(), v) > config.max_window_months:
+            raise ValueError(f"watch window may span at most {config.max_window_months} months")
+        return v
@@ -0,0 +1,265 @@
+"""Local facility search index built from a RIDB-style facilities dump.
+
+Facilities are persisted in SQLite and served from two in-memory indexes: an
+inverted index of name/description tokens and a fixed-size lat/lon grid for
+radius queries. Results use the same record format as the Recreation.gov
+search API (``FacilityID``, ``FacilityName`` ...), so callers can fall back
+to the remote API transparently.
+
+Load or refresh the index with ``python -m campwatcher.search_index load
+<dump>``; only facilities whose ``LastUpdatedDate`` changed are rewritten.
+Running processes notice the commit through SQLite's ``data_version`` and
+re-read just those facilities on their next query.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from .config import config
+
+GRID_DEGREES = 0.5
+EARTH_RADIUS_KM = 6371.0
+_TOKEN = re.compile(r"[a-z0-9]+")
+_TAG = re.compile(r"<[^>]+>")
+
+
+def tokenize(text: str | None) -> Set[str]:
+    if not text:
+        return set()
+    return set(_TOKEN.findall(_TAG.sub(" ", text).lower()))
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _cell(lat: float, lon: float) -> Tuple[int, int]:
+    return math.floor(lat / GRID_DEGREES), math.floor(lon / GRID_DEGREES)
+
+
+def read_dump(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield facility records from a RIDB JSON (``RECDATA``) or NDJSON dump."""
+    with open(path) as fh:
+        first = fh.read(1)
+        fh.seek(0)
+        if first and first in "[{" and not path.endswith(".ndjson"):
+            data = json.load(fh)
+            yield from data.get("RECDATA", []) if isinstance(data, dict) else data
+            return
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+class FacilityIndex:
+    """Inverted text index plus spatial grid over stored facilities."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+        self._data_version: int | None = None
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._tokens: Dict[str, Set[str]] = {}
+        self._updated: Dict[str, str | None] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._grid: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
+        self._coords: Dict[str, Tuple[float, float]] = {}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS facilities ("
+                " facility_id TEXT PRIMARY KEY,"
+                " updated TEXT,"
+                " record TEXT NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    # -- in-memory index maintenance --------------------------------------
+    def _add(self, record: Dict[str, Any]) -> None:
+        fid = str(record.get("FacilityID"))
+        self._remove(fid)
+        tokens = tokenize(record.get("FacilityName")) | tokenize(
+            record.get("FacilityDescription")
+        )
+        self._records[fid] = record
+        self._tokens[fid] = tokens
+        self._updated[fid] = record.get("LastUpdatedDate")
+        for token in tokens:
+            self._postings[token].add(fid)
+        lat, lon = record.get("FacilityLatitude"), record.get("FacilityLongitude")
+        if lat not in (None, "") and lon not in (None, ""):
+            coords = (float(lat), float(lon))
+            self._coords[fid] = coords
+            self._grid[_cell(*coords)].add(fid)
+
+    def _remove(self, fid: str) -> None:
+        for token in self._tokens.pop(fid, ()):
+            self._postings[token].discard(fid)
+        coords = self._coords.pop(fid, None)
+        if coords is not None:
+            self._grid[_cell(*coords)].discard(fid)
+        self._records.pop(fid, None)
+        self._updated.pop(fid, None)
+
+    def _ensure_loaded(self) -> None:
+        """Load the table, or re-sync it after another connection wrote to it."""
+        with self._lock:
+            conn = self._db()
+            (version,) = conn.execute("PRAGMA data_version").fetchone()
+            if version == self._data_version:
+                return
+            if self._data_version is None:
+                for (record,) in conn.execute("SELECT record FROM facilities"):
+                    self._add(json.loads(record))
+            else:
+                self._sync(conn)
+            self._data_version = version
+
+    def _sync(self, conn: sqlite3.Connection) -> None:
+        stored = dict(conn.execute("SELECT facility_id, updated FROM facilities"))
+        for fid in self._records.keys() - stored.keys():
+            self._remove(fid)
+        stale = [
+            fid
+            for fid, updated in stored.items()
+            if updated is None or fid not in self._updated or self._updated[fid] != updated
+        ]
+        for i in range(0, len(stale), 500):
+            chunk = stale[i : i + 500]
+            rows = conn.execute(
+                "SELECT record FROM facilities WHERE facility_id IN"
+                f" ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for (record,) in rows:
+                self._add(json.loads(record))
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._records)
+
+    # -- refresh ----------------------------------------------------------
+    def refresh(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Upsert facilities whose ``LastUpdatedDate`` changed.
+
+        Returns the number of facilities written. Unchanged facilities are
+        skipped so re-loading a full dump only touches what moved.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            conn = self._db()
+            known = dict(conn.execute("SELECT facility_id, updated FROM facilities"))
+            changed: List[Dict[str, Any]] = []
+            for record in records:
+                fid = str(record.get("FacilityID"))
+                updated = record.get("LastUpdatedDate")
+                if fid in known and updated and known[fid] == updated:
+                    continue
+                known[fid] = updated
+                changed.append(record)
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO facilities (facility_id, updated, record)"
+                    " VALUES (?, ?, ?)",
+                    [
+                        (str(r.get("FacilityID")), r.get("LastUpdatedDate"), json.dumps(r))
+                        for r in changed
+                    ],
+                )
+            for record in changed:
+                self._add(record)
+        return len(changed)
+
+    # -- queries ----------------------------------------------------------
+    def _near(self, lat: float, lon: float, radius_km: float) -> Dict[str, float]:
+        dlat = radius_km / 111.0
+        dlon = radius_km / max(1e-6, 111.0 * math.cos(math.radians(lat)))
+        lat_lo, lon_lo = _cell(lat - dlat, lon - dlon)
+        lat_hi, lon_hi = _cell(lat + dlat, lon + dlon)
+        found: Dict[str, float] = {}
+        for i in range(lat_lo, lat_hi + 1):
+            for j in range(lon_lo, lon_hi + 1):
+                for fid in self._grid.get((i, j), ()):
+                    dist = haversine_km(lat, lon, *self._coords[fid])
+                    if dist <= radius_km:
+                        found[fid] = dist
+        return found
+
+    def search(
+        self,
+        query: str | None = None,
+        lat: float | str | None = None,
+        lon: float | str | None = None,
+        radius_km: float | None = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Return facilities matching every query token and/or near a point.
+
+        Spatial results are ordered by distance, text-only results by name.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            candidates: Set[str] | None = None
+            for token in tokenize(query):
+                hits = self._postings.get(token, set())
+                candidates = set(hits) if candidates is None else candidates & hits
+                if not candidates:
+                    return []
+            if lat not in (None, "") and lon not in (None, ""):
+                radius = radius_km or config.search_radius_km
+                near = self._near(float(lat), float(lon), radius)
+                ids = near.keys() if candidates is None else candidates & near.keys()
+                ordered = sorted(ids, key=near.__getitem__)
+            elif candidates is not None:
+                ordered = sorted(
+                    candidates, key=lambda f: self._records[f].get("FacilityName") or ""
+                )
+            else:
+                return []
+            return [self._records[fid] for fid in ordered[:limit]]
+
+
+_index: FacilityIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> FacilityIndex | None:
+    """Return the process-wide index, or ``None`` if none is configured."""
+    global _index
+    if _index is None and config.facility_index_db:
+        with _index_lock:
+            if _index is None:
+                _index = FacilityIndex(config.facility_index_db)
+    return _index
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the local facility index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    load = sub.add_parser("load", help="load or incrementally refresh from a dump")
+    load.add_argument("path")
+    load.add_argument("--db", default=config.facility_index_db or "facilities.db")
+    args = parser.parse_args(argv)
+    index = FacilityIndex(args.db)
+    changed = index.refresh(read_dump(args.path))
+    print(f"Updated {changed} facilities ({len(index)} indexed) in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Consecutive-night stay search over a run-length index of availability.
+
+:class:`StayIndex` encodes every site's availability as maximal runs of
+consecutive available nights ``[start, end)`` (day numbers), sorted by
+length. A query for ``min_nights`` in a date window binary-searches to the
+runs at least that long and clips only those to the window, so once the
+index is built a query never touches the sites x days cells.
+
+:func:`stay_index` keeps one index per campground window and reuses it for
+as long as the provider serves the same parsed months, so many searches and
+watchers over the same campground share one build.
+"""
+
+from __future__ import annotations
+
+import datetime
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .config import config
+from .matrix import AvailabilityMatrix
+from .providers import RECGOV, get_provider
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+@dataclass
+class Stay:
+    """``nights`` consecutive available nights at a site, from ``start``."""
+
+    site_id: str
+    start: datetime.date
+    nights: int
+
+    @property
+    def end(self) -> datetime.date:
+        """Check-out date."""
+        return self.start + datetime.timedelta(days=self.nights)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "site_id": self.site_id,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "nights": self.nights,
+        }
+
+
+def _day(value: datetime.date) -> int:
+    return (value - _EPOCH).days
+
+
+class StayIndex:
+    """Maximal available runs of a sites x days mask, longest first."""
+
+    def __init__(self, mask: np.ndarray, dates: np.ndarray, site_ids: Sequence[str]) -> None:
+        self.site_ids = list(site_ids)
+        self.shape = mask.shape
+        days = dates.astype("datetime64[D]").astype(np.int64)
+        # A run continues into column j only if j is the next calendar night.
+        follows = np.diff(days) == 1
+        prev = np.zeros(mask.shape, dtype=bool)
+        prev[:, 1:] = mask[:, :-1] & follows[None, :]
+        nxt = np.zeros(mask.shape, dtype=bool)
+        nxt[:, :-1] = mask[:, 1:] & follows[None, :]
+        # Row-major order pairs each run's first cell with its last one.
+        rows, first = np.nonzero(mask & ~prev)
+        _, last = np.nonzero(mask & ~nxt)
+        lengths = last - first + 1
+        order = np.argsort(-lengths, kind="stable")
+        self.run_site = rows[order]
+        self.run_first = first[order]
+        self.run_last = last[order]
+        self.run_start = days[self.run_first]
+        self.run_end = self.run_start + lengths[order]
+        self._neg_lengths = -lengths[order]
+
+    @classmethod
+    def from_matrix(cls, matrix: AvailabilityMatrix) -> "StayIndex":
+        return cls(matrix.available, matrix.dates, matrix.site_ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self.run_site)
+
+    def _candidates(self, min_nights: int) -> slice:
+        """Runs at least ``min_nights`` long (a prefix of the sorted runs)."""
+        return slice(0, int(np.searchsorted(self._neg_lengths, -min_nights, side="right")))
+
+    def find(
+        self,
+        min_nights: int,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+        site_mask: np.ndarray | None = None,
+    ) -> List[Stay]:
+        """Every run of at least ``min_nights`` nights within ``start``..``end``.
+
+        ``end`` is the last night that may be booked. Runs are clipped to the
+        window and returned per site in date order; ``site_mask`` (over
+        ``site_ids``) restricts the sites.
+        """
+        min_nights = max(1, min_nights)
+        window = self._candidates(min_nights)
+        sites = self.run_site[window]
+        run_start = self.run_start[window]
+        run_end = self.run_end[window]
+        if start is not None:
+            run_start = np.maximum(run_start, _day(start))
+        if end is not None:
+            run_end = np.minimum(run_end, _day(end) + 1)
+        keep = run_end - run_start >= min_nights
+        if site_mask is not None:
+            keep &= site_mask[sites]
+        hits = np.flatnonzero(keep)
+        hits = hits[np.lexsort((run_start[hits], sites[hits]))]
+        return [
+            Stay(
+                self.site_ids[sites[i]],
+                _EPOCH + datetime.timedelta(days=int(run_start[i])),
+                int(run_end[i] - run_start[i]),
+            )
+            for i in hits.tolist()
+        ]
+
+    def _mark(self, min_nights: int, trim: int) -> np.ndarray:
+        """Cells from each long enough run's first to its last minus ``trim``."""
+        window = self._candidates(max(1, min_nights))
+        rows, cols = self.shape
+        marks = np.zeros((rows, cols + 1), dtype=np.int32)
+        np.add.at(marks, (self.run_site[window], self.run_first[window]), 1)
+        np.add.at(marks, (self.run_site[window], self.run_last[window] + 1 - trim), -1)
+        return np.cumsum(marks[:, :cols], axis=1) > 0
+
+    def cells(self, min_nights: int) -> np.ndarray:
+        """Boolean mask of the cells covered by runs of ``min_nights`` or more."""
+        return self._mark(min_nights, 0)
+
+    def starts(self, nights: int) -> np.ndarray:
+        """Boolean mask of the cells a stay of ``nights`` consecutive nights can start on."""
+        nights = max(1, nights)
+        return self._mark(nights, nights - 1)
+
+
+# (provider, fetch keys) -> (parsed months, concatenated matrix, index)
+_indexes: "OrderedDict[Tuple[str, Tuple], Tuple[Any, ...]]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def stay_index(
+    provider_name: str,
+    campground_id: str,
+    facility_id: str | None,
+    start: datetime.date,
+    end: datetime.date,
+) -> Tuple[AvailabilityMatrix, StayIndex]:
+    """The campground's matrix over ``start``..``end`` and its stay index.
+
+    The index is rebuilt only when the provider returns different parsed
+    months (i.e. the cached payloads changed).
+    """
+    provider = get_provider(provider_name)
+    keys = provider.keys(campground_id, facility_id, start, end)
+    matrices, errors = provider.fetch_many(keys)
+    if errors:
+        raise next(iter(errors.values()))
+    parts = tuple(matrices[key] for key in keys)
+    memo_key = (provider_name, tuple(keys))
+    with _indexes_lock:
+        entry = _indexes.get(memo_key)
+        if entry is not None and len(entry[0]) == len(parts) and all(
+            a is b for a, b in zip(entry[0], parts)
+        ):
+            _indexes.move_to_end(memo_key)
+            return entry[1], entry[2]
+    matrix = AvailabilityMatrix.concat(list(parts))
+    index = StayIndex.from_matrix(matrix)
+    with _indexes_lock:
+        _indexes[memo_key] = (parts, matrix, index)
+        _indexes.move_to_end(memo_key)
+        while len(_indexes) > config.cache_size:
+            _indexes.popitem(last=False)
+    return matrix, index
+
+
+def find_stays(
+    campground_id: str,
+    start: datetime.date,
+    end: datetime.date,
+    min_nights: int,
+    provider_name: str | None = None,
+    facility_id: str | None = None,
+    site_type: str | None = None,
+    loop: str | None = None,
+) -> List[Stay]:
+    """Sites with ``min_nights`` or more consecutive available nights in the window."""
+    matrix, index = stay_index(
+        provider_name or RECGOV, campground_id, facility_id, start, end
+    )
+    site_mask = matrix.site_mask(site_type, loop) if site_type or loop else None
+    return index.find(min_nights, start, end, site_mask)
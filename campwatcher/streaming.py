@@ -0,0 +1,168 @@
+"""Incremental parsing of Recreation.gov month payloads.
+
+``resp.json()`` builds the whole ``{"campsites": {...}}`` document before
+anything is filtered. The functions here read the response in chunks
+instead and decode one campsite object at a time with the C JSON decoder,
+so at most one site (plus one chunk of text) is alive at once:
+
+* :func:`iter_campsites` yields ``(site_id, site)`` pairs;
+* :func:`iter_matching` yields only the ``(site_id, day)`` pairs whose
+  status, campsite type and date pass a watcher-style filter
+  (:func:`match_sites` applies the same filter to already decoded sites);
+* :func:`available_rows` returns the same rows as
+  :meth:`AvailabilityMatrix.available_rows` for a single check.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from datetime import date
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Tuple
+
+from .matrix import AVAILABLE, OTHER, STATUS_CODES, site_flags
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Scanner:
+    """A text buffer over a chunk stream, refilled on demand."""
+
+    def __init__(self, chunks: Iterable[bytes | str]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping consumed text; ``False`` at EOF."""
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                self.buf = self.buf[self.pos :] + text
+                self.pos = 0
+                return True
+        self.buf = self.buf[self.pos :] + self._utf8.decode(b"", final=True)
+        self.pos = 0
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """The next non-whitespace character, without consuming it."""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON payload")
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON payload, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode one complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A value ending exactly at the buffer edge may be a truncated
+            # number; members are always followed by "," or "}".
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_campsites(chunks: Iterable[bytes | str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(site_id, site)`` for each entry of the payload's ``campsites``."""
+    scanner = _Scanner(chunks)
+    scanner.expect("{")
+    if scanner.peek() == "}":
+        return
+    while True:
+        key = scanner.value()
+        scanner.expect(":")
+        if key == "campsites" and scanner.peek() == "{":
+            scanner.pos += 1
+            if scanner.peek() != "}":
+                while True:
+                    site_id = scanner.value()
+                    scanner.expect(":")
+                    yield str(site_id), scanner.value()
+                    if scanner.peek() != ",":
+                        break
+                    scanner.pos += 1
+            scanner.expect("}")
+        else:
+            scanner.value()
+        if scanner.peek() != ",":
+            break
+        scanner.pos += 1
+    scanner.expect("}")
+
+
+def match_sites(
+    sites: Iterable[Tuple[str, Dict[str, Any]]],
+    statuses: Collection[int] = (AVAILABLE,),
+    site_type: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> Iterator[Tuple[str, str]]:
+    """Yield ``(site_id, day)`` for site-days of ``sites`` matching the filter.
+
+    ``statuses`` are ``matrix`` status codes; ``start``/``end`` bound the
+    day inclusively.
+    """
+    first = start.isoformat() if start else ""
+    last = end.isoformat() if end else "9999"
+    for site_id, site in sites:
+        if site_type and site.get("campsite_type") != site_type:
+            continue
+        for day, value in (site.get("availabilities") or {}).items():
+            if STATUS_CODES.get(value, OTHER) in statuses and first <= day[:10] <= last:
+                yield site_id, day
+
+
+def iter_matching(
+    chunks: Iterable[bytes | str],
+    statuses: Collection[int] = (AVAILABLE,),
+    site_type: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> Iterator[Tuple[str, str]]:
+    """:func:`match_sites` over a payload streamed as ``chunks``."""
+    return match_sites(iter_campsites(chunks), statuses, site_type, start, end)
+
+
+def available_rows(
+    chunks: Iterable[bytes | str], site_type: str | None = None
+) -> List[Dict[str, Any]]:
+    """Available site-days in the ``check_availability`` row format."""
+    rows: List[Dict[str, Any]] = []
+    for site_id, site in iter_campsites(chunks):
+        ctype = site.get("campsite_type") or ""
+        if site_type and ctype != site_type:
+            continue
+        flags = site_flags(ctype)
+        for day, value in sorted((site.get("availabilities") or {}).items()):
+            if value == "Available":
+                entry = {"site_id": site_id, "date": day}
+                entry.update(flags)
+                rows.append(entry)
+    return rows
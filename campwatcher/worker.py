@@ -0,0 +1,476 @@
+"""Standalone watcher worker with lease-based claiming.
+
+The ``watchers`` table doubles as the job store: ``next_run_at`` says when a
+watcher is due and ``lease_owner``/``lease_expires_at`` record which worker
+is currently running it. Any number of worker processes can point at the
+same ``DATABASE_URI``; each claims a disjoint batch of due watchers with a
+conditional ``UPDATE`` and a crashed worker's lease simply expires.
+
+Work that must happen once per deployment rather than once per process --
+polling ReserveCalifornia around release times, sampling availability
+history and pruning snapshots of deleted watchers -- is done only by the
+worker holding the ``poller`` row in the ``leases`` table. Release changes
+it sees mark the affected watchers due, and they are claimed like any
+other due watcher.
+
+Run it with ``python -m campwatcher.worker``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Dict, List, Set, Tuple
+
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .api import month_range
+from .config import config
+from .metrics import registry, serve, timer
+from .db import SessionLocal, session_scope
+from .diffing import prune_snapshots
+from .models import Lease, Watcher
+from .notify import get_dispatcher
+from .providers import RECGOV, RESERVE_CA, get_provider
+from .scheduling import run_watchers, watch_window
+
+logger = logging.getLogger(__name__)
+
+# Held by the one worker that polls releases and samples history.
+POLLER_LEASE = "poller"
+
+
+def next_run_time(check_time: str, after: datetime.datetime) -> datetime.datetime:
+    """Return the first HH:MM occurrence at or after ``after``."""
+    hour, minute = map(int, check_time.split(":"))
+    candidate = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate < after:
+        candidate += datetime.timedelta(days=1)
+    return candidate
+
+
+def enqueue(watcher: Watcher, now: datetime.datetime | None = None) -> None:
+    """Set a new watcher's first run; the caller commits."""
+    watcher.next_run_at = next_run_time(
+        watcher.check_time, now or datetime.datetime.now()
+    )
+
+
+def backfill(
+    session: Session, now: datetime.datetime, chunk_size: int = 1000
+) -> int:
+    """Give rows created before the worker existed a ``next_run_at``.
+
+    Works through the table ``chunk_size`` rows at a time with bulk
+    updates, so startup never materializes the whole table.
+    """
+    total = 0
+    while True:
+        chunk = session.execute(
+            select(Watcher.id, Watcher.check_time)
+            .where(Watcher.next_run_at.is_(None))
+            .limit(chunk_size)
+        ).all()
+        if not chunk:
+            break
+        session.execute(
+            update(Watcher),
+            [
+                {"id": watcher_id, "next_run_at": next_run_time(check_time, now)}
+                for watcher_id, check_time in chunk
+            ],
+        )
+        session.commit()
+        total += len(chunk)
+    return total
+
+
+def claim_due(
+    session: Session,
+    owner: str,
+    now: datetime.datetime,
+    limit: int,
+    lease_seconds: int,
+) -> List[Watcher]:
+    """Atomically lease up to ``limit`` due watchers for ``owner``.
+
+    Candidate IDs are read first; the lease is then taken with one
+    ``UPDATE`` that re-checks the lease condition, so watchers grabbed by
+    another worker in between are skipped rather than run twice.
+    """
+    lease_free = _lease_free(now)
+    ids = [
+        row.id
+        for row in session.query(Watcher.id)
+        .filter(Watcher.next_run_at <= now, lease_free)
+        .order_by(Watcher.next_run_at)
+        .limit(limit)
+    ]
+    if not ids:
+        return []
+    token = f"{owner}:{uuid.uuid4().hex}"
+    session.execute(
+        update(Watcher)
+        .where(Watcher.id.in_(ids), lease_free)
+        .values(
+            lease_owner=token,
+            lease_expires_at=now + datetime.timedelta(seconds=lease_seconds),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return session.query(Watcher).filter(Watcher.lease_owner == token).all()
+
+
+def complete(
+    session: Session, watchers: List[Watcher], now: datetime.datetime, token: str
+) -> int:
+    """Release ``token``'s leases and schedule each watcher's next run.
+
+    The ``UPDATE`` only matches rows still leased to ``token``: a watcher
+    whose lease expired and was claimed by another worker is left alone.
+    Returns how many leases were released, where the driver reports
+    ``executemany`` row counts.
+    """
+    if not watchers:
+        return 0
+    stmt = (
+        update(Watcher)
+        .where(Watcher.id == bindparam("watcher_id"), Watcher.lease_owner == token)
+        .values(next_run_at=bindparam("next_run"), lease_owner=None, lease_expires_at=None)
+    )
+    result = session.connection().execute(
+        stmt,
+        [
+            {
+                "watcher_id": watcher.id,
+                "next_run": next_run_time(
+                    watcher.check_time, now + datetime.timedelta(minutes=1)
+                ),
+            }
+            for watcher in watchers
+        ],
+    )
+    session.commit()
+    released = result.rowcount
+    if session.get_bind().dialect.supports_sane_multi_rowcount and released < len(watchers):
+        logger.warning(
+            "%s of %s leases expired before completion", len(watchers) - released, len(watchers)
+        )
+    return released
+
+
+def _lease_free(now: datetime.datetime):
+    return or_(Watcher.lease_expires_at.is_(None), Watcher.lease_expires_at < now)
+
+
+def due_count(session: Session, now: datetime.datetime) -> int:
+    """Watchers due and unclaimed at ``now`` -- the job queue depth."""
+    return (
+        session.query(func.count(Watcher.id))
+        .filter(Watcher.next_run_at <= now, _lease_free(now))
+        .scalar()
+    )
+
+
+def _metric_families():
+    with session_scope() as session:
+        depth = due_count(session, datetime.datetime.now())
+    return [
+        (
+            "campwatcher_watchers_due",
+            "gauge",
+            "Watchers due and not yet claimed by a worker.",
+            [("", {}, depth)],
+        )
+    ]
+
+
+registry.add_collector(_metric_families)
+
+
+def release_targets(
+    session: Session, today: datetime.date | None = None
+) -> Set[Tuple[str, str, str]]:
+    """(park_id, facility_id, start_date) polled for ReserveCalifornia watchers."""
+    today = today or datetime.date.today()
+    provider = get_provider(RESERVE_CA)
+    rows = session.execute(
+        select(
+            Watcher.campground_id, Watcher.facility_id, Watcher.start_date, Watcher.end_date
+        )
+        .where(Watcher.provider == RESERVE_CA, Watcher.facility_id.isnot(None))
+        .execution_options(yield_per=1000)
+    )
+    targets: Set[Tuple[str, str, str]] = set()
+    for row in rows:
+        window = watch_window(row, today)
+        targets.update(provider.keys(row.campground_id, row.facility_id, *window))
+    return targets
+
+
+def history_targets(
+    session: Session, today: datetime.date | None = None
+) -> Set[Tuple[str, str]]:
+    """(campground_id, month) pages sampled into the history store."""
+    today = today or datetime.date.today()
+    rows = session.execute(
+        select(Watcher.campground_id, Watcher.start_date, Watcher.end_date)
+        .where(or_(Watcher.provider == RECGOV, Watcher.provider.is_(None)))
+        .execution_options(yield_per=1000)
+    )
+    targets: Set[Tuple[str, str]] = set()
+    for row in rows:
+        start, end = watch_window(row, today)
+        targets.update((row.campground_id, month) for month in month_range(start, end))
+    return targets
+
+
+def mark_release_due(
+    session: Session,
+    target: Tuple[str, str, str],
+    now: datetime.datetime,
+    today: datetime.date | None = None,
+) -> int:
+    """Make the watchers behind a changed ReserveCalifornia target due at ``now``.
+
+    They are then claimed and run through the usual lease, so one release
+    change is evaluated once however many workers are running. Watchers
+    that are currently leased are already being checked and are skipped.
+    """
+    park_id, facility_id, _ = target
+    today = today or now.date()
+    provider = get_provider(RESERVE_CA)
+    ids = [
+        row.id
+        for row in session.execute(
+            select(Watcher.id, Watcher.start_date, Watcher.end_date).where(
+                Watcher.provider == RESERVE_CA,
+                Watcher.campground_id == park_id,
+                Watcher.facility_id == facility_id,
+            )
+        )
+        if target in provider.keys(park_id, facility_id, *watch_window(row, today))
+    ]
+    if not ids:
+        return 0
+    result = session.execute(
+        update(Watcher)
+        .where(Watcher.id.in_(ids), _lease_free(now))
+        .values(next_run_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return result.rowcount
+
+
+def acquire_lease(
+    session: Session, name: str, owner: str, now: datetime.datetime, seconds: float
+) -> bool:
+    """Take or renew the named lease for ``owner``; True while ``owner`` holds it.
+
+    Used to elect the single worker that polls ReserveCalifornia releases
+    and samples availability history. A holder that stops renewing loses
+    the lease once it expires.
+    """
+    expires_at = now + datetime.timedelta(seconds=seconds)
+    result = session.execute(
+        update(Lease)
+        .where(Lease.name == name, or_(Lease.owner == owner, Lease.expires_at < now))
+        .values(owner=owner, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        session.commit()
+        return True
+    try:
+        session.execute(insert(Lease).values(name=name, owner=owner, expires_at=expires_at))
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return False
+    return True
+
+
+class Worker:
+    """Claims and runs batches of due watchers."""
+
+    def __init__(
+        self,
+        owner: str | None = None,
+        batch_size: int = config.worker_batch_size,
+        lease_seconds: int = config.worker_lease_seconds,
+    ) -> None:
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+
+    def run_once(self, now: datetime.datetime | None = None) -> int:
+        """Run every watcher due at ``now``; return how many were run."""
+        now = now or datetime.datetime.now()
+        session = SessionLocal()
+        total = 0
+        try:
+            with timer("db"):
+                backfill(session, now)
+            while True:
+                with timer("db"):
+                    batch = claim_due(
+                        session, self.owner, now, self.batch_size, self.lease_seconds
+                    )
+                if not batch:
+                    break
+                token = batch[0].lease_owner
+                for watcher in batch:
+                    lag = (datetime.datetime.now() - watcher.next_run_at).total_seconds()
+                    registry.lag.observe(max(0.0, lag))
+                try:
+                    run_watchers(session, batch, now)
+                finally:
+                    with timer("db"):
+                        complete(session, batch, now, token)
+                total += len(batch)
+        finally:
+            SessionLocal.remove()
+        if total:
+            logger.info("Worker %s ran %s watchers", self.owner, total)
+        return total
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run campsite watchers.")
+    parser.add_argument("--once", action="store_true", help="run due watchers and exit")
+    parser.add_argument(
+        "--poll", type=float, default=config.worker_poll_seconds, help="seconds between polls"
+    )
+    parser.add_argument(
+        "--reserve-ca",
+        action="append",
+        default=[],
+        metavar="PARK:FACILITY:START",
+        help="also poll a facility without a stored watcher around its release times",
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, default=0, help="serve /metrics on this port"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    worker = Worker()
+    if args.metrics_port:
+        serve(args.metrics_port)
+    if args.once:
+        worker.run_once()
+        get_dispatcher().flush()
+        return
+
+    from apscheduler.schedulers.blocking import BlockingScheduler
+
+    from .history import get_history, sample
+    from .release import ReleaseScheduler, get_release_times
+
+    lease_seconds = max(config.worker_lease_seconds, 2 * args.poll)
+
+    def lead() -> bool:
+        """Take or renew the poller lease; only its holder polls upstream."""
+        with session_scope() as session:
+            return acquire_lease(
+                session, POLLER_LEASE, worker.owner, datetime.datetime.now(), lease_seconds
+            )
+
+    def on_release_change(target: Tuple[str, str, str], payload: Dict[str, Any]) -> None:
+        # Reuse the polled payload, then run the affected watchers through
+        # the lease so no other worker evaluates them at the same time.
+        get_provider(RESERVE_CA).prime(target, payload)
+        with session_scope() as session:
+            due = mark_release_due(session, target, datetime.datetime.now())
+        if due:
+            worker.run_once()
+
+    blocking = BlockingScheduler()
+    releases = ReleaseScheduler(blocking, get_release_times(), on_change=on_release_change)
+    manual = set()
+    for spec in args.reserve_ca:
+        park_id, facility_id, start_date = spec.split(":")
+        manual.add((park_id, facility_id, start_date))
+        releases.watch(park_id, facility_id, start_date)
+
+    synced: Set[Tuple[str, str, str]] = set()
+
+    def sync_releases() -> None:
+        targets: Set[Tuple[str, str, str]] = set()
+        if lead():
+            with session_scope() as session:
+                targets = release_targets(session)
+        for target in synced - targets - manual:
+            releases.unwatch(*target)
+        for target in targets - synced:
+            releases.watch(*target)
+        synced.clear()
+        synced.update(targets)
+
+    blocking.add_job(
+        sync_releases,
+        trigger="interval",
+        seconds=args.poll,
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.datetime.now(),
+    )
+    blocking.add_job(
+        worker.run_once,
+        trigger="interval",
+        seconds=args.poll,
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.datetime.now(),
+    )
+    history = get_history()
+    if history is not None:
+
+        def sample_history() -> None:
+            if not lead():
+                return
+            with session_scope() as session:
+                targets = history_targets(session)
+            sampled = sample(history, targets)
+            history.downsample()
+            logger.info("Sampled availability history for %s pages", sampled)
+
+        blocking.add_job(
+            sample_history,
+            trigger="interval",
+            seconds=config.history_sample_seconds,
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.datetime.now(),
+        )
+
+    def prune() -> None:
+        if not lead():
+            return
+        with session_scope() as session:
+            pruned = prune_snapshots(session)
+        if pruned:
+            logger.info("Pruned %s snapshots of deleted watchers", pruned)
+
+    blocking.add_job(
+        prune,
+        trigger="interval",
+        seconds=config.snapshot_prune_seconds,
+        max_instances=1,
+        coalesce=True,
+    )
+    logger.info("Worker %s polling every %ss", worker.owner, args.poll)
+    blocking.start()
+
+
+if __name__ == "__main__":
+    main()
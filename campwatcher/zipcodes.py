@@ -0,0 +1,93 @@
+"""ZIP code centroids for coordinate lookups.
+
+``ZIP_CENTROIDS_PATH`` points at a delimited file of ZIP centroids, e.g. the
+Census ZCTA Gazetteer (``2023_Gaz_zcta_national.txt``, tab-separated with
+``GEOID``/``INTPTLAT``/``INTPTLONG``) or any CSV with ``zip``, ``lat`` and
+``lon`` columns. The file is read on first lookup. Without it, the few demo
+ZIPs in :data:`campground_data.ZIP_CENTROIDS` are used.
+"""
+
+from __future__ import annotations
+
+import csv
+import threading
+from typing import Dict, Iterable, Iterator, Tuple
+
+from .config import config
+
+ZIP_COLUMNS = ("geoid", "zcta5", "zcta", "zip", "zipcode", "zip_code")
+LAT_COLUMNS = ("intptlat", "lat", "latitude")
+LON_COLUMNS = ("intptlong", "lon", "lng", "long", "longitude")
+
+
+def normalize_zip(value: str) -> str:
+    """Five-digit ZIP for ``value`` ("9410" -> "09410", "94102-1234" -> "94102")."""
+    return value.strip().split("-")[0].zfill(5)
+
+
+def _column(header: list, names: Tuple[str, ...]) -> int:
+    for name in names:
+        if name in header:
+            return header.index(name)
+    raise ValueError(f"ZIP centroid file needs one of the columns {', '.join(names)}")
+
+
+def read_centroids(path: str) -> Iterator[Tuple[str, float, float]]:
+    """Yield ``(zip, lat, lon)`` from a CSV or tab-separated centroid file."""
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        first = fh.readline()
+        delimiter = "\t" if "\t" in first else ","
+        header = [h.strip().lower() for h in next(csv.reader([first], delimiter=delimiter))]
+        zip_col = _column(header, ZIP_COLUMNS)
+        lat_col = _column(header, LAT_COLUMNS)
+        lon_col = _column(header, LON_COLUMNS)
+        for row in csv.reader(fh, delimiter=delimiter):
+            if len(row) > max(zip_col, lat_col, lon_col) and row[zip_col].strip():
+                yield (
+                    normalize_zip(row[zip_col]),
+                    float(row[lat_col]),
+                    float(row[lon_col]),
+                )
+
+
+class ZipTable:
+    """ZIP -> (lat, lon) lookups, loaded lazily from ``rows``."""
+
+    def __init__(self, rows: Iterable[Tuple[str, float, float]]) -> None:
+        self._rows = rows
+        self._coords: Dict[str, Tuple[float, float]] | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Tuple[float, float]]:
+        if self._coords is None:
+            with self._lock:
+                if self._coords is None:
+                    self._coords = {z: (lat, lon) for z, lat, lon in self._rows}
+        return self._coords
+
+    def lookup(self, zip_code: str) -> Tuple[float, float] | None:
+        return self._load().get(normalize_zip(zip_code))
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+_table: ZipTable | None = None
+_table_lock = threading.Lock()
+
+
+def get_zip_table() -> ZipTable:
+    """Return the process-wide table from ``ZIP_CENTROIDS_PATH`` (or the demo ZIPs)."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                if config.zip_centroids_path:
+                    _table = ZipTable(read_centroids(config.zip_centroids_path))
+                else:
+                    from campground_data import ZIP_CENTROIDS
+
+                    _table = ZipTable(
+                        (z, lat, lon) for z, (lat, lon) in ZIP_CENTROIDS.items()
+                    )
+    return _table
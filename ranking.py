@@ -3,20 +3,39 @@
 
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date
 from typing import Dict, List, Tuple
 
-import requests
+from campwatcher import api
 from campwatcher.config import config
+from campwatcher.history import HistoryAggregate, get_history
+from campwatcher.matrix import AvailabilityMatrix
 
 
 def _fetch_availability(campground_id: str, month_str: str) -> Dict:
-    url = config.availability_api.format(campground_id=campground_id)
     """Return raw availability JSON for a campground and month."""
-    start_date = f"{month_str}-01T00:00:00.000Z"
-    resp = requests.get(url, params={"start_date": start_date})
-    resp.raise_for_status()
-    return resp.json()
+    return api.fetch_availability(campground_id, month_str)
+
+
+def _live(
+    campground_id: str, month: str
+) -> Tuple[AvailabilityMatrix, HistoryAggregate | None]:
+    """Fetch and parse one month, recording it in the history store if enabled."""
+    matrix = AvailabilityMatrix.from_payload(_fetch_availability(campground_id, month))
+    history = get_history()
+    aggregate = history.record(campground_id, month, matrix) if history else None
+    return matrix, aggregate
+
+
+def _aggregate(campground_id: str, month: str) -> HistoryAggregate | None:
+    """A precomputed aggregate no older than ``HISTORY_MAX_AGE``, if any."""
+    history = get_history()
+    if history is None:
+        return None
+    return history.latest(campground_id, month, max_age=config.history_max_age)
 
 
 def difficulty_score(campground_id: str, month: str | None = None) -> float:
@@ -24,22 +43,14 @@ def difficulty_score(campground_id: str, month: str | None = None) -> float:
 
     The score is 1.0 when no sites are available at all and decreases as
     availability increases. 0.0 means every site is available every day.
+    A recent history sample is used instead of fetching when available.
     """
     if not month:
         month = date.today().strftime("%Y-%m")
-    data = _fetch_availability(campground_id, month)
-    total_days = 0
-    available_days = 0
-    for site in data.get("campsites", {}).values():
-        availabilities = site.get("availabilities", {})
-        total_days += len(availabilities)
-        available_days += sum(
-            1 for val in availabilities.values() if val == "Available"
-        )
-    if total_days == 0:
-        return 1.0
-    ratio = available_days / total_days
-    return 1.0 - ratio
+    aggregate = _aggregate(campground_id, month)
+    if aggregate is not None:
+        return aggregate.difficulty
+    return _live(campground_id, month)[0].difficulty_score()
 
 
 def rank_sites_for_campground(
@@ -48,16 +59,39 @@ def rank_sites_for_campground(
     """Return site IDs ranked by scarcity (lower availability first)."""
     if not month:
         month = date.today().strftime("%Y-%m")
-    data = _fetch_availability(campground_id, month)
-    site_scores: List[Tuple[str, float]] = []
-    for site_id, site in data.get("campsites", {}).items():
-        availabilities = site.get("availabilities", {})
-        total = len(availabilities)
-        available = sum(1 for val in availabilities.values() if val == "Available")
-        rate = available / total if total else 0.0
-        site_scores.append((site_id, rate))
-    site_scores.sort(key=lambda t: t[1])  # least available first
-    return site_scores
+    history = get_history()
+    if _aggregate(campground_id, month) is not None:
+        ranked = history.latest_sites(campground_id, month)
+        if ranked is not None:
+            return ranked
+    return _live(campground_id, month)[0].ranked_sites()
+
+
+def trend_score(campground_id: str, month: str | None = None) -> float:
+    """Difficulty projected a week ahead from the recorded availability trend.
+
+    Equals :func:`difficulty_score` until there is more than one sample.
+    """
+    if not month:
+        month = date.today().strftime("%Y-%m")
+    aggregate = _aggregate(campground_id, month)
+    if aggregate is None:
+        matrix, aggregate = _live(campground_id, month)
+        if aggregate is None:
+            return matrix.difficulty_score()
+    return aggregate.trend
+
+
+def time_to_book(campground_id: str, month: str | None = None) -> float | None:
+    """Seconds it took half of the peak availability to be booked.
+
+    Read from the history store only; ``None`` without enough history.
+    """
+    if not month:
+        month = date.today().strftime("%Y-%m")
+    history = get_history()
+    aggregate = history.latest(campground_id, month) if history else None
+    return aggregate.time_to_book if aggregate else None
 
 
 def rank_campgrounds(
@@ -69,3 +103,58 @@ def rank_campgrounds(
         scores.append((cid, difficulty_score(cid, month)))
     scores.sort(key=lambda t: t[1], reverse=True)
     return scores
+
+
+@dataclass
+class RankingResult:
+    """Campground scores plus the errors for campgrounds that failed."""
+
+    scores: List[Tuple[str, float]] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+async def rank_campgrounds_async(
+    campground_ids: List[str],
+    month: str | None = None,
+    concurrency: int | None = None,
+) -> RankingResult:
+    """Score campgrounds concurrently and rank them by difficulty.
+
+    At most ``concurrency`` fetches run at once over the shared pooled
+    client; its per-host rate limiter still applies. Campgrounds whose
+    fetch fails are reported in ``errors`` instead of aborting the whole
+    ranking.
+    """
+    limit = concurrency or config.rank_concurrency
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(limit)
+    result = RankingResult()
+
+    with ThreadPoolExecutor(max_workers=limit) as executor:
+
+        async def score(cid: str) -> float:
+            async with semaphore:
+                return await loop.run_in_executor(
+                    executor, difficulty_score, cid, month
+                )
+
+        outcomes = await asyncio.gather(
+            *(score(cid) for cid in campground_ids), return_exceptions=True
+        )
+
+    for cid, outcome in zip(campground_ids, outcomes):
+        if isinstance(outcome, BaseException):
+            result.errors[cid] = str(outcome)
+        else:
+            result.scores.append((cid, outcome))
+    result.scores.sort(key=lambda t: t[1], reverse=True)
+    return result
+
+
+def rank_campgrounds_concurrent(
+    campground_ids: List[str],
+    month: str | None = None,
+    concurrency: int | None = None,
+) -> RankingResult:
+    """Synchronous wrapper around :func:`rank_campgrounds_async`."""
+    return asyncio.run(rank_campgrounds_async(campground_ids, month, concurrency))
@@ -1,11 +1,18 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from typing import Iterable
+
+from campwatcher.client import client
+from campwatcher.metrics import timer
 
 PARK_PAGE_URL = "https://www.reservecalifornia.com/Web/#!park/{park_id}/{facility_id}"
 AVAILABILITY_API = "https://calirdr.usedirect.com/RDR/rdr/availability/park"
 
+UPDATE_TIME_RE = re.compile(rb'"nextAvailabilityUpdate"\s*:\s*"([^"]+)"')
+CHUNK_SIZE = 16 * 1024
+# Bytes carried over between chunks; longer than any complete match.
+_OVERLAP = 256
+
 
 def fetch_availability(park_id: str, facility_id: str, start_date: str):
     """Fetch availability data for a specific park and facility.
@@ -29,30 +36,45 @@ def fetch_availability(park_id: str, facility_id: str, start_date: str):
         "facilityId": facility_id,
         "startDate": start_date,
     }
-    resp = requests.get(AVAILABILITY_API, params=params)
-    resp.raise_for_status()
-    return resp.json()
+    with timer("fetch"):
+        resp = client.get(AVAILABILITY_API, params=params, endpoint="ca_availability")
+        resp.raise_for_status()
+    with timer("json_decode"):
+        return resp.json()
 
 
-def fetch_update_time(park_id: str, facility_id: str):
-    """Parse the park page to determine the next availability update time.
+def extract_update_time(chunks: Iterable[bytes]):
+    """Scan an HTML byte stream for ``nextAvailabilityUpdate``.
 
-    The ReserveCalifornia park page embeds a JSON blob containing the next time
-    new availability will be released. This function extracts that timestamp and
-    returns it as a ``datetime``.
+    Chunks are consumed only until the first parseable timestamp is found,
+    so the rest of the page is never read. The tail of each chunk is kept so
+    a match split across chunk boundaries is still found.
     """
-    url = PARK_PAGE_URL.format(park_id=park_id, facility_id=facility_id)
-    resp = requests.get(url)
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
-    script_tags = soup.find_all("script")
-    for tag in script_tags:
-        if not tag.string:
-            continue
-        m = re.search(r'"nextAvailabilityUpdate"\s*:\s*"([^"]+)"', tag.string)
-        if m:
+    buf = b""
+    for chunk in chunks:
+        buf += chunk
+        searched = 0
+        for m in UPDATE_TIME_RE.finditer(buf):
+            searched = m.end()
             try:
-                return datetime.fromisoformat(m.group(1))
+                return datetime.fromisoformat(m.group(1).decode())
             except ValueError:
                 pass
+        buf = buf[max(searched, len(buf) - _OVERLAP):]
     return None
+
+
+def fetch_update_time(park_id: str, facility_id: str):
+    """Read the park page to determine the next availability update time.
+
+    The ReserveCalifornia park page embeds a JSON blob containing the next time
+    new availability will be released. The page is streamed and the download
+    stops as soon as that timestamp has been found.
+    """
+    url = PARK_PAGE_URL.format(park_id=park_id, facility_id=facility_id)
+    resp = client.get(url, endpoint="ca_park_page", stream=True)
+    try:
+        resp.raise_for_status()
+        return extract_update_time(resp.iter_content(chunk_size=CHUNK_SIZE))
+    finally:
+        resp.close()
@@ -1,7 +1,10 @@
+import time
+
 import streamlit as st
 from campwatcher import api
-from ranking import difficulty_score
-from campground_data import CAMPGROUND_ATTRIBUTES
+from campwatcher.live import get_hub
+from ranking import rank_campgrounds_concurrent
+from campwatcher.attributes import get_store
 
 st.set_page_config(page_title="Campsite Finder", page_icon="\U0001F3D5")
 st.title("Campsite Finder")
@@ -13,6 +16,12 @@ with col1:
 with col2:
     longitude = st.text_input("Longitude", placeholder="Optional")
 
+@st.cache_resource
+def live_hub():
+    """One hub per Streamlit server, shared by every browser session."""
+    return get_hub()
+
+
 filters = st.sidebar
 filters.header("Filters")
 tent_only = filters.checkbox("Tent only")
@@ -23,21 +32,52 @@ if st.button("Search"):
         st.warning("Enter a search term.")
     else:
         results = api.fetch_campgrounds(query, latitude or None, longitude or None)
+        matches = get_store().filter_campgrounds(results, tent_only, no_rv)
+        ranking = rank_campgrounds_concurrent(
+            [str(camp.get("FacilityID")) for camp in matches]
+        )
+        scores = dict(ranking.scores)
         display = []
-        for camp in results:
+        for camp in matches:
             cid = str(camp.get("FacilityID"))
-            attrs = CAMPGROUND_ATTRIBUTES.get(cid, {})
-            if tent_only and not attrs.get("tent_only"):
-                continue
-            if no_rv and not attrs.get("no_rv"):
-                continue
-            score = difficulty_score(cid)
+            score = scores.get(cid)
             display.append({
                 "Name": camp.get("FacilityName"),
                 "ID": cid,
-                "Difficulty": f"{score:.2f}",
+                "Difficulty": f"{score:.2f}" if score is not None else "n/a",
             })
+        if ranking.errors:
+            st.caption(
+                f"Could not score {len(ranking.errors)} campground(s): "
+                + ", ".join(sorted(ranking.errors))
+            )
         if display:
             st.dataframe(display)
         else:
             st.info("No results found.")
+
+st.header("Live Availability")
+live_ids = st.text_input("Campground IDs to watch", placeholder="232450, 234567")
+live_seconds = st.slider("Watch for (seconds)", 10, 300, 60)
+if st.button("Watch") and live_ids:
+    ids = [cid.strip() for cid in live_ids.split(",") if cid.strip()]
+    hub = live_hub()
+    sub = hub.subscribe(ids)
+    feed = st.empty()
+    lines = []
+    deadline = time.monotonic() + live_seconds
+    try:
+        for event in sub.events(timeout=1.0):
+            if time.monotonic() > deadline:
+                break
+            if event is None:
+                continue
+            label = "currently open" if event["snapshot"] else "newly open"
+            lines.insert(
+                0,
+                f"{event['campground_id']}: {len(event['opened'])} {label}, "
+                f"{len(event['closed'])} booked",
+            )
+            feed.text("\n".join(lines[:50]))
+    finally:
+        hub.unsubscribe(sub)
@@ -0,0 +1,75 @@
+import sys, os
+import datetime
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher import api
+
+
+def test_month_range_spans_year_boundary():
+    assert api.month_range(datetime.date(2024, 11, 20), datetime.date(2025, 2, 1)) == [
+        "2024-11",
+        "2024-12",
+        "2025-01",
+        "2025-02",
+    ]
+
+
+class _StreamedResponse:
+    def __init__(self, body):
+        self.body = body
+        self.closed = False
+
+    def iter_content(self, size):
+        return [self.body[i : i + size] for i in range(0, len(self.body), 3)]
+
+    def close(self):
+        self.closed = True
+
+
+def _month_payload(month_str):
+    return {
+        "campsites": {
+            "1": {
+                "campsite_type": "STANDARD NONELECTRIC",
+                "availabilities": {
+                    f"{month_str}-01T00:00:00Z": "Available",
+                    f"{month_str}-02T00:00:00Z": "Reserved",
+                    f"{month_str}-20T00:00:00Z": "Available",
+                },
+            },
+            "2": {
+                "campsite_type": "RV ELECTRIC",
+                "availabilities": {f"{month_str}-01T00:00:00Z": "Available"},
+            },
+        }
+    }
+
+
+def test_stream_available_filters_off_the_response_and_closes_it(monkeypatch):
+    responses = []
+
+    def fake_request(campground_id, month_str, stream=False):
+        assert stream
+        responses.append(_StreamedResponse(json.dumps(_month_payload(month_str)).encode()))
+        return responses[-1]
+
+    monkeypatch.setattr(api, "_request_month", fake_request)
+    pairs = api.stream_available(
+        "streamed", "2024-06", "STANDARD NONELECTRIC", end=datetime.date(2024, 6, 10)
+    )
+    assert list(pairs) == [("1", "2024-06-01T00:00:00Z")]
+    assert responses[0].closed
+
+
+def test_stream_available_reuses_a_cached_page(monkeypatch):
+    monkeypatch.setattr(api, "_request_month", lambda *a, **k: pytest.fail("fetched"))
+    api.availability_cache.put(("cached", "2024-06"), _month_payload("2024-06"))
+    try:
+        pairs = api.stream_available("cached", "2024-06", start=datetime.date(2024, 6, 2))
+        assert list(pairs) == [("1", "2024-06-20T00:00:00Z")]
+    finally:
+        api.availability_cache.invalidate(("cached", "2024-06"))
@@ -0,0 +1,41 @@
+import sys, os
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher.attributes import AttributeStore, read_rows
+
+
+def test_store_filters_with_bitmaps(tmp_path):
+    path = str(tmp_path / "attrs.db")
+    AttributeStore(path).bulk_import(
+        [
+            {"campground_id": "1", "tent_only": True, "no_rv": True, "site_types": ["TENT"]},
+            {"campground_id": "2", "tent_only": False, "no_rv": True},
+            {"campground_id": "3", "tent_only": "false", "no_rv": "0"},
+        ]
+    )
+    store = AttributeStore(path)
+    assert len(store) == 3
+    assert store.matching(no_rv=True) == {"1", "2"}
+    assert store.matching(tent_only=True, no_rv=True) == {"1"}
+    assert store.matching(site_types=["TENT"]) == {"1"}
+    assert store.get("2") == {"tent_only": False, "no_rv": True}
+    assert store.get("missing") == {}
+
+
+def test_bulk_import_upserts_and_reads_ndjson(tmp_path):
+    src = tmp_path / "attrs.ndjson"
+    src.write_text(
+        "\n".join(
+            json.dumps(row)
+            for row in [
+                {"campground_id": "1", "tent_only": False, "no_rv": False},
+                {"campground_id": "1", "tent_only": True, "no_rv": True},
+            ]
+        )
+    )
+    store = AttributeStore()
+    store.bulk_import(read_rows(str(src)))
+    camps = [{"FacilityID": 1}, {"FacilityID": 2}]
+    assert store.filter_campgrounds(camps, tent_only=True) == [{"FacilityID": 1}]
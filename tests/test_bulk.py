@@ -0,0 +1,74 @@
+import sys, os
+import contextlib
+import datetime
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy.orm import sessionmaker
+
+from campwatcher.bulk import export_ndjson, iter_ndjson, validate_watchers
+from campwatcher.db import init_db, insert_watchers, make_engine
+
+NOW = datetime.datetime(2024, 6, 1, 8, 30)
+
+
+def test_validate_reports_every_bad_item():
+    lines = [
+        b'{"campground_id": "1", "check_time": "09:00"}\n',
+        b"\n",
+        b"not json\n",
+        b'{"campground_id": "2", "check_time": "25:00"}\n',
+        b'{"provider": "reserve_ca", "campground_id": "3", "check_time": "07:00"}\n',
+    ]
+    rows, errors = validate_watchers(iter_ndjson(lines), NOW)
+    assert [row["campground_id"] for row in rows] == ["1"]
+    assert rows[0]["next_run_at"] == datetime.datetime(2024, 6, 1, 9, 0)
+    assert [e["index"] for e in errors] == [1, 2, 3]
+
+
+def test_bulk_insert_then_export_round_trips():
+    engine = make_engine("sqlite://")
+    init_db(engine)
+    session = sessionmaker(bind=engine)()
+    items = [{"campground_id": str(i), "check_time": "07:00"} for i in range(5)]
+    rows, errors = validate_watchers(items, NOW)
+    assert errors == []
+    ids = insert_watchers(session, rows)
+    session.commit()
+
+    exported = [json.loads(line) for line in export_ndjson(session, chunk_size=2)]
+    assert [row["id"] for row in exported] == ids
+    assert "email" not in exported[0]
+    assert "email" in json.loads(next(export_ndjson(session, include_email=True)))
+    assert exported[0]["next_run_at"] == "2024-06-02T07:00:00"
+    assert validate_watchers(exported, NOW)[1] == []
+
+
+def test_validate_caps_the_watch_window():
+    base = {"campground_id": "1", "check_time": "07:00", "start_date": "2024-06-01"}
+    items = [dict(base, end_date="2025-05-31"), dict(base, end_date="2099-12-31")]
+    rows, errors = validate_watchers(items, NOW)
+    assert len(rows) == 1
+    assert [e["index"] for e in errors] == [1]
+    assert "months" in json.dumps(errors[0])
+
+
+def test_export_endpoint_shows_emails_only_to_admins(monkeypatch):
+    import app as webapp
+
+    engine = make_engine("sqlite://")
+    init_db(engine)
+    session = sessionmaker(bind=engine)()
+    rows, _ = validate_watchers([{"campground_id": "1", "check_time": "07:00", "email": "a@b.c"}])
+    insert_watchers(session, rows)
+    session.commit()
+    monkeypatch.setattr(webapp, "session_scope", lambda: contextlib.nullcontext(session))
+    monkeypatch.setattr(webapp.config, "admin_token", "secret")
+    client = webapp.create_app().test_client()
+
+    assert "a@b.c" not in client.get("/watchers").get_data(as_text=True)
+    wrong = client.get("/watchers", headers={"Authorization": "Bearer guess"})
+    assert "a@b.c" not in wrong.get_data(as_text=True)
+    admin = client.get("/watchers", headers={"Authorization": "Bearer secret"})
+    assert json.loads(admin.get_data(as_text=True))["email"] == "a@b.c"
@@ -0,0 +1,57 @@
+import sys, os
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher.cache import AvailabilityCache
+
+
+def test_cache_hits_after_first_fetch():
+    cache = AvailabilityCache(maxsize=4, ttl=60)
+    calls = []
+    fetch = lambda: calls.append(1) or {"campsites": {}}
+    cache.get_or_fetch(("1", "2024-06"), fetch)
+    cache.get_or_fetch(("1", "2024-06"), fetch)
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_expires_and_evicts():
+    now = [0.0]
+    cache = AvailabilityCache(maxsize=1, ttl=10, clock=lambda: now[0])
+    cache.get_or_fetch(("1", "2024-06"), lambda: {"a": 1})
+    cache.get_or_fetch(("2", "2024-06"), lambda: {"b": 1})
+    assert cache.stats()["evictions"] == 1
+    now[0] = 11
+    assert cache.get_or_fetch(("2", "2024-06"), lambda: {"b": 2}) == {"b": 2}
+
+
+def test_cache_coalesces_concurrent_fetches():
+    cache = AvailabilityCache()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"campsites": {}}
+
+    threads = [
+        threading.Thread(target=cache.get_or_fetch, args=(("1", "2024-06"), slow_fetch))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_cache_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    AvailabilityCache(db_path=path).get_or_fetch(("1", "2024-06"), lambda: {"x": 1})
+    fresh = AvailabilityCache(db_path=path)
+    assert fresh.get_or_fetch(("1", "2024-06"), lambda: {"x": 2}) == {"x": 1}
+    assert fresh.stats()["disk_hits"] == 1
@@ -0,0 +1,69 @@
+import sys, os
+import datetime
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher import cli
+from campwatcher.providers import RESERVE_CA, get_provider
+
+from test_providers import _grid
+
+
+def test_check_prints_available_site_nights(monkeypatch, capsys):
+    provider = get_provider(RESERVE_CA)
+    monkeypatch.setattr(provider, "fetch", lambda key: _grid(True))
+
+    code = cli.main(
+        ["check", "1", "--provider", "reserve_ca", "--facility", "2",
+         "--start", "2024-06-01", "--end", "2024-06-02", "--json"]
+    )
+
+    assert code == 0
+    rows = json.loads(capsys.readouterr().out)
+    assert [(r["site_id"], r["date"][:10]) for r in rows] == [("7", "2024-06-01")]
+
+
+def test_check_reports_bad_arguments(capsys):
+    code = cli.main(
+        ["check", "1", "--provider", "reserve_ca", "--start", "2024-06-01", "--end", "2024-06-02"]
+    )
+    assert code == 2
+    assert "facility_id" in capsys.readouterr().err
+
+
+def test_run_delivers_notifications_before_returning(monkeypatch):
+    from campwatcher import notify, scheduling
+
+    events = []
+
+    class FakeDispatcher:
+        def enqueue(self, *message):
+            events.append("enqueue")
+
+        def flush(self):
+            events.append("flush")
+
+    monkeypatch.setattr(notify, "get_dispatcher", lambda: FakeDispatcher())
+    monkeypatch.setattr(
+        scheduling, "run_watcher_ids", lambda ids: notify.get_dispatcher().enqueue(ids)
+    )
+
+    assert cli.main(["run", "12"]) == 0
+    assert events == ["enqueue", "flush"]
+
+
+def test_check_streams_recgov_months(monkeypatch, capsys):
+    from campwatcher import api
+
+    def fake_stream(campground_id, month, site_type, start, end):
+        assert (start, end) == (datetime.date(2024, 6, 30), datetime.date(2024, 7, 1))
+        return iter([("2", f"{month}-01T00:00:00Z"), ("1", f"{month}-01T00:00:00Z")])
+
+    monkeypatch.setattr(api, "stream_available", fake_stream)
+    code = cli.main(["check", "232447", "--start", "2024-06-30", "--end", "2024-07-01"])
+
+    assert code == 0
+    assert capsys.readouterr().out.split() == [
+        "1", "2024-06-01", "2", "2024-06-01", "1", "2024-07-01", "2", "2024-07-01"
+    ]
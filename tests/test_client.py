@@ -0,0 +1,52 @@
+import sys, os
+import io
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher.client import HttpClient
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append(kwargs)
+        item = self.responses.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+def _response(status, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.raw = io.BytesIO(b"")
+    resp.headers.update(headers or {})
+    return resp
+
+
+def test_client_retries_and_honours_retry_after():
+    slept = []
+    client = HttpClient(retries=3, rate_per_host=0, sleep=slept.append)
+    client.session = FakeSession(
+        [
+            requests.ConnectionError("reset"),
+            _response(429, {"Retry-After": "7"}),
+            _response(200),
+        ]
+    )
+    resp = client.get("https://example.com/x", endpoint="example")
+    assert resp.status_code == 200
+    assert len(slept) == 2 and slept[1] == 7.0
+    assert client.session.calls[0]["timeout"] == client.timeout
+    assert client.latency_stats()["example"]["count"] == 3
+
+
+def test_client_returns_last_error_response_when_out_of_retries():
+    client = HttpClient(retries=1, rate_per_host=0, sleep=lambda s: None)
+    client.session = FakeSession([_response(503), _response(503)])
+    assert client.get("https://example.com/x").status_code == 503
@@ -0,0 +1,115 @@
+import sys, os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import sessionmaker
+
+from campwatcher.db import init_db, insert_watchers, load_watchers, make_engine
+from campwatcher.models import Watcher, WatcherSnapshot
+
+
+def test_sqlite_file_uses_wal_and_survives_concurrent_writers(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'w.db'}")
+    init_db(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    factory = sessionmaker(bind=engine)
+    errors = []
+
+    def write(n):
+        try:
+            for i in range(20):
+                with factory.begin() as session:
+                    session.add(Watcher(campground_id=f"{n}-{i}", check_time="08:00"))
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    with factory() as session:
+        assert session.query(Watcher).count() == 80
+
+
+def test_bulk_insert_and_load_use_one_statement_each():
+    engine = make_engine("sqlite://")
+    init_db(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    session = sessionmaker(bind=engine)()
+
+    ids = insert_watchers(
+        session, [{"campground_id": str(i), "check_time": "08:00"} for i in range(50)]
+    )
+    session.commit()
+    assert len(ids) == 50
+    assert len([s for s in statements if s.startswith("INSERT")]) == 1
+
+    statements.clear()
+    watchers = load_watchers(session, ids[::-1])
+    assert [w.campground_id for w in watchers] == [str(i) for i in range(50)]
+    assert watchers[0].provider == "recgov"
+    assert len(statements) == 1
+
+
+def test_init_db_upgrades_an_older_schema(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE watchers (id INTEGER PRIMARY KEY, campground_id VARCHAR NOT NULL,"
+            " site_type VARCHAR, tent_only BOOLEAN, no_rv BOOLEAN, loop VARCHAR,"
+            " check_time VARCHAR NOT NULL, email VARCHAR)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO watchers (campground_id, check_time) VALUES ('232447', '08:00')"
+        )
+        conn.exec_driver_sql(
+            "CREATE TABLE watcher_snapshots (watcher_id INTEGER, month VARCHAR,"
+            " campground_id VARCHAR NOT NULL, payload_hash VARCHAR NOT NULL,"
+            " site_ids TEXT NOT NULL, day_keys TEXT NOT NULL, bits BLOB NOT NULL,"
+            " PRIMARY KEY (watcher_id, month))"
+        )
+    init_db(engine)
+    init_db(engine)  # idempotent
+
+    with sessionmaker(bind=engine)() as session:
+        watcher = session.query(Watcher).filter(Watcher.next_run_at.is_(None)).one()
+        assert watcher.provider == "recgov"
+        assert watcher.min_nights == 1
+        assert watcher.lease_owner is None
+        session.add(
+            WatcherSnapshot(
+                watcher_id=watcher.id,
+                window="2024-06-01..2024-06-30",
+                campground_id="1",
+                payload_hash="h",
+                site_ids="[]",
+                day_keys="[]",
+                bits=b"",
+            )
+        )
+        session.commit()
+    with engine.connect() as conn:
+        indexes = {row[1] for row in conn.exec_driver_sql("PRAGMA index_list(watchers)")}
+    assert "ix_watchers_next_run_at" in indexes
+
+
+def test_bulk_insert_ids_follow_input_order_across_batches():
+    engine = make_engine("sqlite://")
+    init_db(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Watcher(id=1000, campground_id="existing", check_time="08:00"))
+    session.commit()
+    rows = [{"campground_id": str(i), "check_time": "08:00"} for i in range(5)]
+    rows.insert(2, {"id": 5, "campground_id": "explicit", "check_time": "08:00"})
+
+    ids = insert_watchers(session, rows)
+    session.commit()
+    assert [session.get(Watcher, i).campground_id for i in ids] == [
+        row["campground_id"] for row in rows
+    ]
@@ -0,0 +1,55 @@
+import sys, os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher.diffing import Snapshot, newly_available
+
+
+def test_snapshot_round_trips_through_bitset():
+    bits = np.array([[True, False, True], [False, False, True]])
+    snap = Snapshot(["1", "2"], ["a", "b", "c"], bits)
+    restored = Snapshot.unpack(snap.site_ids, snap.day_keys, snap.pack())
+    assert (restored.bits == bits).all()
+
+
+def test_newly_available_aligns_sites_and_days():
+    previous = Snapshot(["1", "2"], ["d1", "d2"], np.array([[True, False], [False, True]]))
+    current = Snapshot(
+        ["2", "3", "1"],
+        ["d2", "d3"],
+        np.array([[True, True], [True, False], [True, False]]),
+    )
+    rows, cols = newly_available(previous, current)
+    cells = {(current.site_ids[i], current.day_keys[j]) for i, j in zip(rows, cols)}
+    assert cells == {("2", "d3"), ("3", "d2"), ("1", "d2")}
+
+
+def test_snapshots_keep_one_window_and_drop_deleted_watchers():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from campwatcher.diffing import prune_snapshots, save_snapshot
+    from campwatcher.models import Base, Watcher, WatcherSnapshot
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    kept = Watcher(campground_id="1", check_time="08:00")
+    gone = Watcher(campground_id="2", check_time="08:00")
+    session.add_all([kept, gone])
+    session.flush()
+    snap = Snapshot(["1"], ["d1"], np.array([[True]]))
+    for window in ("2024-06-01..2024-06-30", "2024-07-01..2024-07-31"):
+        save_snapshot(session, None, kept.id, "1", window, "h", snap)
+        save_snapshot(session, None, gone.id, "2", window, "h", snap)
+        session.flush()
+    assert session.query(WatcherSnapshot.window).filter_by(watcher_id=kept.id).all() == [
+        ("2024-07-01..2024-07-31",)
+    ]
+
+    session.delete(gone)
+    session.flush()
+    assert prune_snapshots(session) == 1
+    assert [row.watcher_id for row in session.query(WatcherSnapshot)] == [kept.id]
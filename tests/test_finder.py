@@ -0,0 +1,98 @@
+import sys, os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher.finder import DatePattern, search
+from campwatcher.matrix import AvailabilityMatrix
+from campwatcher.providers import RECGOV, get_provider
+
+# 2024-06-06 is a Thursday.
+DAYS = [f"2024-06-{d:02d}T00:00:00Z" for d in range(6, 11)]
+
+
+def _matrix(**sites):
+    return AvailabilityMatrix.from_payload(
+        {
+            "campsites": {
+                site: {
+                    "availabilities": {
+                        day: "Available" if flag == "A" else "Reserved"
+                        for day, flag in zip(DAYS, pattern)
+                    }
+                }
+                for site, pattern in sites.items()
+            }
+        }
+    )
+
+
+def test_date_patterns():
+    matrix = _matrix(a="AAARA", b="RAAAA")
+
+    assert DatePattern.weekend_nights().match(matrix) == [
+        ("a", "2024-06-07"),
+        ("a", "2024-06-08"),
+        ("b", "2024-06-07"),
+        ("b", "2024-06-08"),
+    ]
+    assert DatePattern.full_weekend().match(matrix) == [("a", "2024-06-07"), ("b", "2024-06-07")]
+    assert DatePattern(nights=3).match(matrix) == [
+        ("a", "2024-06-06"),
+        ("b", "2024-06-07"),
+        ("b", "2024-06-08"),
+    ]
+    assert DatePattern(nights=6).match(matrix) == []
+    # Thursday or Sunday starts, two nights.
+    assert DatePattern.on_weekdays([6, 3], nights=2).match(matrix) == [
+        ("a", "2024-06-06"),
+        ("b", "2024-06-09"),
+    ]
+
+
+def test_tui_parses_weekday_patterns():
+    from tui import parse_pattern
+
+    assert parse_pattern("thu,Sun") == DatePattern((3, 6), 1)
+    assert parse_pattern("friday:2") == DatePattern((4,), 2)
+    assert parse_pattern("3") == DatePattern(nights=3)
+    assert parse_pattern("fri:x") is None
+    assert parse_pattern("a") == DatePattern(nights=1)
+    assert parse_pattern("x") is None
+
+
+def test_stays_need_consecutive_calendar_nights():
+    gap = AvailabilityMatrix.from_payload(
+        {
+            "campsites": {
+                "a": {
+                    "availabilities": {
+                        "2024-06-01T00:00:00Z": "Available",
+                        "2024-06-03T00:00:00Z": "Available",
+                    }
+                }
+            }
+        }
+    )
+    assert DatePattern(nights=2).match(gap) == []
+
+
+def test_search_fetches_each_campground_once(monkeypatch):
+    calls = []
+
+    def load(key):
+        calls.append(key)
+        if key[0] == "bad":
+            raise RuntimeError("upstream down")
+        return _matrix(a="AAAAA" if key[0] == "easy" else "RRRRR")
+
+    monkeypatch.setattr(get_provider(RECGOV), "load", load)
+    results = {
+        r.campground_id: r
+        for r in search(["easy", "bad", "hard", "easy"], "2024-06", DatePattern.full_weekend(), 2)
+    }
+
+    assert sorted(calls) == [("bad", "2024-06"), ("easy", "2024-06"), ("hard", "2024-06")]
+    assert results["easy"].difficulty == 0.0
+    assert results["easy"].matches == [("a", "2024-06-07")]
+    assert results["hard"].difficulty == 1.0 and results["hard"].matches == []
+    assert results["bad"].error == "upstream down"
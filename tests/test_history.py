@@ -0,0 +1,101 @@
+import sys, os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher import history
+from campwatcher.config import config
+from campwatcher.history import DAY, HOUR, HistoryStore, time_to_book, trend_difficulty
+from campwatcher.matrix import AvailabilityMatrix
+
+T0 = 1_717_200_000 // HOUR * HOUR
+
+
+def _matrix(open_days):
+    """Two sites over four days; site "a" has the first ``open_days`` open."""
+    days = ["2024-06-01", "2024-06-02", "2024-06-03", "2024-06-04"]
+    return AvailabilityMatrix.from_payload(
+        {
+            "campsites": {
+                "a": {
+                    "availabilities": {
+                        d: "Available" if i < open_days else "Reserved"
+                        for i, d in enumerate(days)
+                    }
+                },
+                "b": {"availabilities": {d: "Reserved" for d in days}},
+            }
+        }
+    )
+
+
+def test_record_keeps_series_and_aggregates():
+    store = HistoryStore()
+    store.record("1", "2024-06", _matrix(4), T0)
+    store.record("1", "2024-06", _matrix(2), T0 + DAY)
+    aggregate = store.record("1", "2024-06", _matrix(0), T0 + 2 * DAY)
+
+    assert store.series("1", "2024-06", until=T0 + 3 * DAY) == [
+        (T0, 0.5),
+        (T0 + DAY, 0.25),
+        (T0 + 2 * DAY, 0.0),
+    ]
+    assert aggregate.difficulty == 1.0
+    assert aggregate.time_to_book == DAY
+    assert store.latest("1", "2024-06") == aggregate
+    assert store.latest("1", "2024-06", max_age=60, now=T0 + 3 * DAY) is None
+    assert store.latest_sites("1", "2024-06") == [("a", 0.0), ("b", 0.0)]
+    # Site rates are stored one byte per site.
+    assert store.site_series("1", "2024-06", "a") == [
+        (T0, 1.0),
+        (T0 + DAY, pytest.approx(0.5, abs=1 / 255)),
+        (T0 + 2 * DAY, 0.0),
+    ]
+
+
+def test_trend_and_time_to_book():
+    draining = [(0, 0.6), (DAY, 0.5), (2 * DAY, 0.4)]
+    assert round(trend_difficulty(draining, horizon=2 * DAY), 6) == 0.8
+    assert trend_difficulty([(0, 0.3)]) == 0.7
+    assert time_to_book([(0, 0.0), (HOUR, 0.8), (2 * HOUR, 0.5), (3 * HOUR, 0.3)]) == 2 * HOUR
+    assert time_to_book([(0, 0.8), (HOUR, 0.7)]) is None
+
+
+def test_downsample_merges_old_samples_per_hour():
+    store = HistoryStore()
+    for minute, open_days in [(0, 4), (20, 2), (40, 0)]:
+        store.record("1", "2024-06", _matrix(open_days), T0 + minute * 60)
+    store.record("1", "2024-06", _matrix(4), T0 + 10 * DAY)
+
+    assert store.downsample(now=T0 + 10 * DAY, raw_seconds=DAY) == 2
+    assert store.downsample(now=T0 + 10 * DAY, raw_seconds=DAY) == 0
+    assert store.series("1", "2024-06", until=T0 + 11 * DAY) == [
+        (T0, 0.25),
+        (T0 + 10 * DAY, 0.5),
+    ]
+    assert store.site_series("1", "2024-06", "a", since=T0)[0] == (
+        T0,
+        pytest.approx(0.5, abs=1 / 255),
+    )
+
+
+def test_ranking_reads_fresh_aggregates(monkeypatch):
+    import ranking
+
+    store = HistoryStore()
+    monkeypatch.setattr(history, "_history", store)
+    monkeypatch.setattr(config, "history_db", ":memory:")
+    calls = []
+
+    def fetch(cid, month):
+        calls.append(cid)
+        return {"campsites": {"1": {"availabilities": {"2024-06-01": "Reserved"}}}}
+
+    monkeypatch.setattr(ranking, "_fetch_availability", fetch)
+
+    assert ranking.difficulty_score("9", "2024-06") == 1.0
+    assert ranking.difficulty_score("9", "2024-06") == 1.0
+    assert ranking.rank_sites_for_campground("9", "2024-06") == [("1", 0.0)]
+    assert ranking.trend_score("9", "2024-06") == 1.0
+    assert calls == ["9"]
@@ -0,0 +1,157 @@
+import sys, os
+import threading
+import time
+
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher.httpcache import ResponseCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Inline:
+    """Executor that runs submitted work immediately."""
+
+    def submit(self, fn, *args, **kwargs):
+        fn(*args, **kwargs)
+
+
+def _app(cache, ttl=60, stale=30):
+    app = Flask(__name__)
+    state = {"calls": 0, "value": "a"}
+
+    @app.route("/data")
+    @cache.cached(ttl, stale)
+    def data():
+        state["calls"] += 1
+        if request.args.get("fail"):
+            return jsonify({"error": "bad"}), 400
+        return jsonify({"value": state["value"], "q": request.args.get("q")})
+
+    return app.test_client(), state
+
+
+def test_miss_then_hit_and_keyed_by_query():
+    cache = ResponseCache(clock=_Clock(), executor=_Inline())
+    client, state = _app(cache)
+    first = client.get("/data?q=1")
+    assert first.headers["X-Cache"] == "MISS"
+    assert first.headers["ETag"]
+    assert "max-age=60" in first.headers["Cache-Control"]
+    second = client.get("/data?q=1")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_json() == first.get_json()
+    assert client.get("/data?q=2").headers["X-Cache"] == "MISS"
+    assert state["calls"] == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_if_none_match_returns_304():
+    cache = ResponseCache(clock=_Clock(), executor=_Inline())
+    client, _ = _app(cache)
+    etag = client.get("/data").headers["ETag"]
+    resp = client.get("/data", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert client.get("/data", headers={"If-None-Match": '"other"'}).status_code == 200
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_stale_served_while_revalidating():
+    clock = _Clock()
+    cache = ResponseCache(clock=clock, executor=_Inline())
+    client, state = _app(cache)
+    first = client.get("/data")
+    clock.now += 70
+    state["value"] = "b"
+    stale = client.get("/data")
+    assert stale.headers["X-Cache"] == "STALE"
+    assert stale.get_json()["value"] == "a"
+    fresh = client.get("/data")
+    assert fresh.headers["X-Cache"] == "HIT"
+    assert fresh.get_json()["value"] == "b"
+    assert fresh.headers["ETag"] != first.headers["ETag"]
+    assert cache.stats()["revalidations"] == 1
+    # Past ttl + stale the view runs on the request path again.
+    clock.now += 200
+    assert client.get("/data").headers["X-Cache"] == "MISS"
+
+
+def test_last_modified_kept_when_body_unchanged():
+    clock = _Clock()
+    cache = ResponseCache(clock=clock, executor=_Inline())
+    client, _ = _app(cache)
+    first = client.get("/data")
+    clock.now += 70
+    client.get("/data")  # stale, refreshed with the same body
+    resp = client.get("/data", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert resp.status_code == 304
+
+
+def test_errors_and_disabled_ttl_are_not_cached():
+    cache = ResponseCache(clock=_Clock(), executor=_Inline())
+    client, state = _app(cache)
+    assert client.get("/data?fail=1").status_code == 400
+    assert client.get("/data?fail=1").status_code == 400
+    assert state["calls"] == 2
+    assert cache.stats()["size"] == 0
+
+    client, state = _app(ResponseCache(clock=_Clock()), ttl=0)
+    client.get("/data")
+    assert "X-Cache" not in client.get("/data").headers
+    assert state["calls"] == 2
+
+
+def test_lru_bound():
+    cache = ResponseCache(maxsize=2, clock=_Clock(), executor=_Inline())
+    client, _ = _app(cache)
+    for q in "abc":
+        client.get(f"/data?q={q}")
+    assert cache.stats()["size"] == 2
+    assert client.get("/data?q=a").headers["X-Cache"] == "MISS"
+
+
+def test_concurrent_misses_render_once():
+    cache = ResponseCache(clock=_Clock(), executor=_Inline())
+    app = Flask(__name__)
+    calls = []
+    entered = threading.Event()
+    release = threading.Event()
+
+    @app.route("/slow")
+    @cache.cached(60)
+    def slow():
+        calls.append(1)
+        entered.set()
+        release.wait(5)
+        return jsonify({"value": 1})
+
+    results = []
+
+    def get():
+        results.append(app.test_client().get("/slow"))
+
+    first = threading.Thread(target=get)
+    first.start()
+    assert entered.wait(5)
+    others = [threading.Thread(target=get) for _ in range(4)]
+    for t in others:
+        t.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for t in [first, *others]:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert sorted(r.headers["X-Cache"] for r in results) == ["HIT"] * 4 + ["MISS"]
+    assert {r.get_json()["value"] for r in results} == {1}
@@ -0,0 +1,51 @@
+import sys, os
+import json
+import subprocess
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+HEAVY = ["apscheduler", "bs4", "flask", "numpy", "pydantic", "sqlalchemy"]
+# Cold-start budgets in seconds, only checked when IMPORT_BUDGET_SCALE is set
+# (e.g. 1 on a quiet machine, higher on slow ones) since timings are noisy.
+SCALE = os.getenv("IMPORT_BUDGET_SCALE")
+
+
+def _cold_import(*modules):
+    """Import ``modules`` in a fresh interpreter; return (seconds, heavy deps loaded)."""
+    code = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        + "".join(f"import {m}\n" for m in modules)
+        + "elapsed = time.perf_counter() - started\n"
+        f"print(json.dumps([elapsed, [m for m in {HEAVY!r} if m in sys.modules]]))\n"
+    )
+    env = dict(os.environ, DATABASE_URI="sqlite://", EMBEDDED_WORKER="false")
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "modules, budget, forbidden",
+    [
+        (["campwatcher"], 0.1, HEAVY),
+        (
+            ["campwatcher.cli", "campwatcher.providers"],
+            1.0,
+            ["apscheduler", "flask", "pydantic", "sqlalchemy"],
+        ),
+        (["campwatcher.worker"], 2.0, ["apscheduler", "bs4", "flask"]),
+        (["app"], 3.0, ["apscheduler", "bs4"]),
+    ],
+)
+def test_import_budget(modules, budget, forbidden):
+    elapsed, loaded = _cold_import(*modules)
+    assert not set(loaded) & set(forbidden), loaded
+    if SCALE:
+        limit = budget * float(SCALE)
+        assert elapsed < limit, f"{modules} took {elapsed:.2f}s (budget {limit}s)"
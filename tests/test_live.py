@@ -0,0 +1,44 @@
+import sys, os
+import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher import live
+
+
+def test_hub_polls_once_per_campground_and_pushes_deltas(monkeypatch):
+    statuses = {"1": "Reserved"}
+    fetched = []
+
+    def fake_fetch(cid, month):
+        fetched.append(cid)
+        return {
+            "campsites": {
+                "10": {"availabilities": {"2024-06-01T00:00:00Z": statuses["1"]}}
+            }
+        }
+
+    monkeypatch.setattr(live.api, "fetch_availability", fake_fetch)
+    hub = live.LiveHub(poll_seconds=3600)
+    hub._thread = object()  # drive polls by hand
+    first = hub.subscribe(["1"])
+    second = hub.subscribe(["1"])
+    today = datetime.date(2024, 6, 1)
+
+    hub.poll_once(today)
+    assert fetched == ["1"]
+    assert first.queue.get_nowait()["snapshot"] is True
+    assert second.queue.get_nowait()["opened"] == []
+
+    hub.poll_once(today)
+    assert first.queue.empty()
+
+    statuses["1"] = "Available"
+    hub.poll_once(today)
+    event = second.queue.get_nowait()
+    assert event["opened"] == [["10", "2024-06-01T00:00:00Z"]]
+    assert event["closed"] == []
+
+    hub.unsubscribe(first)
+    hub.unsubscribe(second)
+    assert hub.subscriber_count() == 0
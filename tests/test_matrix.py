@@ -0,0 +1,51 @@
+import sys, os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher.matrix import AvailabilityMatrix
+
+PAYLOAD = {
+    "campsites": {
+        "1": {
+            "campsite_type": "TENT ONLY NONELECTRIC",
+            "loop": "A",
+            "availabilities": {
+                "2024-06-06T00:00:00Z": "Available",
+                "2024-06-07T00:00:00Z": "Available",
+                "2024-06-08T00:00:00Z": "Reserved",
+            },
+        },
+        "2": {
+            "campsite_type": "STANDARD ELECTRIC RV",
+            "loop": "B",
+            "availabilities": {
+                "2024-06-07T00:00:00Z": "Reserved",
+                "2024-06-08T00:00:00Z": "Reserved",
+            },
+        },
+    }
+}
+
+
+def test_matrix_scores_and_rates():
+    matrix = AvailabilityMatrix.from_payload(PAYLOAD)
+    assert matrix.shape == (2, 3)
+    assert matrix.difficulty_score() == 1.0 - 2 / 5
+    assert matrix.ranked_sites() == [("2", 0.0), ("1", 2 / 3)]
+
+
+def test_matrix_filters_by_weekday_and_type():
+    matrix = AvailabilityMatrix.from_payload(PAYLOAD)
+    rows, cols = matrix.available_cells(weekdays=(4, 5))
+    assert [str(matrix.dates[j]) for j in cols] == ["2024-06-07"]
+    assert matrix.available_rows("STANDARD ELECTRIC RV") == []
+    assert matrix.available_rows()[0] == {
+        "site_id": "1",
+        "date": "2024-06-06T00:00:00Z",
+        "tent_only": True,
+        "no_rv": True,
+    }
+
+
+def test_empty_payload_is_hardest():
+    assert AvailabilityMatrix.empty().difficulty_score() == 1.0
@@ -0,0 +1,51 @@
+import sys, os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher.metrics import Registry, cache_families
+
+
+def test_render_prometheus_text():
+    registry = Registry()
+    with registry.timer("fetch"):
+        pass
+    registry.add_collector(lambda: cache_families("a", {"hits": 2, "size": 1}))
+    registry.add_collector(lambda: cache_families("b", {"hits": 3, "size": 0}))
+    text = registry.render()
+
+    assert '# TYPE campwatcher_stage_seconds histogram' in text
+    assert 'campwatcher_stage_seconds_bucket{stage="fetch",le="+Inf"} 1.0' in text
+    assert 'campwatcher_stage_seconds_count{stage="fetch"} 1.0' in text
+    assert text.count("# TYPE campwatcher_cache_events_total counter") == 1
+    assert 'campwatcher_cache_events_total{cache="b",event="hits"} 3.0' in text
+
+
+def test_failing_collector_does_not_break_render():
+    registry = Registry()
+    registry.add_collector(lambda: 1 / 0)
+    assert "campwatcher_scheduler_lag_seconds" in registry.render()
+
+
+def test_profiled_samples_only_enabled_watchers():
+    registry = Registry(profile_watchers=[7])
+    with registry.profiled(1):
+        time.sleep(0.02)
+    with registry.profiled(7):
+        time.sleep(0.05)
+    assert list(registry.profiles) == [7]
+    assert "test_profiled_samples_only_enabled_watchers" in registry.profiles[7]
+
+
+def test_profiles_endpoint_requires_the_admin_token(monkeypatch):
+    import app as webapp
+
+    monkeypatch.setitem(webapp.registry.profiles, 7, "main;check 3\n")
+    client = webapp.create_app().test_client()
+    monkeypatch.setattr(webapp.config, "admin_token", None)
+    assert client.get("/metrics/profiles/7").status_code == 403
+    monkeypatch.setattr(webapp.config, "admin_token", "secret")
+    assert client.get("/metrics/profiles/7").status_code == 403
+    resp = client.get("/metrics/profiles/7", headers={"Authorization": "Bearer secret"})
+    assert resp.status_code == 200
+    assert resp.get_data(as_text=True) == "main;check 3\n"
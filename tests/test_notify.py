@@ -0,0 +1,78 @@
+import sys, os
+import json
+import subprocess
+import time
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from campwatcher.notify import FileSink, NotificationDispatcher, Sink
+
+
+def test_dispatcher_batches_per_address_into_digests(tmp_path):
+    path = tmp_path / "mail.log"
+    dispatcher = NotificationDispatcher(FileSink(str(path)), digest_seconds=0.2).start()
+    dispatcher.enqueue("a@example.com", "Campsite available", "site 1")
+    dispatcher.enqueue("b@example.com", "Campsite available", "site 2")
+    dispatcher.enqueue("a@example.com", "Campsite available", "site 3")
+    dispatcher.flush()
+    dispatcher.stop()
+
+    messages = {m["to"]: m for m in map(json.loads, path.read_text().splitlines())}
+    assert messages["a@example.com"]["subject"] == "2 campsite alerts"
+    assert "site 3" in messages["a@example.com"]["body"]
+    assert messages["b@example.com"]["body"] == "site 2"
+    assert dispatcher.stats()["sent"] == 2
+
+
+def test_dispatcher_retries_failed_sends():
+    class FlakySink(Sink):
+        def __init__(self):
+            self.calls = 0
+
+        def send(self, to_addr, subject, body):
+            self.calls += 1
+            if self.calls < 3:
+                raise OSError("connection refused")
+
+    sink = FlakySink()
+    dispatcher = NotificationDispatcher(
+        sink, digest_seconds=0, retries=3, sleep=lambda s: None
+    ).start()
+    dispatcher.enqueue("a@example.com", "s", "b")
+    dispatcher.flush()
+    dispatcher.stop()
+    assert sink.calls == 3
+    assert dispatcher.stats() == {"queued": 1, "sent": 1, "failed": 0, "retried": 2}
+
+
+def test_flush_does_not_wait_for_the_digest_window(tmp_path):
+    path = tmp_path / "mail.log"
+    dispatcher = NotificationDispatcher(FileSink(str(path)), digest_seconds=60).start()
+    dispatcher.enqueue("a@example.com", "s", "b")
+    started = time.monotonic()
+    dispatcher.flush()
+    assert time.monotonic() - started < 5
+    assert len(path.read_text().splitlines()) == 1
+    dispatcher.stop()
+
+
+def test_queued_mail_is_delivered_at_exit(tmp_path):
+    path = tmp_path / "mail.log"
+    script = (
+        "from campwatcher.notify import get_dispatcher\n"
+        "get_dispatcher().enqueue('a@example.com', 'Campsite available', 'site 1')\n"
+    )
+    env = dict(os.environ, NOTIFY_SINK=f"file:{path}", NOTIFY_DIGEST_SECONDS="60")
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True, timeout=30)
+    assert json.loads(path.read_text())["body"] == "site 1"
+
+
+def test_sink_requires_send():
+    class Incomplete(Sink):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,96 @@
+import sys, os
+import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from campwatcher import scheduling
+from campwatcher.matrix import AVAILABLE, NOT_AVAILABLE, RESERVED
+from campwatcher.models import Base, Watcher
+from campwatcher.providers import RESERVE_CA, Provider, get_provider, parse_usedirect
+
+NOW = datetime.datetime(2024, 6, 1, 8, 0)
+
+
+def _grid(free):
+    return {
+        "Facility": {
+            "Name": "North Loop",
+            "Units": {
+                "7": {
+                    "UnitId": 7,
+                    "Slices": {
+                        "2024-06-01T00:00:00": {"Date": "2024-06-01", "IsFree": free},
+                        "2024-06-02T00:00:00": {"Date": "2024-06-02", "IsBlocked": True},
+                    },
+                }
+            },
+        }
+    }
+
+
+def test_parse_usedirect_normalizes_units():
+    matrix = parse_usedirect(_grid(True))
+    assert matrix.site_ids.tolist() == ["7"]
+    assert matrix.day_keys == ["2024-06-01", "2024-06-02"]
+    assert matrix.status.tolist() == [[AVAILABLE, NOT_AVAILABLE]]
+    assert matrix.loop.tolist() == ["North Loop"]
+    assert parse_usedirect(_grid(False)).status[0, 0] == RESERVED
+
+
+def test_payload_is_parsed_once():
+    provider = get_provider(RESERVE_CA)
+    payload = _grid(True)
+    first = provider.matrix(("1", "2", "2024-06-01"), payload)
+    assert provider.matrix(("1", "2", "2024-06-01"), payload) is first
+
+
+def test_run_watchers_batches_reserve_ca_per_facility(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for _ in range(3):
+        session.add(
+            Watcher(
+                provider=RESERVE_CA,
+                campground_id="1",
+                facility_id="2",
+                start_date=datetime.date(2024, 6, 1),
+                end_date=datetime.date(2024, 6, 2),
+                check_time="08:00",
+            )
+        )
+    session.commit()
+
+    provider = get_provider(RESERVE_CA)
+    provider.cache.clear()
+    fetched = []
+    reported = []
+    monkeypatch.setattr(provider, "fetch", lambda key: fetched.append(key) or _grid(True))
+    monkeypatch.setattr(
+        scheduling, "_report", lambda watcher, opened: reported.append(opened)
+    )
+
+    scheduling.run_watchers(session, session.query(Watcher).all(), NOW)
+
+    assert fetched == [("1", "2", "2024-06-01")]
+    assert reported == [[{"site_id": "7", "date": "2024-06-01"}]] * 3
+
+
+def test_provider_base_is_abstract():
+    with pytest.raises(TypeError):
+        Provider()
+
+
+def test_reserve_ca_keys_cover_the_whole_window(monkeypatch):
+    from campwatcher.config import config
+
+    monkeypatch.setattr(config, "ca_response_days", 30)
+    provider = get_provider(RESERVE_CA)
+    keys = provider.keys("1", "2", datetime.date(2024, 6, 1), datetime.date(2024, 8, 15))
+    assert [key[2] for key in keys] == ["2024-06-01", "2024-07-01", "2024-07-31"]
+    assert {key[:2] for key in keys} == {("1", "2")}
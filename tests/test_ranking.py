@@ -13,3 +13,18 @@ def test_difficulty_score_returns_float(monkeypatch):
     )
     result = difficulty_score("100")
     assert isinstance(result, float)
+
+
+def test_rank_campgrounds_concurrent_reports_partial_errors(monkeypatch):
+    from ranking import rank_campgrounds_concurrent
+
+    def fake_fetch(campground_id, month_str):
+        if campground_id == "bad":
+            raise RuntimeError("upstream down")
+        status = "Available" if campground_id == "easy" else "Reserved"
+        return {"campsites": {"1": {"availabilities": {"2024-06-01": status}}}}
+
+    monkeypatch.setattr("ranking._fetch_availability", fake_fetch)
+    result = rank_campgrounds_concurrent(["easy", "bad", "hard"], "2024-06", 2)
+    assert result.scores == [("hard", 1.0), ("easy", 0.0)]
+    assert result.errors == {"bad": "upstream down"}
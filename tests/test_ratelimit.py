@@ -0,0 +1,20 @@
+import sys, os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher.ratelimit import TokenBucket
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    slept = []
+
+    def sleep(delay):
+        slept.append(delay)
+        now[0] += delay
+
+    bucket = TokenBucket(rate=2, burst=2, clock=lambda: now[0], sleep=sleep)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.5
+    assert slept == [0.5]
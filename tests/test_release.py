@@ -0,0 +1,73 @@
+import sys, os
+import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher import release
+from campwatcher.metrics import registry
+from campwatcher.release import ReleaseScheduler, ReleaseTimeCache, next_poll_delay
+
+RELEASE = datetime.datetime(2024, 6, 1, 8, 0)
+
+
+def test_next_poll_delay_bursts_around_release():
+    kwargs = dict(lead=30, window=300, burst=5, idle=900)
+    assert next_poll_delay(RELEASE - datetime.timedelta(hours=2), RELEASE, **kwargs) == 900
+    assert next_poll_delay(RELEASE - datetime.timedelta(seconds=100), RELEASE, **kwargs) == 70
+    assert next_poll_delay(RELEASE, RELEASE, **kwargs) == 5
+    assert next_poll_delay(RELEASE + datetime.timedelta(minutes=10), RELEASE, **kwargs) == 900
+    assert next_poll_delay(RELEASE, None, **kwargs) == 900
+
+
+def test_release_cache_refetches_after_release_passes(monkeypatch):
+    clock = [datetime.datetime(2024, 6, 1, 7, 0)]
+    monkeypatch.setattr(release, "_now_like", lambda moment: clock[0])
+    calls = []
+    future = datetime.datetime(2024, 6, 1, 8, 0)
+    past = datetime.datetime(2024, 6, 1, 6, 0)
+    releases = [future, past]
+    cache = ReleaseTimeCache(fetch=lambda p, f: calls.append(p) or releases.pop(0), window=0)
+    assert cache.get("1", "2") == future
+    assert cache.get("1", "2") == future
+    assert calls == ["1"]
+
+    clock[0] = future + datetime.timedelta(seconds=1)
+    assert cache.get("1", "2") == past
+    assert calls == ["1", "1"]
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.jobs = {}
+
+    def add_job(self, func, trigger, run_date, args, id, replace_existing):
+        self.jobs[id] = run_date
+
+
+def test_release_scheduler_reports_changes_and_reschedules():
+    payloads = [{"a": 1}, {"a": 1}, {"a": 2}]
+    changes = []
+    sched = FakeScheduler()
+    releases = ReleaseScheduler(
+        sched,
+        ReleaseTimeCache(fetch=lambda p, f: None),
+        on_change=lambda target, data: changes.append(data),
+        fetch=lambda p, f, s: payloads.pop(0),
+    )
+    releases.watch("1", "2", "2024-06-01")
+    assert list(sched.jobs) == ["ca-release:1:2:2024-06-01"]
+    for _ in range(3):
+        releases.poll(("1", "2", "2024-06-01"))
+    assert changes == [{"a": 1}, {"a": 2}]
+    assert releases.stats()["polls"] == 3
+
+
+def test_schedulers_report_through_one_collector():
+    before = len(registry._collectors)
+    for _ in range(3):
+        releases = ReleaseScheduler(
+            FakeScheduler(), ReleaseTimeCache(fetch=lambda p, f: None), fetch=lambda p, f, s: {}
+        )
+    releases.watch("1", "2", "2024-06-01")
+    assert len(registry._collectors) == before
+    assert "campwatcher_release_targets" in registry.render()
@@ -0,0 +1,61 @@
+import sys, os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import reserve_ca
+from reserve_ca import extract_update_time
+
+PAGE = (
+    b"<html><script>var a = 1;</script>"
+    b'<script>{"nextAvailabilityUpdate": "bogus"}</script>'
+    b'<script>{"nextAvailabilityUpdate": "2024-06-01T08:00:00"}</script>'
+    b"<div>rest of page</div></html>"
+)
+
+
+def _chunks(data, size):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def test_extract_update_time_across_chunk_boundaries():
+    for size in (1, 7, 64, len(PAGE)):
+        assert extract_update_time(_chunks(PAGE, size)) == datetime(2024, 6, 1, 8, 0)
+    assert extract_update_time(_chunks(b"<html></html>", 4)) is None
+
+
+def test_extract_update_time_stops_reading_after_match():
+    read = []
+
+    def chunks():
+        for chunk in _chunks(PAGE + b"x" * 10_000, 32):
+            read.append(chunk)
+            yield chunk
+
+    extract_update_time(chunks())
+    assert sum(map(len, read)) < len(PAGE) + 32
+
+
+class FakeResponse:
+    closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        return _chunks(PAGE, chunk_size)
+
+    def close(self):
+        self.closed = True
+
+
+def test_fetch_update_time_streams_and_closes(monkeypatch):
+    resp = FakeResponse()
+    calls = []
+    monkeypatch.setattr(
+        reserve_ca.client, "get", lambda url, **kw: calls.append(kw) or resp
+    )
+    assert reserve_ca.fetch_update_time("1", "2") == datetime(2024, 6, 1, 8, 0)
+    assert calls[0]["stream"] is True
+    assert resp.closed
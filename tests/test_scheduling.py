@@ -0,0 +1,79 @@
+import sys, os
+import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from campwatcher import api, scheduling
+from campwatcher.models import Base, Watcher
+
+NOW = datetime.datetime(2024, 6, 1, 8, 0)
+
+
+def _session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_run_watchers_fetches_each_campground_once(monkeypatch):
+    session = _session_factory()()
+    for cid in ["1", "1", "1", "2"]:
+        session.add(Watcher(campground_id=cid, check_time="08:00"))
+    session.commit()
+
+    fetched = []
+    reported = []
+    monkeypatch.setattr(
+        api,
+        "fetch_availability",
+        lambda cid, month: fetched.append(cid)
+        or {"campsites": {"10": {"availabilities": {"2024-06-01": "Available"}}}},
+    )
+    monkeypatch.setattr(
+        scheduling, "_report", lambda watcher, filtered: reported.append(filtered)
+    )
+    before = scheduling.batch_stats["fetches_saved"]
+
+    scheduling.run_watchers(session, session.query(Watcher).all(), NOW)
+
+    assert sorted(fetched) == ["1", "2"]
+    assert len(reported) == 4
+    assert all(rows == [{"site_id": "10", "date": "2024-06-01"}] for rows in reported)
+    assert scheduling.batch_stats["fetches_saved"] - before == 2
+
+
+def test_run_watchers_reports_only_new_openings(monkeypatch):
+    session = _session_factory()()
+    session.add(Watcher(campground_id="1", check_time="08:00"))
+    session.commit()
+
+    payloads = [
+        {"1": "Available", "2": "Reserved"},
+        {"1": "Available", "2": "Reserved"},
+        {"1": "Reserved", "2": "Available"},
+    ]
+    reported = []
+    monkeypatch.setattr(
+        api,
+        "fetch_availability",
+        lambda cid, month: {
+            "campsites": {
+                site: {"availabilities": {"2024-06-01": status}}
+                for site, status in payloads.pop(0).items()
+            }
+        },
+    )
+    monkeypatch.setattr(
+        scheduling, "_report", lambda watcher, opened: reported.append(opened)
+    )
+
+    for _ in range(3):
+        scheduling.run_watchers(session, session.query(Watcher).all(), NOW)
+
+    assert reported == [
+        [{"site_id": "1", "date": "2024-06-01"}],
+        [{"site_id": "2", "date": "2024-06-01"}],
+    ]
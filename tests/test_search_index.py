@@ -0,0 +1,107 @@
+import sys, os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher import api
+from campwatcher.search_index import FacilityIndex, read_dump
+
+FACILITIES = [
+    {
+        "FacilityID": "1",
+        "FacilityName": "Crystal Cove Campground",
+        "FacilityDescription": "<p>Beach camping near Laguna</p>",
+        "FacilityLatitude": 33.57,
+        "FacilityLongitude": -117.84,
+        "LastUpdatedDate": "2024-01-01",
+    },
+    {
+        "FacilityID": "2",
+        "FacilityName": "Crystal Lake",
+        "FacilityLatitude": 34.32,
+        "FacilityLongitude": -117.84,
+        "LastUpdatedDate": "2024-01-01",
+    },
+]
+
+
+def test_text_and_radius_queries(tmp_path):
+    index = FacilityIndex(str(tmp_path / "facilities.db"))
+    assert index.refresh(FACILITIES) == 2
+    assert [f["FacilityID"] for f in index.search("crystal")] == ["1", "2"]
+    assert [f["FacilityID"] for f in index.search("crystal beach")] == ["1"]
+    near = index.search(None, 33.6, -117.8, radius_km=20)
+    assert [f["FacilityID"] for f in near] == ["1"]
+    assert index.search("nowhere") == []
+
+    reopened = FacilityIndex(str(tmp_path / "facilities.db"))
+    assert len(reopened) == 2
+    assert reopened.refresh(FACILITIES) == 0
+    renamed = dict(FACILITIES[1], FacilityName="Jackson Lake", LastUpdatedDate="2024-02-01")
+    assert reopened.refresh([renamed]) == 1
+    assert [f["FacilityID"] for f in reopened.search("crystal")] == ["1"]
+
+
+def test_refresh_from_another_process_is_picked_up(tmp_path):
+    path = str(tmp_path / "facilities.db")
+    serving = FacilityIndex(path)
+    serving.refresh(FACILITIES)
+    assert [f["FacilityID"] for f in serving.search("crystal")] == ["1", "2"]
+
+    loader = FacilityIndex(path)
+    renamed = dict(FACILITIES[1], FacilityName="Jackson Lake", LastUpdatedDate="2024-02-01")
+    added = dict(FACILITIES[0], FacilityID="3", FacilityName="Crystal Basin")
+    assert loader.refresh([renamed, added]) == 2
+
+    assert [f["FacilityID"] for f in serving.search("crystal")] == ["3", "1"]
+    assert [f["FacilityID"] for f in serving.search("jackson")] == ["2"]
+    assert len(serving) == 3
+
+
+def test_fetch_campgrounds_falls_back_to_remote_on_miss(monkeypatch):
+    index = FacilityIndex()
+    index.refresh(FACILITIES)
+    monkeypatch.setattr(api, "get_index", lambda: index)
+    monkeypatch.setattr(
+        api, "fetch_remote_campgrounds", lambda *args: [{"FacilityID": "remote"}]
+    )
+    assert api.fetch_campgrounds("crystal")[0]["FacilityID"] == "1"
+    assert api.fetch_campgrounds("yosemite") == [{"FacilityID": "remote"}]
+
+
+def test_remote_fallback_keeps_the_radius(monkeypatch):
+    sent = {}
+
+    class _Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"RECDATA": FACILITIES[::-1] + [{"FacilityID": "no-coords"}]}
+
+    def fake_get(url, params, endpoint):
+        sent.update(params)
+        return _Response()
+
+    monkeypatch.setattr(api, "get_index", lambda: None)
+    monkeypatch.setattr(api.client, "get", fake_get)
+    near = api.fetch_campgrounds(None, "33.6", "-117.8", radius_km=20)
+    assert [f["FacilityID"] for f in near] == ["1"]
+    assert round(sent["radius"], 2) == 12.43
+    assert len(api.fetch_campgrounds(None, "33.6", "-117.8")) == 3
+
+
+def test_read_dump_accepts_an_empty_file(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text("")
+    assert list(read_dump(str(path))) == []
+
+
+def test_search_rejects_bad_coordinates(monkeypatch):
+    import app as webapp
+
+    monkeypatch.setattr(webapp.api, "fetch_campgrounds", lambda *args: [])
+    client = webapp.create_app().test_client()
+    assert client.get("/search?lat=north&lon=-117.8").status_code == 400
+    assert client.get("/search?lat=33.6&lon=nan").status_code == 400
+    assert client.get("/search?lat=91&lon=0").status_code == 400
+    assert client.get("/search?lat=33.6&lon=-117.8").status_code == 200
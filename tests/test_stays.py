@@ -0,0 +1,148 @@
+import sys, os
+import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher import api, scheduling
+from campwatcher.matrix import AvailabilityMatrix
+from campwatcher.models import Watcher
+from campwatcher.stays import Stay, StayIndex, find_stays
+
+from test_scheduling import NOW, _session_factory
+
+D = datetime.date
+
+
+def _payload(**sites):
+    """Sites mapped to "A"/"R" flags for consecutive nights from 2024-06-01."""
+    return {
+        "campsites": {
+            site: {
+                "campsite_type": "TENT ONLY" if site.startswith("t") else "RV",
+                "availabilities": {
+                    f"2024-06-{d + 1:02d}T00:00:00Z": "Available" if f == "A" else "Reserved"
+                    for d, f in enumerate(flags)
+                },
+            }
+            for site, flags in sites.items()
+        }
+    }
+
+
+def test_find_clips_runs_to_the_window():
+    index = StayIndex.from_matrix(
+        AvailabilityMatrix.from_payload(_payload(a="AARAAAA", t1="RAAARAA"))
+    )
+    assert len(index) == 4
+
+    assert index.find(3) == [Stay("a", D(2024, 6, 4), 4), Stay("t1", D(2024, 6, 2), 3)]
+    assert index.find(2, D(2024, 6, 3), D(2024, 6, 5)) == [
+        Stay("a", D(2024, 6, 4), 2),
+        Stay("t1", D(2024, 6, 3), 2),
+    ]
+    assert index.find(2, site_mask=np.array([False, True])) == [
+        Stay("t1", D(2024, 6, 2), 3),
+        Stay("t1", D(2024, 6, 6), 2),
+    ]
+    assert index.find(5) == []
+    assert Stay("a", D(2024, 6, 4), 4).to_dict()["end"] == "2024-06-08"
+
+
+def test_runs_break_on_missing_calendar_nights():
+    matrix = AvailabilityMatrix.from_payload(
+        {
+            "campsites": {
+                "a": {
+                    "availabilities": {
+                        "2024-06-01T00:00:00Z": "Available",
+                        "2024-06-03T00:00:00Z": "Available",
+                    }
+                }
+            }
+        }
+    )
+    assert StayIndex.from_matrix(matrix).find(2) == []
+
+
+def test_cells_marks_only_long_enough_runs():
+    index = StayIndex.from_matrix(AvailabilityMatrix.from_payload(_payload(a="AARAAA")))
+    assert index.cells(3).tolist() == [[False, False, False, True, True, True]]
+
+
+def test_find_stays_reuses_the_index(monkeypatch):
+    monkeypatch.setattr(api, "fetch_availability", lambda cid, month: _payload(t1="AAAR"))
+    first = find_stays("s1", D(2024, 6, 1), D(2024, 6, 30), 2, site_type="TENT ONLY")
+    assert first == [Stay("t1", D(2024, 6, 1), 3)]
+    assert find_stays("s1", D(2024, 6, 1), D(2024, 6, 30), 2, site_type="RV") == []
+
+
+def test_watcher_min_nights(monkeypatch):
+    session = _session_factory()()
+    session.add(Watcher(campground_id="1", check_time="08:00", min_nights=3))
+    session.commit()
+    payloads = [_payload(a="AARAAR"), _payload(a="AAAAAR")]
+    reported = []
+    monkeypatch.setattr(api, "fetch_availability", lambda cid, month: payloads.pop(0))
+    monkeypatch.setattr(scheduling, "_report", lambda watcher, opened: reported.append(opened))
+
+    for _ in range(2):
+        scheduling.run_watchers(session, session.query(Watcher).all(), NOW)
+
+    assert reported[0] == []
+    assert [row["date"][:10] for row in reported[1]] == [
+        "2024-06-01",
+        "2024-06-02",
+        "2024-06-03",
+        "2024-06-04",
+        "2024-06-05",
+    ]
+
+
+def test_min_nights_added_to_existing_watchers_table(tmp_path):
+    from sqlalchemy.orm import sessionmaker
+
+    from campwatcher.db import init_db, make_engine
+
+    engine = make_engine(f"sqlite:///{tmp_path / 'w.db'}")
+    init_db(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE watchers DROP COLUMN min_nights")
+        conn.exec_driver_sql(
+            "INSERT INTO watchers (provider, campground_id, check_time)"
+            " VALUES ('recgov', '232447', '08:00')"
+        )
+    init_db(engine)
+    with sessionmaker(bind=engine)() as session:
+        assert session.query(Watcher).one().min_nights == 1
+
+
+def test_stays_endpoint_rejects_bad_windows_and_maps_upstream_errors(monkeypatch):
+    import requests
+
+    import app as webapp
+
+    client = webapp.create_app().test_client()
+    base = "/stays?campground_id=1"
+    reversed_window = client.get(f"{base}&start_date=2024-06-10&end_date=2024-06-01")
+    assert reversed_window.status_code == 400
+    huge = client.get(f"{base}&start_date=2000-01-01&end_date=2099-12-31")
+    assert huge.status_code == 400
+    assert "months" in huge.get_json()["error"]
+
+    def unavailable(*args, **kwargs):
+        raise requests.ConnectionError("upstream down")
+
+    monkeypatch.setattr(webapp, "find_stays", unavailable)
+    resp = client.get(f"{base}&start_date=2024-06-01&end_date=2024-06-10")
+    assert resp.status_code == 502
+
+
+def test_starts_marks_nights_a_stay_can_begin_on():
+    mask = np.array([[1, 1, 1, 0, 1, 1]], dtype=bool)
+    dates = np.array([f"2024-06-0{d}" for d in range(1, 7)], dtype="datetime64[D]")
+    index = StayIndex(mask, dates, ["a"])
+    assert index.starts(2).tolist() == [[True, True, False, False, True, False]]
+    assert index.starts(3).tolist() == [[True, False, False, False, False, False]]
+    assert index.starts(1).tolist() == mask.tolist()
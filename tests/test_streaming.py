@@ -0,0 +1,66 @@
+import sys, os
+import json
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher.matrix import AVAILABLE, RESERVED, AvailabilityMatrix
+from campwatcher.streaming import available_rows, iter_campsites, iter_matching
+
+PAYLOAD = {
+    "count": 12345,
+    "campsites": {
+        "1": {
+            "campsite_type": "TENT ONLY NONELECTRIC",
+            "loop": "Zoë",
+            "availabilities": {
+                "2024-06-02T00:00:00Z": "Available",
+                "2024-06-01T00:00:00Z": "Available",
+                "2024-06-03T00:00:00Z": "Reserved",
+            },
+        },
+        "2": {
+            "campsite_type": "RV ELECTRIC",
+            "availabilities": {"2024-06-01T00:00:00Z": "Available"},
+        },
+    },
+    "flags": [1.5, None, {"nested": "}"}],
+}
+
+
+def _chunks(data, size):
+    raw = json.dumps(data, ensure_ascii=False, indent=1).encode()
+    return [raw[i : i + size] for i in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, 64 * 1024])
+def test_stream_matches_full_parse(size):
+    sites = list(iter_campsites(_chunks(PAYLOAD, size)))
+    assert sites == list(PAYLOAD["campsites"].items())
+    assert available_rows(_chunks(PAYLOAD, size)) == (
+        AvailabilityMatrix.from_payload(PAYLOAD).available_rows()
+    )
+
+
+def test_iter_matching_filters_status_type_and_dates():
+    chunks = _chunks(PAYLOAD, 5)
+    assert list(iter_matching(chunks, site_type="RV ELECTRIC")) == [
+        ("2", "2024-06-01T00:00:00Z")
+    ]
+    assert list(
+        iter_matching(
+            _chunks(PAYLOAD, 5),
+            statuses=(AVAILABLE, RESERVED),
+            start=date(2024, 6, 2),
+            end=date(2024, 6, 3),
+        )
+    ) == [("1", "2024-06-02T00:00:00Z"), ("1", "2024-06-03T00:00:00Z")]
+
+
+def test_empty_and_malformed_payloads():
+    assert list(iter_campsites([b"{}"])) == []
+    assert list(iter_campsites([b'{"campsites": {}}'])) == []
+    with pytest.raises(ValueError):
+        list(iter_campsites([b'{"campsites": {"1": {"availabilities": ']))
@@ -0,0 +1,145 @@
+import sys, os
+import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from campwatcher import worker
+from campwatcher.models import Base, Watcher
+
+NOW = datetime.datetime(2024, 6, 1, 8, 0)
+
+
+def _session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_next_run_time_rolls_to_tomorrow():
+    assert worker.next_run_time("08:00", NOW) == NOW
+    assert worker.next_run_time("07:59", NOW) == datetime.datetime(2024, 6, 2, 7, 59)
+
+
+def test_claims_are_disjoint_between_workers():
+    session = _session_factory()()
+    for _ in range(5):
+        w = Watcher(campground_id="1", check_time="08:00")
+        worker.enqueue(w, NOW)
+        session.add(w)
+    session.commit()
+
+    first = worker.claim_due(session, "a", NOW, limit=3, lease_seconds=60)
+    second = worker.claim_due(session, "b", NOW, limit=3, lease_seconds=60)
+    assert len(first) == 3 and len(second) == 2
+    assert not {w.id for w in first} & {w.id for w in second}
+    assert worker.claim_due(session, "c", NOW, limit=3, lease_seconds=60) == []
+
+    later = NOW + datetime.timedelta(seconds=61)
+    assert len(worker.claim_due(session, "c", later, limit=10, lease_seconds=60)) == 5
+
+
+def test_run_once_runs_due_watchers_and_reschedules(monkeypatch):
+    factory = _session_factory()
+    session = factory()
+    session.add(Watcher(campground_id="1", check_time="08:00"))
+    session.add(Watcher(campground_id="2", check_time="09:00"))
+    session.commit()
+    session.close()
+
+    ran = []
+    monkeypatch.setattr(worker, "SessionLocal", scoped_session(factory))
+    monkeypatch.setattr(
+        worker, "run_watchers", lambda s, batch, now: ran.extend(w.campground_id for w in batch)
+    )
+
+    assert worker.Worker("test").run_once(NOW) == 1
+    assert ran == ["1"]
+    session = factory()
+    w = session.query(Watcher).filter(Watcher.campground_id == "1").one()
+    assert w.next_run_at == datetime.datetime(2024, 6, 2, 8, 0)
+    assert w.lease_owner is None
+
+
+def test_complete_leaves_a_lease_taken_over_by_another_worker():
+    session = _session_factory()()
+    for campground_id in ("1", "2"):
+        w = Watcher(campground_id=campground_id, check_time="08:00")
+        worker.enqueue(w, NOW)
+        session.add(w)
+    session.commit()
+
+    slow = worker.claim_due(session, "slow", NOW, limit=2, lease_seconds=60)
+    token = slow[0].lease_owner
+    later = NOW + datetime.timedelta(seconds=61)
+    fast = worker.claim_due(session, "fast", later, limit=1, lease_seconds=60)
+    fast_token = fast[0].lease_owner
+
+    assert worker.complete(session, slow, later, token) == 1
+    session.expire_all()
+    taken = session.get(Watcher, fast[0].id)
+    assert taken.lease_owner == fast_token
+    assert taken.next_run_at == NOW
+    other = session.query(Watcher).filter(Watcher.id != fast[0].id).one()
+    assert other.lease_owner is None
+    assert other.next_run_at == datetime.datetime(2024, 6, 2, 8, 0)
+
+
+def test_poller_lease_elects_one_worker():
+    session = _session_factory()()
+    assert worker.acquire_lease(session, "poller", "a", NOW, 60)
+    assert not worker.acquire_lease(session, "poller", "b", NOW, 60)
+
+    def at(seconds):
+        return NOW + datetime.timedelta(seconds=seconds)
+
+    assert worker.acquire_lease(session, "poller", "a", at(30), 60)
+    assert not worker.acquire_lease(session, "poller", "b", at(61), 60)
+    assert worker.acquire_lease(session, "poller", "b", at(91), 60)
+    assert not worker.acquire_lease(session, "poller", "a", at(92), 60)
+
+
+def test_release_change_marks_watchers_due_for_claiming():
+    session = _session_factory()()
+    later = NOW + datetime.timedelta(hours=1)
+    for start in (datetime.date(2024, 6, 1), datetime.date(2024, 7, 1)):
+        w = Watcher(
+            provider="reserve_ca",
+            campground_id="1",
+            facility_id="2",
+            start_date=start,
+            check_time="08:00",
+        )
+        worker.enqueue(w, later)
+        session.add(w)
+    session.commit()
+
+    assert worker.mark_release_due(session, ("1", "2", "2024-06-01"), later) == 1
+    claimed = worker.claim_due(session, "a", later, limit=10, lease_seconds=60)
+    assert [w.start_date for w in claimed] == [datetime.date(2024, 6, 1)]
+    # Leased watchers are already running and are left alone.
+    assert worker.mark_release_due(session, ("1", "2", "2024-06-01"), later) == 0
+
+
+def test_history_targets_reads_only_recgov_windows():
+    session = _session_factory()()
+    session.add_all(
+        [
+            Watcher(
+                campground_id="1",
+                start_date=datetime.date(2024, 6, 20),
+                end_date=datetime.date(2024, 7, 5),
+                check_time="08:00",
+            ),
+            Watcher(campground_id="2", check_time="08:00"),
+            Watcher(provider="reserve_ca", campground_id="3", facility_id="4", check_time="08:00"),
+        ]
+    )
+    session.commit()
+    assert worker.history_targets(session, datetime.date(2024, 6, 1)) == {
+        ("1", "2024-06"),
+        ("1", "2024-07"),
+        ("2", "2024-06"),
+    }
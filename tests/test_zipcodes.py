@@ -0,0 +1,29 @@
+import sys, os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from campwatcher import zipcodes
+from campwatcher.config import config
+from campwatcher.zipcodes import ZipTable, read_centroids
+
+
+def test_reads_census_gazetteer(tmp_path):
+    path = tmp_path / "gaz.txt"
+    path.write_text(
+        "GEOID\tALAND\tAWATER\tALAND_SQMI\tAWATER_SQMI\tINTPTLAT\tINTPTLONG                 \n"
+        "00601\t166847909\t799292\t64.42\t0.309\t18.180555\t-66.749961                \n"
+        "94102\t1961895\t0\t0.757\t0\t37.779329\t-122.419236              \n"
+    )
+    table = ZipTable(read_centroids(str(path)))
+    assert len(table) == 2
+    assert table.lookup("601") == (18.180555, -66.749961)
+    assert table.lookup("94102-1234") == (37.779329, -122.419236)
+    assert table.lookup("99999") is None
+
+
+def test_get_zip_table_uses_configured_csv(tmp_path, monkeypatch):
+    path = tmp_path / "zips.csv"
+    path.write_text("zip,lat,lon\n59715,45.68,-111.04\n")
+    monkeypatch.setattr(config, "zip_centroids_path", str(path))
+    monkeypatch.setattr(zipcodes, "_table", None)
+    assert zipcodes.get_zip_table().lookup("59715") == (45.68, -111.04)
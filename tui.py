@@ -1,63 +1,49 @@
 import curses
-import requests
-from datetime import date, datetime
-from typing import List, Tuple
+from datetime import date
+from typing import Dict, List
 
-# Simple mapping of ZIP codes to coordinates for demo purposes
-ZIP_COORDS = {
-    "94102": (37.7793, -122.4193),  # San Francisco
-    "10001": (40.7506, -73.9971),  # New York
-    "30301": (33.7525, -84.3915),  # Atlanta
-}
+from campwatcher import api
+from campwatcher.finder import CampgroundResult, DatePattern, search
+from campwatcher.zipcodes import get_zip_table
 
-SEARCH_API = "https://www.recreation.gov/api/facilities"
-AVAILABILITY_API = (
-    "https://www.recreation.gov/api/camps/availability/campground/{campground_id}/month"
-)
+MAX_CAMPGROUNDS = 10
+MATCHES_SHOWN = 3
 
 
 def fetch_campgrounds(lat: float, lon: float) -> List[dict]:
     """Fetch campgrounds near a coordinate."""
-    params = {"latitude": lat, "longitude": lon}
-    resp = requests.get(SEARCH_API, params=params)
-    resp.raise_for_status()
-    return resp.json().get("RECDATA", [])
-
-
-def _fetch_availability(campground_id: str, month: str) -> dict:
-    start_date = f"{month}-01T00:00:00.000Z"
-    url = AVAILABILITY_API.format(campground_id=campground_id)
-    resp = requests.get(url, params={"start_date": start_date})
-    resp.raise_for_status()
-    return resp.json()
-
-
-def weekend_available(campground_id: str, month: str) -> List[Tuple[str, str]]:
-    """Return list of (site_id, date) tuples available on Fri or Sat."""
-    data = _fetch_availability(campground_id, month)
-    results = []
-    for site_id, info in data.get("campsites", {}).items():
-        for day, status in info.get("availabilities", {}).items():
-            if status != "Available":
-                continue
-            dt = datetime.fromisoformat(day)
-            if dt.weekday() in (4, 5):  # Fri=4, Sat=5
-                results.append((site_id, dt.date().isoformat()))
-    return results
-
-
-def difficulty_score(campground_id: str, month: str) -> float:
-    """Estimate booking difficulty for a campground."""
-    data = _fetch_availability(campground_id, month)
-    total = 0
-    available = 0
-    for site in data.get("campsites", {}).values():
-        avail = site.get("availabilities", {})
-        total += len(avail)
-        available += sum(1 for v in avail.values() if v == "Available")
-    if total == 0:
-        return 1.0
-    return 1.0 - (available / total)
+    return api.fetch_campgrounds(None, str(lat), str(lon))
+
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def parse_pattern(choice: str) -> DatePattern | None:
+    """Map the dates prompt to a pattern.
+
+    ``a`` (any night), ``w`` (weekend nights), ``f`` (full weekend), a number
+    of nights, or weekdays such as ``thu,fri`` with an optional ``:N`` for
+    stays of N nights starting on one of them. Anything else ranks by
+    difficulty only, without listing nights.
+    """
+    choice = choice.strip().lower()
+    if choice == "a":
+        return DatePattern(nights=1)
+    if choice == "w":
+        return DatePattern.weekend_nights()
+    if choice == "f":
+        return DatePattern.full_weekend()
+    if choice.isdigit() and int(choice) > 0:
+        return DatePattern(nights=int(choice))
+    days, _, nights = choice.partition(":")
+    names = [name.strip()[:3] for name in days.split(",") if name.strip()]
+    if names and all(name in WEEKDAYS for name in names):
+        if nights and not (nights.isdigit() and int(nights) > 0):
+            return None
+        return DatePattern.on_weekdays(
+            [WEEKDAYS.index(name) for name in names], int(nights or 1)
+        )
+    return None
 
 
 def draw_center(stdscr, y: int, text: str, attr=0):
@@ -66,6 +52,51 @@ def draw_center(stdscr, y: int, text: str, attr=0):
     stdscr.addstr(y, x, text, attr)
 
 
+def draw_line(stdscr, y: int, x: int, text: str, attr=0):
+    """Draw ``text`` if it fits above the footer line."""
+    if y < curses.LINES - 2:
+        stdscr.addstr(y, x, text[: max(curses.COLS - x - 1, 0)], attr)
+
+
+def draw_results(
+    stdscr,
+    camps: List[dict],
+    results: Dict[str, CampgroundResult],
+    pattern: DatePattern | None,
+) -> int:
+    """Redraw every campground, with a placeholder for those still pending."""
+    stdscr.clear()
+    done = len(results)
+    title = f"Results ({done}/{len(camps)})" if done < len(camps) else "Results"
+    draw_center(stdscr, 1, title, curses.color_pair(1) | curses.A_BOLD)
+    row = 3
+    for camp in camps:
+        if row > curses.LINES - 3:
+            break
+        name = camp.get("FacilityName", "Unknown")
+        result = results.get(str(camp.get("FacilityID")))
+        if result is None:
+            draw_line(stdscr, row, 2, f"{name} (searching...)", curses.color_pair(2))
+        elif result.error:
+            draw_line(stdscr, row, 2, f"{name} (error: {result.error})")
+        else:
+            highlight = curses.A_BOLD
+            if result.difficulty > 0.8:
+                highlight |= curses.color_pair(3)
+            draw_line(stdscr, row, 2, f"{name} (difficulty {result.difficulty:.2f})", highlight)
+            if pattern is not None:
+                nights = f"{pattern.nights} nights" if pattern.nights > 1 else "night"
+                for site_id, day in result.matches[:MATCHES_SHOWN]:
+                    row += 1
+                    draw_line(stdscr, row, 4, f"Site {site_id} available {day} ({nights})")
+                if not result.matches:
+                    row += 1
+                    draw_line(stdscr, row, 4, "No matching dates")
+        row += 2
+    stdscr.refresh()
+    return min(row, curses.LINES - 2)
+
+
 def tui_main(stdscr):
     curses.curs_set(1)
     curses.init_pair(1, curses.COLOR_CYAN, curses.COLOR_BLACK)
@@ -76,18 +107,19 @@ def tui_main(stdscr):
     stdscr.addstr(3, 2, "ZIP code: ")
     curses.echo()
     zip_code = stdscr.getstr(3, 12, 10).decode().strip()
-    stdscr.addstr(5, 2, "Weekend only search? (y/n): ")
-    choice = stdscr.getstr(5, 31, 1).decode().strip().lower()
-    weekend_only = choice == "y"
+    prompt = "Dates: [a]ny, [w]eekend nights, [f]ull weekend, N nights or fri,sat[:N]: "
+    stdscr.addstr(5, 2, prompt)
+    pattern = parse_pattern(stdscr.getstr(5, 2 + len(prompt), 30).decode())
     stdscr.addstr(7, 2, "Searching...", curses.color_pair(2))
     stdscr.refresh()
 
-    if zip_code not in ZIP_COORDS:
+    coords = get_zip_table().lookup(zip_code)
+    if coords is None:
         stdscr.addstr(9, 2, "Unknown ZIP code", curses.color_pair(3))
         stdscr.getch()
         return
 
-    lat, lon = ZIP_COORDS[zip_code]
+    lat, lon = coords
     month = date.today().strftime("%Y-%m")
     try:
         camps = fetch_campgrounds(lat, lon)
@@ -96,34 +128,12 @@ def tui_main(stdscr):
         stdscr.getch()
         return
 
-    stdscr.clear()
-    draw_center(stdscr, 1, "Results", curses.color_pair(1) | curses.A_BOLD)
-    row = 3
-    for camp in camps[:10]:
-        name = camp.get("FacilityName", "Unknown")
-        cid = str(camp.get("FacilityID"))
-        try:
-            score = difficulty_score(cid, month)
-        except Exception:
-            score = 0.0
-        highlight = curses.A_BOLD
-        if score > 0.8:
-            highlight |= curses.color_pair(3)
-        stdscr.addstr(row, 2, f"{name} (difficulty {score:.2f})", highlight)
-        row += 1
-        if weekend_only:
-            try:
-                avail = weekend_available(cid, month)
-            except Exception:
-                avail = []
-        else:
-            avail = []
-        for site_id, day in avail[:3]:
-            stdscr.addstr(row, 4, f"Site {site_id} available {day}")
-            row += 1
-        row += 1
-        if row > curses.LINES - 2:
-            break
+    camps = camps[:MAX_CAMPGROUNDS]
+    results: Dict[str, CampgroundResult] = {}
+    row = draw_results(stdscr, camps, results, pattern)
+    for result in search([str(camp.get("FacilityID")) for camp in camps], month, pattern):
+        results[result.campground_id] = result
+        row = draw_results(stdscr, camps, results, pattern)
     stdscr.addstr(row, 2, "Press any key to exit...", curses.color_pair(2))
     stdscr.getch()
 